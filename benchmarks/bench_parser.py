@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+解析器吞吐量基准测试
+对比块级分词器（首字符分派，每行分类一次）与逐个尝试正则的分类方式
+
+用法:
+    python benchmarks/bench_parser.py            # 默认约 5MB 合成文档（mixed 语料）
+    python benchmarks/bench_parser.py --mb 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parser import MarkdownParser, LineKind
+from corpus import generate_corpus
+
+
+def classify_by_regex_chain(parser: MarkdownParser, line: str) -> LineKind:
+    """逐个尝试正则的分类方式（分词器之前每行的判断流程）"""
+    if parser.EMPTY_PATTERN.match(line):
+        return LineKind.EMPTY
+    if parser.HEADING_PATTERN.match(line):
+        return LineKind.HEADING
+    if parser.CODE_BLOCK_PATTERN.match(line):
+        return LineKind.CODE_FENCE
+    if parser.QUOTE_PATTERN.match(line):
+        return LineKind.QUOTE
+    if parser.LIST_PATTERN.match(line):
+        return LineKind.LIST
+    if parser.TABLE_PATTERN.match(line):
+        return LineKind.TABLE
+    if parser.HR_PATTERN.match(line):
+        return LineKind.HORIZONTAL_RULE
+    return LineKind.TEXT
+
+
+def best_of(func, repeat: int) -> float:
+    """返回多次运行中的最短耗时（秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='解析器吞吐量基准测试')
+    arg_parser.add_argument('--mb', type=float, default=5.0, help='合成文档大小（MB，默认 5）')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最短耗时（默认 3）')
+    arg_parser.add_argument('--seed', type=int, default=42, help='随机种子（默认 42）')
+    args = arg_parser.parse_args()
+
+    content = generate_corpus('mixed', int(args.mb * 1024 * 1024), args.seed)
+    lines = content.split('\n')
+    size_mb = len(content.encode('utf-8')) / (1024 * 1024)
+    parser = MarkdownParser()
+
+    # 两种分类方式的结果必须一致
+    for line in lines:
+        assert parser.tokenize_line(line)[0] is classify_by_regex_chain(parser, line), line
+
+    chain_time = best_of(lambda: [classify_by_regex_chain(parser, line) for line in lines], args.repeat)
+    token_time = best_of(lambda: [parser.tokenize_line(line) for line in lines], args.repeat)
+    parse_time = best_of(lambda: parser.parse(content), args.repeat)
+
+    print(f"文档大小: {size_mb:.2f} MB, {len(lines)} 行")
+    print(f"逐个正则分类:   {size_mb / chain_time:8.2f} MB/s")
+    print(f"首字符分派分词: {size_mb / token_time:8.2f} MB/s  ({chain_time / token_time:.2f}x)")
+    print(f"完整解析:       {size_mb / parse_time:8.2f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+CPU 流水线基准测试
+分别对解析、分析（不调用 LLM）、重组和增量更新扫描计时，以 JSON 输出吞吐量和内存峰值
+
+用法:
+    python benchmarks/bench_pipeline.py                                   # 默认语料和大小
+    python benchmarks/bench_pipeline.py --profiles zh,code --sizes 1KB,1MB,50MB
+    python benchmarks/bench_pipeline.py -o baseline.json                  # 保存结果
+    python benchmarks/bench_pipeline.py --compare baseline.json           # 与保存的结果对比，有退步时返回 1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from parser import MarkdownParser
+from analyzer import ContentAnalyzer
+from assembler import MarkdownAssembler
+from regenerate import MarkdownRegenerateParser
+from corpus import PROFILES, generate_corpus, parse_size, format_size
+
+
+# 基准测试配置：不调用 LLM，不使用解析缓存
+BENCH_CONFIG = {
+    'image_source': 'zhipu',
+    'llm': {'enabled': False},
+    'parse_cache': {'enabled': False},
+    'rules': {
+        'h1_after': True,
+        'h2_after': 'smart',
+        'long_paragraph_threshold': 150,
+        'min_gap_between_images': 3,
+        'max_images_per_article': 10 ** 9,
+    },
+    'prompts': {
+        'cover': '{title}，专业封面设计',
+        'section': '{topic}，简洁明了',
+        'atmospheric': '{topic}，氛围插图',
+    },
+    'output': {'add_image_caption': True},
+}
+
+DEFAULT_SIZES = '1KB,100KB,1MB,10MB'
+MB = 1024 * 1024
+
+
+def _quiet(func: Callable, *args):
+    """调用函数并丢弃其打印输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _setup_parse(content: str, workdir: Path):
+    return content
+
+
+def _run_parse(content: str):
+    return MarkdownParser().parse(content)
+
+
+def _setup_analyze(content: str, workdir: Path):
+    # analyze 会修改元素标记，每次运行前重新解析
+    return MarkdownParser().parse(content)
+
+
+def _analyze(doc):
+    # 提示词延迟生成，计时包含全部提示词
+    analyzer = ContentAnalyzer(BENCH_CONFIG)
+    decisions = analyzer.analyze(doc)
+    analyzer.materialize_prompts(decisions)
+    return decisions
+
+
+def _run_analyze(doc):
+    return _quiet(_analyze, doc)
+
+
+def _setup_assemble(content: str, workdir: Path):
+    doc = MarkdownParser().parse(content)
+    decisions = _quiet(_analyze, doc)
+    image_paths = [f"output/images/{d.image_type}_{i}.png" for i, d in enumerate(decisions)]
+    return doc, image_paths
+
+
+def _run_assemble(state):
+    doc, image_paths = state
+    return MarkdownAssembler(BENCH_CONFIG).assemble(doc, image_paths)
+
+
+def _setup_regenerate(content: str, workdir: Path):
+    path = workdir / 'illustrated.md'
+    if not path.exists() or path.stat().st_size != len(content.encode('utf-8')):
+        path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def _run_regenerate(path: str):
+    return MarkdownRegenerateParser(BENCH_CONFIG).parse_existing_images(path)
+
+
+# 阶段名 -> (准备函数, 计时函数)
+STAGES = {
+    'parse': (_setup_parse, _run_parse),
+    'analyze': (_setup_analyze, _run_analyze),
+    'assemble': (_setup_assemble, _run_assemble),
+    'regenerate_scan': (_setup_regenerate, _run_regenerate),
+}
+
+
+def measure(stage: str, content: str, workdir: Path, repeat: int) -> Dict[str, Any]:
+    """
+    测量单个阶段
+
+    计时取多次运行中的最短耗时；内存峰值单独运行一次（tracemalloc 会拖慢执行，不参与计时）
+
+    Returns:
+        {'seconds': ..., 'peak_mb': ...}
+    """
+    setup, run = STAGES[stage]
+
+    timings = []
+    for _ in range(repeat):
+        state = setup(content, workdir)
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+
+    state = setup(content, workdir)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        result = run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {'seconds': min(timings), 'peak_mb': peak / MB}
+
+
+def run_benchmarks(profiles: List[str], sizes: List[int], stages: List[str], repeat: int, seed: int) -> Dict[str, Any]:
+    """运行全部基准测试，返回可序列化的结果"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for profile in profiles:
+            for size in sizes:
+                content = generate_corpus(profile, size, seed)
+                content_bytes = len(content.encode('utf-8'))
+                # 不同语料使用独立的工作目录
+                case_dir = workdir / f"{profile}_{size}"
+                case_dir.mkdir()
+
+                for stage in stages:
+                    measured = measure(stage, content, case_dir, repeat)
+                    seconds = measured['seconds']
+                    entry = {
+                        'profile': profile,
+                        'size': format_size(size),
+                        'bytes': content_bytes,
+                        'stage': stage,
+                        'seconds': round(seconds, 6),
+                        'mb_per_s': round(content_bytes / MB / seconds, 3) if seconds > 0 else None,
+                        'peak_mb': round(measured['peak_mb'], 3),
+                    }
+                    results.append(entry)
+                    print(
+                        f"{profile:>12} {entry['size']:>6} {stage:>16}: "
+                        f"{entry['mb_per_s'] or 0:10.2f} MB/s  峰值 {entry['peak_mb']:8.2f} MB",
+                        file=sys.stderr
+                    )
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    与基线结果对比
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        tolerance: 允许的相对退步（如 0.2 表示 20%）
+
+    Returns:
+        退步描述列表（为空表示没有退步）
+    """
+    base_index = {(r['profile'], r['size'], r['stage']): r for r in baseline.get('results', [])}
+    regressions = []
+    for entry in current['results']:
+        base = base_index.get((entry['profile'], entry['size'], entry['stage']))
+        if base is None:
+            continue
+        name = f"{entry['profile']}/{entry['size']}/{entry['stage']}"
+        if base.get('mb_per_s') and entry['mb_per_s'] and entry['mb_per_s'] < base['mb_per_s'] * (1 - tolerance):
+            regressions.append(f"{name}: 吞吐量 {base['mb_per_s']:.2f} -> {entry['mb_per_s']:.2f} MB/s")
+        if base.get('peak_mb') and entry['peak_mb'] > base['peak_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: 内存峰值 {base['peak_mb']:.2f} -> {entry['peak_mb']:.2f} MB")
+    return regressions
+
+
+def _split_list(text: str) -> List[str]:
+    return [item.strip() for item in text.split(',') if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='CPU 流水线基准测试（解析 / 分析 / 重组 / 增量更新扫描）')
+    arg_parser.add_argument('--profiles', default=','.join(PROFILES),
+                            help=f"语料类型，逗号分隔（默认全部: {','.join(PROFILES)}）")
+    arg_parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                            help=f"文档大小，逗号分隔，支持 KB/MB（默认 {DEFAULT_SIZES}，最大可到 50MB）")
+    arg_parser.add_argument('--stages', default=','.join(STAGES),
+                            help=f"测试阶段，逗号分隔（默认全部: {','.join(STAGES)}）")
+    arg_parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最短耗时（默认 3）')
+    arg_parser.add_argument('--seed', type=int, default=42, help='随机种子（默认 42）')
+    arg_parser.add_argument('-o', '--output', help='结果 JSON 文件路径（默认输出到标准输出）')
+    arg_parser.add_argument('--compare', help='基线结果 JSON 文件，对比后有退步时返回 1')
+    arg_parser.add_argument('--tolerance', type=float, default=0.2, help='允许的相对退步（默认 0.2，即 20%%）')
+    args = arg_parser.parse_args(argv)
+
+    profiles = _split_list(args.profiles)
+    stages = _split_list(args.stages)
+    for stage in stages:
+        if stage not in STAGES:
+            arg_parser.error(f"未知的测试阶段: {stage}")
+    sizes = [parse_size(size) for size in _split_list(args.sizes)]
+
+    results = run_benchmarks(profiles, sizes, stages, args.repeat, args.seed)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+        print(f"结果已保存: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项退步（阈值 {args.tolerance:.0%}）:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"\n与基线相比没有超过 {args.tolerance:.0%} 的退步", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
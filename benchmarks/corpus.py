@@ -0,0 +1,190 @@
+"""
+合成 Markdown 语料生成器
+固定随机种子，同样的参数总是生成同样的文档，便于在不同版本之间对比基准测试结果
+"""
+
+import random
+from typing import Callable, List
+
+
+EN_WORDS = [
+    'the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'system',
+    'design', 'parser', 'stream', 'memory', 'cache', 'latency', 'request',
+    'python', 'architecture', 'algorithm', 'data', 'growth', 'analysis',
+]
+
+ZH_WORDS = [
+    '数据', '架构', '系统', '设计', '配图', '解析', '算法', '函数', '原理',
+    '流程', '模型', '性能', '缓存', '接口', '组件', '文章', '章节', '示例',
+]
+
+CODE_LANGUAGES = ['python', 'javascript', 'go', 'rust', 'bash', 'sql', 'yaml', '']
+
+CODE_TOKENS = [
+    'def', 'return', 'for', 'in', 'if', 'else', 'import', 'class', 'self',
+    'value', 'items', 'result', '=', '(', ')', ':', '[]', '{}', '0', '1',
+]
+
+IMAGE_TYPES = {
+    'cover': '封面图',
+    'section': '章节配图',
+    'concept': '概念示意图',
+    'atmospheric': '氛围插图',
+}
+
+# 支持的语料类型
+PROFILES = ['en', 'zh', 'code', 'lists', 'tables', 'mixed', 'illustrated']
+
+
+def parse_size(text: str) -> int:
+    """
+    解析大小字符串
+
+    Args:
+        text: 如 '1KB'、'500KB'、'10MB'，或纯数字（字节）
+
+    Returns:
+        字节数
+    """
+    text = text.strip().upper()
+    for suffix, factor in (('KB', 1024), ('MB', 1024 * 1024), ('GB', 1024 * 1024 * 1024), ('B', 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """把字节数格式化为 parse_size 能识别的字符串"""
+    if size >= 1024 * 1024 and size % (1024 * 1024) == 0:
+        return f"{size // (1024 * 1024)}MB"
+    if size >= 1024 and size % 1024 == 0:
+        return f"{size // 1024}KB"
+    return f"{size}B"
+
+
+def _sentence(rng: random.Random, words: List[str], count: int, joiner: str = ' ') -> str:
+    return joiner.join(rng.choices(words, k=count))
+
+
+def _heading(rng: random.Random, words: List[str], joiner: str) -> str:
+    return '#' * rng.choice([1, 2, 2, 2, 3, 3]) + ' ' + _sentence(rng, words, rng.randint(2, 6), joiner)
+
+
+def _paragraph(rng: random.Random, words: List[str], joiner: str) -> str:
+    return '\n'.join(_sentence(rng, words, rng.randint(8, 20), joiner) for _ in range(rng.randint(1, 6)))
+
+
+def _code_block(rng: random.Random) -> str:
+    body = '\n'.join(
+        ' ' * 4 * rng.randint(0, 2) + _sentence(rng, CODE_TOKENS, rng.randint(3, 10))
+        for _ in range(rng.randint(3, 30))
+    )
+    return f"```{rng.choice(CODE_LANGUAGES)}\n{body}\n```"
+
+
+def _list_block(rng: random.Random, words: List[str], joiner: str) -> str:
+    items = []
+    for i in range(rng.randint(5, 40)):
+        marker = rng.choice(['-', '*', '+', f'{i + 1}.'])
+        indent = '  ' * rng.choice([0, 0, 0, 1])
+        items.append(f"{indent}{marker} {_sentence(rng, words, rng.randint(3, 10), joiner)}")
+    return '\n'.join(items)
+
+
+def _table(rng: random.Random, words: List[str], joiner: str) -> str:
+    columns = rng.randint(3, 8)
+    header = '| ' + ' | '.join(_sentence(rng, words, 1, joiner) for _ in range(columns)) + ' |'
+    separator = '|' + '---|' * columns
+    rows = [
+        '| ' + ' | '.join(_sentence(rng, words, rng.randint(1, 3), joiner) for _ in range(columns)) + ' |'
+        for _ in range(rng.randint(5, 50))
+    ]
+    return '\n'.join([header, separator] + rows)
+
+
+def _quote(rng: random.Random, words: List[str], joiner: str) -> str:
+    return '\n'.join('> ' + _sentence(rng, words, rng.randint(5, 15), joiner) for _ in range(rng.randint(1, 3)))
+
+
+def _illustration(rng: random.Random, index: int) -> str:
+    """模拟配图后的输出（普通图片、候选图、Mermaid 代码块、失败标记）"""
+    image_type, name = rng.choice(list(IMAGE_TYPES.items()))
+    kind = rng.random()
+    if kind < 0.5:
+        return f"![{name} - 示例 {index}](output/images/{image_type}_{index}.png)\n\n*{name}：示例 {index}*"
+    if kind < 0.75:
+        candidates = [f"output/images/{image_type}_{index}_{c}.png" for c in range(3)]
+        lines = [
+            f"<!-- 候选图：从3张中选择第1张 -->",
+            f"![{name} - 示例 {index}]({candidates[0]}) ⭐",
+            "",
+            "<!-- 其他候选图已注释",
+        ]
+        lines += [f"<!-- 候选{c + 1}: ![{name} - 示例 {index}]({path}) -->" for c, path in enumerate(candidates[1:], 1)]
+        lines.append("-->")
+        return '\n'.join(lines)
+    if kind < 0.95:
+        return f"```mermaid\nflowchart TD\n    A[开始] --> B[步骤 {index}]\n    B --> C[结束]\n```\n\n*{name}：示例 {index}*"
+    return "<!-- 所有候选图生成失败 -->"
+
+
+def _block_generators(profile: str) -> List[tuple]:
+    """返回 (权重, 生成函数) 列表"""
+    words, joiner = (ZH_WORDS, '') if profile == 'zh' else (EN_WORDS, ' ')
+    if profile == 'mixed':
+        words = EN_WORDS + ZH_WORDS
+
+    heading = lambda rng, i: _heading(rng, words, joiner)
+    paragraph = lambda rng, i: _paragraph(rng, words, joiner)
+    code = lambda rng, i: _code_block(rng)
+    lists = lambda rng, i: _list_block(rng, words, joiner)
+    table = lambda rng, i: _table(rng, words, joiner)
+    quote = lambda rng, i: _quote(rng, words, joiner)
+    hr = lambda rng, i: rng.choice(['---', '***', '___'])
+
+    if profile in ('en', 'zh'):
+        return [(10, heading), (60, paragraph), (5, code), (10, lists), (3, table), (8, quote), (4, hr)]
+    if profile == 'code':
+        return [(10, heading), (25, paragraph), (60, code), (5, lists)]
+    if profile == 'lists':
+        return [(10, heading), (20, paragraph), (70, lists)]
+    if profile == 'tables':
+        return [(10, heading), (20, paragraph), (70, table)]
+    if profile == 'mixed':
+        return [(10, heading), (40, paragraph), (15, code), (15, lists), (8, table), (7, quote), (5, hr)]
+    if profile == 'illustrated':
+        illustration = lambda rng, i: _illustration(rng, i)
+        return [(15, heading), (45, paragraph), (5, code), (5, lists), (30, illustration)]
+    raise ValueError(f"未知的语料类型: {profile}（可选: {', '.join(PROFILES)}）")
+
+
+def generate_corpus(profile: str, size: int, seed: int = 42) -> str:
+    """
+    生成合成 Markdown 文档
+
+    Args:
+        profile: 语料类型（en, zh, code, lists, tables, mixed, illustrated）
+        size: 目标大小（UTF-8 字节数，结果略大于目标）
+        seed: 随机种子
+
+    Returns:
+        Markdown 文本
+    """
+    rng = random.Random(f"{profile}:{seed}")
+    generators = _block_generators(profile)
+    weights = [weight for weight, _ in generators]
+    functions: List[Callable] = [func for _, func in generators]
+
+    # 文档以 H1 标题开头
+    title_words, title_joiner = (ZH_WORDS, '') if profile == 'zh' else (EN_WORDS, ' ')
+    blocks = ['# ' + _sentence(rng, title_words, 4, title_joiner)]
+    total = len(blocks[0].encode('utf-8'))
+    index = 0
+    while total < size:
+        block = rng.choices(functions, weights)[0](rng, index)
+        blocks.append(block)
+        total += len(block.encode('utf-8')) + 2
+        index += 1
+
+    return '\n\n'.join(blocks)
+
@@ -0,0 +1,157 @@
+"""
+文档分析上下文
+按文档版本缓存全文、元数据、主题、关键词和分类结果，供分析、分类和提示词生成各阶段共享
+"""
+
+import threading
+import weakref
+from typing import Dict, Any, Callable, Hashable, List, Optional
+
+from parser import MarkdownDocument
+
+
+class DocumentAnalysisContext:
+    """
+    文档分析上下文
+
+    每个文档对象有自己的上下文（挂在 doc._analysis 上，不跨文档共享），所有结果在首次使用时计算并缓存。
+    文档版本（doc.version()）或标题变化时，get_analysis_context 会创建新的上下文。
+    依赖配置的结果（主题、分类等）按调用方提供的配置键分别缓存。
+    """
+
+    def __init__(self, doc: MarkdownDocument):
+        """
+        初始化上下文
+
+        Args:
+            doc: 文档对象
+        """
+        self._doc = weakref.ref(doc)
+        self.version = doc.version()
+        self.title = doc.title
+        self._values: Dict[Hashable, Any] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def doc(self) -> MarkdownDocument:
+        doc = self._doc()
+        if doc is None:
+            raise RuntimeError("文档对象已被释放")
+        return doc
+
+    def is_current(self, doc: MarkdownDocument) -> bool:
+        """上下文是否对应文档的当前版本"""
+        return (
+            self._doc() is doc
+            and self.version == doc.version()
+            and self.title == doc.title
+        )
+
+    def memo(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        keep: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        获取缓存的结果，没有时调用 compute 计算并缓存
+
+        Args:
+            key: 缓存键
+            compute: 计算函数
+            keep: 判断结果是否缓存（返回 False 时下次重新计算，如 LLM 失败后的降级结果）
+        """
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            value = compute()
+            if keep is None or keep(value):
+                self._values[key] = value
+            return value
+
+    @property
+    def full_text(self) -> str:
+        """全文（各元素内容按行拼接）"""
+        return self.memo('full_text', lambda: '\n'.join(el.content for el in self.doc.elements))
+
+    def get_meta(self, keyword_matcher=None) -> Dict[str, Any]:
+        """
+        文档元数据（分类器使用）
+
+        Args:
+            keyword_matcher: 计算特征向量使用的关键词匹配器
+        """
+        def compute():
+            doc = self.doc
+            features = doc.get_features(keyword_matcher)
+            return {
+                'title': doc.title,
+                'code_blocks': features.code_block_count,
+                'headings': [el.content for el in doc.get_headings()],
+                'has_code_examples': features.code_block_count > 0
+            }
+        return self.memo(('meta', keyword_matcher), compute)
+
+    def get_theme(self, analyzer) -> str:
+        """文章主题（按分析器的关键词配置缓存）"""
+        return self.memo(('theme', analyzer.context_key), lambda: analyzer._analyze_theme(self.doc))
+
+    def get_keywords(self, analyzer) -> List[str]:
+        """文章关键词"""
+        return self.memo(('keywords', analyzer.context_key), lambda: analyzer._extract_keywords(self.doc))
+
+    def get_classification(self, classifier) -> Dict[str, Any]:
+        """
+        文档分类结果（按分类器配置缓存，同一文档只调用一次 LLM）
+
+        需要 LLM 确认但 LLM 调用失败（降级为低置信度的规则分类）时不缓存，下次重新尝试。
+
+        Args:
+            classifier: DocumentClassifier 实例
+        """
+        def compute():
+            doc = self.doc
+            matcher = classifier.keyword_matcher
+            return classifier.classify(self.full_text, self.get_meta(matcher), doc.get_features(matcher))
+
+        def keep(result):
+            needs_llm = classifier.enabled and result.get('confidence', 0) < 0.8
+            return not needs_llm or result.get('method') == 'llm'
+
+        return self.memo(('classification', classifier.context_key), compute, keep)
+
+    def get_doc_context(self, analyzer, doc_type: str = 'normal') -> Dict[str, Any]:
+        """
+        提示词生成使用的文档上下文（所有配图决策共享同一个字典，调用方不应修改）
+
+        主题和关键词取自文档上已设置的值（analyze 从本上下文获取，流式分析时由调用方设置），
+        尚未设置时不缓存
+        """
+        def compute():
+            doc = self.doc
+            return {
+                'title': doc.title or '',
+                'theme': doc.theme,
+                'keywords': doc.keywords or [],
+                'doc_type': doc_type
+            }
+        return self.memo(
+            ('doc_context', analyzer.context_key, doc_type), compute,
+            lambda context: bool(context['theme'] or context['keywords'])
+        )
+
+
+def get_analysis_context(doc: MarkdownDocument) -> DocumentAnalysisContext:
+    """
+    获取文档的分析上下文（首次调用时创建并挂到文档上，文档修改后重新创建）
+
+    Args:
+        doc: 文档对象
+
+    Returns:
+        DocumentAnalysisContext
+    """
+    context = doc._analysis
+    if context is None or not context.is_current(doc):
+        context = doc._analysis = DocumentAnalysisContext(doc)
+    return context
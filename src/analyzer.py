@@ -6,10 +6,13 @@
 """
 
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Iterable, Iterator, Tuple
 
 from parser import MarkdownDocument, MarkdownElement, ElementType
+from keyword_matcher import ANALYZER_KEYWORDS, get_matcher
 
 # 导入智能组件
 try:
@@ -20,39 +23,120 @@ except ImportError:
     INTELLIGENT_AVAILABLE = False
 
 
-@dataclass
+class DeferredPrompt:
+    """
+    延迟生成的提示词（或由提示词派生的值，如 A/B 变体）
+
+    首次调用 result() 时才执行生成函数（可能是一次 LLM 请求），结果缓存，
+    多个线程同时请求时只生成一次。
+    """
+
+    __slots__ = ('_compute', '_value', '_done', '_lock')
+
+    def __init__(self, compute: Callable[[], Any]):
+        self._compute = compute
+        self._value = None
+        self._done = False
+        self._lock = threading.Lock()
+
+    def done(self) -> bool:
+        """是否已经生成"""
+        return self._done
+
+    def result(self) -> Any:
+        """获取结果（未生成时立即生成）"""
+        if not self._done:
+            with self._lock:
+                if not self._done:
+                    self._value = self._compute()
+                    self._done = True
+                    self._compute = None
+        return self._value
+
+    def __repr__(self) -> str:
+        return f"DeferredPrompt({self._value!r})" if self._done else "DeferredPrompt(<pending>)"
+
+
 class ImageDecision:
-    """配图决策"""
-    element_index: int  # 对应的元素索引
-    need_image: bool
-    image_type: str  # cover, section, concept, atmospheric, diagram
-    prompt: str
-    reason: str  # 决策理由
-    ab_variants: Optional[List[Dict[str, str]]] = None  # A/B 测试变体
-    image_source: Optional[str] = None  # 新增：图片来源
+    """
+    配图决策
+
+    prompt 和 ab_variants 可以传入 DeferredPrompt，首次访问时才生成：
+    增量更新模式下只有需要重新生成的位置才会调用 LLM。
+    """
+
+    def __init__(
+        self,
+        element_index: int,  # 对应的元素索引
+        need_image: bool,
+        image_type: str,  # cover, section, concept, atmospheric, diagram
+        prompt: Any,  # 提示词（str 或 DeferredPrompt）
+        reason: str,  # 决策理由
+        ab_variants: Any = None,  # A/B 测试变体（列表或 DeferredPrompt）
+        image_source: Optional[str] = None  # 新增：图片来源
+    ):
+        self.element_index = element_index
+        self.need_image = need_image
+        self.image_type = image_type
+        self._prompt = prompt
+        self.reason = reason
+        self._ab_variants = ab_variants
+        self.image_source = image_source
+
+    @property
+    def prompt(self) -> Optional[str]:
+        value = self._prompt
+        if isinstance(value, DeferredPrompt):
+            value = self._prompt = value.result()
+        return value
+
+    @prompt.setter
+    def prompt(self, value: Any):
+        self._prompt = value
+
+    @property
+    def prompt_ready(self) -> bool:
+        """提示词是否已经生成（访问 prompt 不会触发生成）"""
+        return not isinstance(self._prompt, DeferredPrompt) or self._prompt.done()
+
+    @property
+    def ab_variants(self) -> Optional[List[Dict[str, str]]]:
+        value = self._ab_variants
+        if isinstance(value, DeferredPrompt):
+            value = self._ab_variants = value.result()
+        return value
+
+    @ab_variants.setter
+    def ab_variants(self, value: Any):
+        self._ab_variants = value
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ImageDecision):
+            return NotImplemented
+        return (
+            (self.element_index, self.need_image, self.image_type, self.prompt,
+             self.reason, self.ab_variants, self.image_source) ==
+            (other.element_index, other.need_image, other.image_type, other.prompt,
+             other.reason, other.ab_variants, other.image_source)
+        )
+
+    # 与原 dataclass 一致：可变对象，不可哈希
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        # 不触发延迟生成
+        return (f"ImageDecision(element_index={self.element_index!r}, need_image={self.need_image!r}, "
+                f"image_type={self.image_type!r}, prompt={self._prompt!r}, reason={self.reason!r}, "
+                f"ab_variants={self._ab_variants!r}, image_source={self.image_source!r})")
 
 
 class ContentAnalyzer:
     """内容分析器"""
 
-    # 技术关键词（用于判断是否是技术类文章）
-    TECH_KEYWORDS = [
-        '代码', '编程', '函数', '算法', '数据结构', '架构', 'API',
-        'JavaScript', 'Python', 'Java', 'React', 'Vue', '数据库',
-        'code', 'function', 'algorithm', 'architecture', 'programming'
-    ]
-
-    # 概念类关键词（适合生成概念图）
-    CONCEPT_KEYWORDS = [
-        '原理', '机制', '概念', '流程', '工作原理', '是什么',
-        'principle', 'mechanism', 'concept', 'how it works'
-    ]
-
-    # 数据类关键词（适合生成图表）
-    DATA_KEYWORDS = [
-        '数据', '统计', '分析', '增长', '占比', '趋势',
-        'data', 'statistics', 'analysis', 'growth', 'percentage'
-    ]
+    # 关键词表（定义在 keyword_matcher 中，与分类器、Mermaid 生成器共享）
+    TECH_KEYWORDS = ANALYZER_KEYWORDS['tech']
+    CONCEPT_KEYWORDS = ANALYZER_KEYWORDS['concept']
+    DATA_KEYWORDS = ANALYZER_KEYWORDS['data']
 
     def __init__(self, config: Dict[str, Any], image_source: Optional[str] = None):
         """
@@ -65,6 +149,10 @@ class ContentAnalyzer:
         self.config = config
         self.rules = config.get('rules', {})
         self.image_source = image_source or config.get('image_source', 'zhipu')
+        self.keyword_matcher = get_matcher('analyzer', config)
+
+        # 影响主题、关键词提取的配置（用于在文档分析上下文中缓存结果）
+        self.context_key = ('analyzer', self.keyword_matcher)
 
         # 获取提示词模板
         self.prompts = self._get_prompts_for_source(self.image_source)
@@ -77,6 +165,9 @@ class ContentAnalyzer:
         self.classifier = None
         self.use_intelligent = INTELLIGENT_AVAILABLE and self.image_source == 'auto' or config.get('llm', {}).get('enabled', False)
 
+        # 提示词阶段的并发数（LLM 生成时使用，同一提供商的请求另受信号量限制）
+        self.prompt_workers = max(1, int(config.get('llm', {}).get('concurrency', 4)))
+
         if self.use_intelligent:
             try:
                 self.prompt_generator = PromptGenerator(config)
@@ -120,16 +211,8 @@ class ContentAnalyzer:
         Returns:
             上下文字符串
         """
-        context_parts = []
-
-        # 获取后续的段落内容（最多500字）
-        for elem in doc.elements:
-            if elem == element:
-                continue
-            if elem.type == ElementType.PARAGRAPH and len(context_parts) < 3:
-                context_parts.append(elem.content[:200])
-
-        return ' '.join(context_parts)
+        # 元素附近的段落内容（最多3段、500字）
+        return ' '.join(doc.context_window(element.position, n=3, max_chars=500))
 
     def _generate_prompt(
         self,
@@ -154,13 +237,8 @@ class ContentAnalyzer:
         if self.prompt_generator:
             try:
                 context = self._get_element_context(element, doc)
-                # 构建文档上下文
-                doc_context = {
-                    'title': doc.title or '',
-                    'theme': doc.theme,
-                    'keywords': doc.keywords or [],
-                    'doc_type': getattr(doc, 'doc_type', 'normal')
-                }
+                # 文档上下文（每个文档版本只构建一次）
+                doc_context = doc.analysis.get_doc_context(self, getattr(doc, 'doc_type', 'normal'))
                 prompt = self.prompt_generator.generate(
                     element_content=element.content,
                     image_type=image_type,
@@ -185,27 +263,8 @@ class ContentAnalyzer:
         Returns:
             分类结果字典
         """
-        # 准备文档元数据
-        meta = {
-            'title': doc.title,
-            'code_blocks': len([
-                el for el in doc.elements
-                if hasattr(el, 'type') and
-                (el.type.value if hasattr(el.type, 'value') else str(el.type)) == 'code_block'
-            ]),
-            'headings': [
-                el.content for el in doc.elements
-                if hasattr(el, 'type') and
-                (el.type.value if hasattr(el.type, 'value') else str(el.type)) == 'heading'
-            ],
-            'has_code_examples': any('```' in el.content for el in doc.elements if hasattr(el, 'content'))
-        }
-
-        # 获取文档内容
-        content = '\n'.join(el.content for el in doc.elements if hasattr(el, 'content'))
-
-        # 调用分类器
-        return self.classifier.classify(content, meta)
+        # 全文、元数据和分类结果都在文档分析上下文中缓存
+        return doc.analysis.get_classification(self.classifier)
 
     def _determine_image_source(self, image_type: str, doc_type: str) -> str:
         """
@@ -279,9 +338,10 @@ class ContentAnalyzer:
         """
         decisions = []
 
-        # 分析文章主题
-        doc.theme = self._analyze_theme(doc)
-        doc.keywords = self._extract_keywords(doc)
+        # 分析文章主题（同一文档版本只计算一次）
+        analysis = doc.analysis
+        doc.theme = analysis.get_theme(self)
+        doc.keywords = analysis.get_keywords(self)
 
         # 文档分类（如果启用智能模式）
         doc_type = 'normal'
@@ -309,10 +369,8 @@ class ContentAnalyzer:
         max_images = self.rules.get('max_images_per_article', 10)
 
         # 检查是否有 H1 标题
-        has_h1 = any(
-            (el.type.value if hasattr(el.type, 'value') else str(el.type)) == 'heading' and el.level == 1
-            for el in doc.elements
-        )
+        has_h1 = bool(doc.heading_positions(1))
+        cover_decision = None
 
         # 如果没有 H1 标题且配置要求配封面图，在文档开头添加封面图决策
         if not has_h1 and self.rules.get('h1_after', True):
@@ -329,21 +387,19 @@ class ContentAnalyzer:
             if title_element:
                 # 决定图片来源（封面图统一使用 AI）
                 cover_source = self._determine_image_source('cover', doc_type)
-                # 创建虚拟封面图决策
-                cover_prompt = self._generate_prompt(title_element, doc, 'cover', cover_source)
-                decision = ImageDecision(
+                # 创建虚拟封面图决策（提示词在提示词阶段生成）
+                cover_decision = ImageDecision(
                     element_index=title_index,
                     need_image=True,
                     image_type='cover',
-                    prompt=cover_prompt,
+                    prompt=None,
                     reason='无H1标题，自动在开头配封面图',
                     image_source=cover_source
                 )
-                decisions.append(decision)
+                decisions.append(cover_decision)
                 # 设置元素的 need_image 属性
                 title_element.need_image = True
                 title_element.image_type = 'cover'
-                title_element.image_prompt = cover_prompt
                 image_count += 1
 
         for i, element in enumerate(doc.elements):
@@ -355,24 +411,166 @@ class ContentAnalyzer:
             if i - last_image_index < self.rules.get('min_gap_between_images', 3):
                 continue
 
-            decision = self._analyze_element(element, doc, i)
+            decision = self._analyze_element(element, doc, i, with_prompt=False)
+            if decision and decision.need_image:
+                decisions.append(decision)
+                last_image_index = i
+                image_count += 1
+                element.need_image = True
+                element.image_type = decision.image_type
+
+        # 提示词延迟生成：首次访问时才生成（可用 materialize_prompts 并发预取）
+        for decision in decisions:
+            decision.prompt = self._defer_prompt(doc, decision)
+            # 如果启用 A/B 测试，生成变体（自动添加的封面图除外）
+            if ab_test_enabled and ab_variations and decision is not cover_decision:
+                decision.ab_variants = DeferredPrompt(
+                    lambda decision=decision: self._generate_ab_variants(
+                        decision.prompt,
+                        ab_variations,
+                        ab_test_size
+                    )
+                )
+
+        return decisions
+
+    def _defer_prompt(self, doc: MarkdownDocument, decision: ImageDecision) -> DeferredPrompt:
+        """创建决策的延迟提示词，生成后同时写入元素的 image_prompt"""
+        element = doc.elements[decision.element_index]
+
+        def generate() -> str:
+            prompt = self._generate_prompt(element, doc, decision.image_type, decision.image_source)
+            element.image_prompt = prompt
+            return prompt
+
+        return DeferredPrompt(generate)
+
+    def materialize_prompts(self, decisions: List[ImageDecision], indices: Optional[Iterable[int]] = None):
+        """
+        生成尚未生成的提示词
+
+        使用 LLM 时通过线程池并发请求（数量由 llm.concurrency 控制），
+        模板生成没有网络等待，直接顺序执行。结果保存在各自的决策中，与完成顺序无关。
+
+        Args:
+            decisions: 配图决策列表
+            indices: 只生成这些位置的提示词（None 表示全部）
+        """
+        # 模板生成没有网络等待，不需要线程池
+        workers = self.prompt_workers if self.prompt_generator else 1
+        materialize_prompts(decisions, indices, workers)
+
+    def analyze_stream(
+        self,
+        elements: Iterable[MarkdownElement],
+        title: str = '',
+        doc_type: str = 'normal'
+    ) -> Iterator[Tuple[MarkdownElement, Optional[ImageDecision]]]:
+        """
+        流式分析：逐个元素产出配图决策，内存占用与文档大小无关
+
+        与 analyze 使用相同的配图规则，但只依赖有限的前瞻窗口：
+        - H2 智能判断只预读到下一个标题或满 100 字为止
+        - 文档级规则（无 H1 时的封面图、文档分类）需要全文，流式模式下不执行
+
+        Args:
+            elements: 元素迭代器（如 parser.iter_markdown_file 的结果）
+            title: 文档标题（未知时使用遇到的第一个 H1）
+            doc_type: 文档类型 (technical, normal)
+
+        Yields:
+            (元素, 配图决策或 None)
+        """
+        # 只保存文档级上下文，不保存元素
+        doc = MarkdownDocument(title=title)
+        doc.theme = self._analyze_theme(doc) if title else ''
+        doc.doc_type = doc_type
+
+        ab_test_config = self.config.get('ab_test', {})
+        ab_test_enabled = ab_test_config.get('enabled', False)
+        ab_variations = ab_test_config.get('variations', [])
+        ab_test_size = ab_test_config.get('test_size', 2)
+
+        min_gap = self.rules.get('min_gap_between_images', 3)
+        max_images = self.rules.get('max_images_per_article', 10)
+        last_image_index = -min_gap
+        image_count = 0
+
+        source = iter(elements)
+        lookahead = deque()
+        index = 0
+
+        while True:
+            if lookahead:
+                element = lookahead.popleft()
+            else:
+                element = next(source, None)
+                if element is None:
+                    break
+
+            # 标题未知时使用第一个 H1
+            if not doc.title and element.type == ElementType.HEADING and element.level == 1:
+                doc.title = element.content
+                doc.theme = self._analyze_theme(doc)
+
+            decision = None
+            if image_count < max_images and index - last_image_index >= min_gap:
+                if (element.type == ElementType.HEADING and element.level == 2 and
+                        self.rules.get('h2_after', 'smart') == 'smart'):
+                    if self._stream_section_has_content(source, lookahead):
+                        decision = self._create_section_decision(element, doc, index)
+                else:
+                    decision = self._analyze_element(element, doc, index)
+
             if decision and decision.need_image:
-                # 如果启用 A/B 测试，生成变体
                 if ab_test_enabled and ab_variations:
                     decision.ab_variants = self._generate_ab_variants(
                         decision.prompt,
                         ab_variations,
                         ab_test_size
                     )
-
-                decisions.append(decision)
-                last_image_index = i
+                last_image_index = index
                 image_count += 1
                 element.need_image = True
                 element.image_type = decision.image_type
                 element.image_prompt = decision.prompt
+            else:
+                decision = None
 
-        return decisions
+            yield element, decision
+            index += 1
+
+    def _stream_section_has_content(self, source: Iterator[MarkdownElement], lookahead: deque) -> bool:
+        """
+        流式模式下判断章节是否需要配图（与 _should_add_section_image 规则一致）
+
+        预读的元素放入 lookahead，之后按顺序继续处理
+
+        Args:
+            source: 剩余元素迭代器
+            lookahead: 已预读的元素队列
+
+        Returns:
+            是否需要配图
+        """
+        total_words = 0
+        offset = 0
+        while True:
+            if offset < len(lookahead):
+                element = lookahead[offset]
+            else:
+                element = next(source, None)
+                if element is None:
+                    return False
+                lookahead.append(element)
+            offset += 1
+
+            if element.type == ElementType.HEADING:
+                return False
+            if element.type == ElementType.PARAGRAPH:
+                total_words += element.word_count
+            if total_words > 100:
+                return True
 
     def _generate_ab_variants(
         self,
@@ -427,14 +625,14 @@ class ContentAnalyzer:
             # 从标题提取主题
             theme = doc.title
             # 检查是否是技术类文章
-            is_tech = any(kw in theme for kw in self.TECH_KEYWORDS)
+            is_tech = self.keyword_matcher.contains(theme, 'tech')
             if is_tech:
                 return f"技术文章：{theme}"
             return theme
 
         # 从第一段提取
-        for element in doc.elements:
-            if element.type == ElementType.PARAGRAPH and element.word_count > 20:
+        for element in doc.get_paragraphs():
+            if element.word_count > 20:
                 return element.content[:50] + "..."
 
         return "通用文章"
@@ -457,12 +655,11 @@ class ContentAnalyzer:
             keywords.update(words)
 
         # 从代码块语言提取
-        for element in doc.elements:
-            if element.type == ElementType.CODE_BLOCK:
-                # 代码块第一行可能是语言标识
-                first_line = element.content.split('\n')[0]
-                if first_line.strip():
-                    keywords.add(first_line.strip())
+        for element in doc.elements_of_type(ElementType.CODE_BLOCK):
+            # 代码块第一行可能是语言标识
+            first_line = element.content.split('\n')[0]
+            if first_line.strip():
+                keywords.add(first_line.strip())
 
         return list(keywords)[:10]
 
@@ -476,7 +673,13 @@ class ContentAnalyzer:
         stopwords = {'的', '是', '在', '和', '与', '或', '但', '而', 'the', 'a', 'an', 'is', 'are', 'in', 'on', 'at'}
         return [w for w in words if len(w) > 1 and w not in stopwords]
 
-    def _analyze_element(self, element: MarkdownElement, doc: MarkdownDocument, index: int) -> Optional[ImageDecision]:
+    def _analyze_element(
+        self,
+        element: MarkdownElement,
+        doc: MarkdownDocument,
+        index: int,
+        with_prompt: bool = True
+    ) -> Optional[ImageDecision]:
         """
         分析单个元素是否需要配图
 
@@ -484,6 +687,7 @@ class ContentAnalyzer:
             element: 元素对象
             doc: 文档对象
             index: 元素索引
+            with_prompt: 是否立即生成提示词（False 时 prompt 为 None，由 analyze 设置为延迟生成）
 
         Returns:
             配图决策或 None
@@ -494,23 +698,23 @@ class ContentAnalyzer:
         # H1 标题后配封面图
         if element_type_value == 'heading' and element.level == 1:
             if self.rules.get('h1_after', True):
-                return self._create_cover_decision(element, doc, index)
+                return self._create_cover_decision(element, doc, index, with_prompt)
 
         # H2 标题后配图
         if element_type_value == 'heading' and element.level == 2:
             h2_rule = self.rules.get('h2_after', 'smart')
             if h2_rule is True:
-                return self._create_section_decision(element, doc, index)
+                return self._create_section_decision(element, doc, index, with_prompt)
             elif h2_rule == 'smart':
                 # 智能判断：检查后续内容长度
                 if self._should_add_section_image(doc, index):
-                    return self._create_section_decision(element, doc, index)
+                    return self._create_section_decision(element, doc, index, with_prompt)
 
         # 长段落配图
         if element_type_value == 'paragraph':
             threshold = self.rules.get('long_paragraph_threshold', 150)
             if element.word_count >= threshold:
-                return self._create_atmospheric_decision(element, doc, index)
+                return self._create_atmospheric_decision(element, doc, index, with_prompt)
 
         return None
 
@@ -525,25 +729,24 @@ class ContentAnalyzer:
         Returns:
             是否需要配图
         """
-        # 检查后续内容长度
-        total_words = 0
-        for i in range(heading_index + 1, len(doc.elements)):
-            element = doc.elements[i]
-            element_type_value = element.type.value if hasattr(element.type, 'value') else str(element.type)
-            if element_type_value == 'heading':
-                break
-            if element_type_value == 'paragraph':
-                total_words += element.word_count
-            if total_words > 100:
-                return True
-
-        return False
-
-    def _create_cover_decision(self, element: MarkdownElement, doc: MarkdownDocument, index: int) -> ImageDecision:
+        # 检查后续内容长度（到下一个标题为止的段落总字数）
+        outline = doc.outline
+        section = outline.section_at(heading_index)
+        if section is None:
+            return False
+        return outline.paragraph_words(section.start, section.body_end) > 100
+
+    def _create_cover_decision(
+        self,
+        element: MarkdownElement,
+        doc: MarkdownDocument,
+        index: int,
+        with_prompt: bool = True
+    ) -> ImageDecision:
         """创建封面图决策"""
         doc_type = getattr(doc, 'doc_type', 'normal')
         image_source = self._determine_image_source('cover', doc_type)
-        prompt = self._generate_prompt(element, doc, 'cover', image_source)
+        prompt = self._generate_prompt(element, doc, 'cover', image_source) if with_prompt else None
 
         return ImageDecision(
             element_index=index,
@@ -554,18 +757,24 @@ class ContentAnalyzer:
             image_source=image_source
         )
 
-    def _create_section_decision(self, element: MarkdownElement, doc: MarkdownDocument, index: int) -> ImageDecision:
+    def _create_section_decision(
+        self,
+        element: MarkdownElement,
+        doc: MarkdownDocument,
+        index: int,
+        with_prompt: bool = True
+    ) -> ImageDecision:
         """创建章节配图决策"""
         # 判断图片类型
         image_type = 'section'
 
         # 检查是否是概念类内容
-        if any(kw in element.content for kw in self.CONCEPT_KEYWORDS):
+        if self.keyword_matcher.contains(element.content, 'concept'):
             image_type = 'concept'
 
         doc_type = getattr(doc, 'doc_type', 'normal')
         image_source = self._determine_image_source(image_type, doc_type)
-        prompt = self._generate_prompt(element, doc, image_type, image_source)
+        prompt = self._generate_prompt(element, doc, image_type, image_source) if with_prompt else None
 
         return ImageDecision(
             element_index=index,
@@ -576,11 +785,17 @@ class ContentAnalyzer:
             image_source=image_source
         )
 
-    def _create_atmospheric_decision(self, element: MarkdownElement, doc: MarkdownDocument, index: int) -> ImageDecision:
+    def _create_atmospheric_decision(
+        self,
+        element: MarkdownElement,
+        doc: MarkdownDocument,
+        index: int,
+        with_prompt: bool = True
+    ) -> ImageDecision:
         """创建氛围图决策"""
         doc_type = getattr(doc, 'doc_type', 'normal')
         image_source = self._determine_image_source('atmospheric', doc_type)
-        prompt = self._generate_prompt(element, doc, 'atmospheric', image_source)
+        prompt = self._generate_prompt(element, doc, 'atmospheric', image_source) if with_prompt else None
 
         return ImageDecision(
             element_index=index,
@@ -592,6 +807,33 @@ class ContentAnalyzer:
         )
 
 
+def materialize_prompts(
+    decisions: List[ImageDecision],
+    indices: Optional[Iterable[int]] = None,
+    max_workers: int = 1
+):
+    """
+    生成尚未生成的延迟提示词（max_workers > 1 时并发生成）
+
+    Args:
+        decisions: 配图决策列表
+        indices: 只生成这些位置的提示词（None 表示全部）
+        max_workers: 最大并发数
+    """
+    selected = decisions if indices is None else [decisions[i] for i in indices]
+    pending = [decision for decision in selected if not getattr(decision, 'prompt_ready', True)]
+    if not pending:
+        return
+
+    workers = min(max_workers, len(pending))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prompt') as executor:
+            list(executor.map(lambda decision: decision.prompt, pending))
+    else:
+        for decision in pending:
+            decision.prompt
+
+
 def analyze_content(doc: MarkdownDocument, config: Dict[str, Any], image_source: Optional[str] = None) -> List[ImageDecision]:
     """
     分析内容的便捷函数
@@ -3,9 +3,10 @@ Markdown 重组模块
 将生成的图片插入到 Markdown 中，生成带配图的最终文档
 """
 
+import os
 import re
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from datetime import datetime
 
 from parser import MarkdownDocument, MarkdownElement, ElementType
@@ -27,6 +28,10 @@ except ImportError:
         return None, None
 
 
+# iter_assemble 中图片路径迭代器耗尽的标记
+_NO_MORE_PATHS = object()
+
+
 class MarkdownAssembler:
     """Markdown 重组器"""
 
@@ -63,23 +68,60 @@ class MarkdownAssembler:
         Returns:
             带配图的 Markdown 内容
         """
-        lines = []
-        image_index = 0
+        return '\n\n'.join(self.iter_assemble(doc.elements, image_paths, base_dir, batch_mode, source=doc))
+
+    def iter_assemble(
+        self,
+        elements: Iterable[MarkdownElement],
+        image_paths: Iterable[Optional[str]],
+        base_dir: Optional[Path] = None,
+        batch_mode: bool = False,
+        source: Optional[MarkdownDocument] = None
+    ) -> Iterator[str]:
+        """
+        流式重组：逐个元素产出 Markdown 片段（片段之间用空行连接）
+
+        image_paths 按需逐个读取，只在遇到需要配图的元素时才取下一项，
+        因此可以传入与元素流同步产生的生成器。
+
+        Args:
+            elements: 元素迭代器
+            image_paths: 图片路径迭代器（对应需要配图的元素）
+            base_dir: 基础目录（用于计算相对路径）
+            batch_mode: 批量模式（为每个位置生成了多张候选图）
+            source: 保留了原文的文档对象，提供时元素按原文原样输出
+
+        Yields:
+            每个元素（及其配图）对应的 Markdown 片段
+        """
+        paths = iter(image_paths)
+        paths_exhausted = False
 
-        for i, element in enumerate(doc.elements):
-            # 输出原始元素内容
-            lines.append(self._format_element(element))
+        for element in elements:
+            # 输出原始元素内容：优先直接截取原文，没有原文位置时再重新格式化
+            text = source.source_text(element) if source is not None else None
+            if text is None:
+                text = self._format_element(element)
+            lines = [text]
 
             # 如果需要配图，插入图片
-            if element.need_image and image_index < len(image_paths):
-                image_path = image_paths[image_index]
-                if image_path:
+            if element.need_image and not paths_exhausted:
+                image_path = next(paths, _NO_MORE_PATHS)
+                if image_path is _NO_MORE_PATHS:
+                    paths_exhausted = True
+                elif image_path:
                     # 批量模式：image_path 是列表，需要将每个路径转换为相对路径
                     if batch_mode or isinstance(image_path, list):
                         # 转换列表中的每个路径
                         rel_path = []
                         for path in image_path:
-                            if path is None:
+                            if isinstance(path, dict):
+                                # A/B 测试变体：只转换其中的路径
+                                variant_path = path.get('path')
+                                if variant_path and base_dir:
+                                    variant_path = self._get_relative_path(variant_path, base_dir)
+                                rel_path.append({**path, 'path': variant_path})
+                            elif path is None:
                                 rel_path.append(None)
                             elif base_dir:
                                 rel_path.append(self._get_relative_path(path, base_dir))
@@ -94,9 +136,7 @@ class MarkdownAssembler:
                     img_lines = self._format_image(element, rel_path, batch_mode=batch_mode)
                     lines.extend(img_lines)
 
-                image_index += 1
-
-        return '\n\n'.join(lines)
+            yield '\n\n'.join(lines)
 
     def _format_element(self, element: MarkdownElement) -> str:
         """
@@ -448,6 +488,44 @@ class MarkdownAssembler:
         print(f"已生成带配图的文档: {output_path}")
 
 
+    def save_stream(self, chunks: Iterable[str], output_path: str, keep_original: bool = True):
+        """
+        流式保存 Markdown 文件
+
+        片段逐个写入同目录下的临时文件，完成后再替换目标文件，
+        因此输出路径可以与正在流式读取的输入文件相同。
+
+        Args:
+            chunks: Markdown 片段迭代器（如 iter_assemble 的结果）
+            output_path: 输出路径
+            keep_original: 是否保留原始文件
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = output_path.with_name(f".{output_path.name}.tmp")
+
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for i, chunk in enumerate(chunks):
+                    if i > 0:
+                        f.write('\n\n')
+                    f.write(chunk)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        # 保留原始文件
+        if keep_original and output_path.exists():
+            original_path = output_path.with_suffix(
+                self.output_config.get('original_suffix', '.original.md')
+            )
+            output_path.rename(original_path)
+            print(f"原始文件已保存到: {original_path}")
+
+        os.replace(temp_path, output_path)
+        print(f"已生成带配图的文档: {output_path}")
+
+
 def assemble_markdown(
     doc: MarkdownDocument,
     image_paths: List[Optional[str]],
@@ -478,3 +556,28 @@ def assemble_markdown(
         assembler.save(content, output_path, keep_original)
 
     return content
+
+
+def assemble_markdown_stream(
+    elements: Iterable[MarkdownElement],
+    image_paths: Iterable[Optional[str]],
+    config: Dict[str, Any],
+    output_path: str,
+    batch_mode: bool = False
+):
+    """
+    流式重组并保存 Markdown 的便捷函数（内存占用与文档大小无关）
+
+    Args:
+        elements: 元素迭代器（如 analyzer.analyze_stream 产出的元素）
+        image_paths: 图片路径迭代器（对应需要配图的元素，按需读取）
+        config: 配置字典
+        output_path: 输出文件路径
+        batch_mode: 批量模式标志
+    """
+    assembler = MarkdownAssembler(config)
+    base_dir = Path(output_path).parent
+
+    chunks = assembler.iter_assemble(elements, image_paths, base_dir, batch_mode=batch_mode)
+    keep_original = config.get('output', {}).get('keep_original', True)
+    assembler.save_stream(chunks, output_path, keep_original)
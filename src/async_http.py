@@ -0,0 +1,116 @@
+"""
+异步 HTTP 客户端模块
+为 LLM 提供商和图片生成器的异步调用提供共享的 httpx.AsyncClient（复用连接池），每个事件循环一个实例
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Dict, Any, Optional
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+# 默认超时和连接池上限
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_MAX_CONNECTIONS = 20
+
+# 事件循环 -> 共享客户端（httpx.AsyncClient 不能跨事件循环使用）
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_async_client(
+    timeout: float = DEFAULT_TIMEOUT,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+) -> 'httpx.AsyncClient':
+    """
+    获取当前事件循环的共享异步 HTTP 客户端
+
+    必须在协程中调用。同一事件循环内的所有调用共享连接池，
+    超时和连接数以首次创建时的参数为准。
+
+    Args:
+        timeout: 请求超时（秒）
+        max_connections: 连接池最大连接数
+
+    Returns:
+        httpx.AsyncClient 实例
+    """
+    if not HTTPX_AVAILABLE:
+        raise ImportError("请安装 httpx 包: pip install httpx")
+
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                )
+            )
+            _clients[loop] = client
+        return client
+
+
+async def post_json(
+    url: str,
+    payload: Dict[str, Any],
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    发送 JSON POST 请求并解析 JSON 响应
+
+    Args:
+        url: 请求地址
+        payload: 请求体
+        headers: 额外的请求头
+
+    Returns:
+        响应 JSON
+
+    Raises:
+        httpx.HTTPStatusError: 响应状态码不是 2xx
+    """
+    client = get_async_client()
+    response = await client.post(url, json=payload, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+async def get_json(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    发送 GET 请求并解析 JSON 响应
+
+    Args:
+        url: 请求地址
+        params: 查询参数
+        headers: 额外的请求头
+
+    Returns:
+        响应 JSON
+    """
+    client = get_async_client()
+    response = await client.get(url, params=params, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+
+async def aclose_async_client():
+    """关闭当前事件循环的共享客户端（在事件循环结束前调用）"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
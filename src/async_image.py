@@ -0,0 +1,91 @@
+"""
+异步图片生成模块
+为图片生成器提供 agenerate / agenerate_many：基于共享的异步 HTTP 客户端，
+可以在同一个事件循环中并发执行多个生成任务
+"""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from image_download import adownload_image
+
+
+class AsyncImageMixin:
+    """
+    异步图片生成混入类
+
+    没有原生异步实现的生成器（如 Mermaid）在线程池中执行同步的 generate。
+    原生实现通过 async_http 的共享客户端请求接口，并用 _asave_image 下载图片。
+    """
+
+    # 保存图片的扩展名和下载请求头
+    IMAGE_EXTENSION = 'png'
+    DOWNLOAD_HEADERS: Optional[Dict[str, str]] = None
+
+    async def agenerate(
+        self,
+        prompt: str,
+        index: int = 0,
+        image_type: str = 'image',
+        candidate_index: int = 0
+    ) -> str:
+        """
+        异步生成图片（参数与 generate 相同）
+
+        默认在线程池中执行同步的 generate
+        """
+        return await asyncio.to_thread(
+            self.generate, prompt, index, image_type, candidate_index=candidate_index
+        )
+
+    async def agenerate_many(
+        self,
+        prompt: str,
+        n: int,
+        index: int = 0,
+        image_type: str = 'image',
+        start_candidate: int = 0
+    ) -> List[Optional[str]]:
+        """
+        异步为同一提示词生成 n 张候选图（参数与 generate_many 相同）
+
+        接口支持一次返回多张时使用 generate_many（一次请求），否则依次调用 agenerate
+        （任务只占用一个来源并发名额，不在内部再并发）
+        """
+        if n > 1 and getattr(self, 'max_images_per_request', 1) > 1:
+            return await asyncio.to_thread(
+                self.generate_many, prompt, n, index, image_type, start_candidate
+            )
+
+        paths: List[Optional[str]] = []
+        last_error = None
+        for k in range(n):
+            try:
+                paths.append(await self.agenerate(prompt, index, image_type, candidate_index=start_candidate + k))
+            except Exception as e:
+                last_error = e
+                paths.append(None)
+
+        if last_error is not None and not any(paths):
+            raise last_error
+        return paths
+
+    def _image_filepath(self, index: int, image_type: str, candidate_index: int = 0) -> Path:
+        """生成图片保存路径"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if candidate_index > 0:
+            # 批量模式：在文件名中包含候选索引
+            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.{self.IMAGE_EXTENSION}"
+        else:
+            filename = f"{index}_{image_type}_{timestamp}.{self.IMAGE_EXTENSION}"
+        return self.save_dir / filename
+
+    async def _asave_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
+        """异步下载并保存图片"""
+        filepath = self._image_filepath(index, image_type, candidate_index)
+        await adownload_image(url, filepath, headers=self.DOWNLOAD_HEADERS)
+
+        print(f"  已保存到: {filepath}")
+        return str(filepath)
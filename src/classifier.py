@@ -4,38 +4,31 @@
 """
 
 import re
+import json
+import threading
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from keyword_matcher import CLASSIFIER_KEYWORDS, get_matcher
+from llm_cache import get_llm_cache
+from parse_cache import get_parse_cache
+from parser import _FENCE_LANGUAGE
+
+
+# 分类结果缓存统计（进程内所有分类器共享）
+_classification_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
 
 class DocumentClassifier:
     """文档分类器"""
 
-    # 技术关键词列表
-    TECH_KEYWORDS = [
-        '代码', '编程', '函数', '算法', '数据结构', '架构', 'API',
-        '框架', '库', '模块', '类', '对象', '变量', '方法',
-        '数据库', '服务器', '客户端', '前端', '后端', '全栈',
-        '部署', '配置', '环境', '依赖', '安装',
-        # 英文技术词汇
-        'code', 'function', 'algorithm', 'data structure', 'API',
-        'framework', 'library', 'module', 'class', 'object', 'variable',
-        'database', 'server', 'client', 'frontend', 'backend', 'fullstack',
-        'deploy', 'config', 'environment', 'dependency', 'install',
-        'git', 'commit', 'push', 'pull', 'clone', 'branch', 'merge',
-        'http', 'https', 'url', 'endpoint', 'request', 'response',
-        'json', 'xml', 'html', 'css', 'javascript', 'python', 'java',
-        'react', 'vue', 'angular', 'node', 'express', 'django', 'flask',
-        'docker', 'kubernetes', 'linux', 'ubuntu', 'windows', 'mac',
-    ]
-
-    # 流程相关关键词
-    PROCESS_KEYWORDS = [
-        '流程', '步骤', '阶段', '过程', '循环', '判断', '条件',
-        '输入', '输出', '开始', '结束', '返回', '调用',
-        'flow', 'process', 'step', 'stage', 'loop', 'condition',
-        'input', 'output', 'start', 'end', 'return', 'call',
-    ]
+    # 关键词表（定义在 keyword_matcher 中，与分析器、Mermaid 生成器共享）
+    TECH_KEYWORDS = CLASSIFIER_KEYWORDS['tech']
+    PROCESS_KEYWORDS = CLASSIFIER_KEYWORDS['process']
+
+    # 分类结果缓存格式版本（指纹或结果格式变化时递增）
+    CLASSIFICATION_CACHE_VERSION = 2
 
     def __init__(self, config: Dict[str, Any]):
         """
@@ -50,8 +43,18 @@ class DocumentClassifier:
         self.provider = self.llm_config.get('provider', 'zhipu')
         self.model = self.llm_config.get('model', 'glm-4-flash')
         self.max_tokens = self.llm_config.get('max_tokens', 300)
+        self.keyword_matcher = get_matcher('classifier', config)
 
-    def classify(self, doc_content: str, doc_meta: Dict[str, Any]) -> Dict[str, Any]:
+        # LLM 响应缓存
+        self.llm_cache = get_llm_cache(config)
+
+        # LLM 分类结果缓存（按文档结构指纹，存放在解析缓存的 classification 命名空间）
+        self.result_cache = get_parse_cache(config)
+
+        # 影响分类结果的配置（用于缓存分类结果）
+        self.context_key = ('classifier', self.keyword_matcher, self.enabled, self.provider, self.model)
+
+    def classify(self, doc_content: str, doc_meta: Dict[str, Any], features=None) -> Dict[str, Any]:
         """
         分类文档类型
 
@@ -63,6 +66,7 @@ class DocumentClassifier:
                 'headings': List[str],
                 'has_code_examples': bool
             }
+            features: 解析阶段得到的文档特征向量（DocumentFeatures，提供时不再扫描原文）
 
         Returns:
             分类结果 {
@@ -73,23 +77,79 @@ class DocumentClassifier:
             }
         """
         # 先进行规则分类（快速）
-        rule_result = self._rule_based_classification(doc_content, doc_meta)
+        rule_result = self._rule_based_classification(doc_content, doc_meta, features)
 
         # 如果启用 LLM 且规则分类不确定，使用 LLM 验证
         if self.enabled and rule_result['confidence'] < 0.8:
-            llm_result = self._llm_classification(doc_content, doc_meta)
+            # 结构相同的文档（只有少量文字修改）复用之前的 LLM 分类结果
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key = self.result_cache.make_key(
+                    'classification',
+                    self._structural_fingerprint(doc_content, doc_meta, features),
+                    self.CLASSIFICATION_CACHE_VERSION
+                )
+                cached = self.result_cache.load(cache_key)
+                _record_classification_lookup(cached is not None)
+                if cached is not None:
+                    return cached
+
+            llm_result = self._llm_classification(doc_content, doc_meta, features)
+
+            # 只缓存 LLM 给出的结果（失败回退到规则分类时不缓存）
+            if cache_key is not None and llm_result.get('method') == 'llm':
+                self.result_cache.store(cache_key, llm_result)
+
             # LLM 结果优先
             return llm_result
 
         return rule_result
 
-    def _rule_based_classification(self, content: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    def _structural_fingerprint(self, content: str, meta: Dict[str, Any], features=None) -> str:
+        """
+        文档结构指纹
+
+        由标题、各级标题、代码块语言和关键词直方图组成。数量按 2 的幂分档，
+        正文的少量修改不会改变指纹。
+
+        Args:
+            content: 文档内容
+            meta: 文档元数据
+            features: 文档特征向量（提供时不再扫描原文）
+
+        Returns:
+            指纹字符串（作为缓存内容参与哈希）
+        """
+        if features is not None:
+            # features.keyword_counts 已经是各类别的出现次数
+            histogram = features.keyword_counts
+            languages = sorted(features.code_languages)
+            code_blocks = features.code_block_count
+        else:
+            histogram = self.keyword_matcher.count_categories(content)
+            # 围栏成对出现，只取开始行的语言
+            fences = [match.group(1) for match in map(_FENCE_LANGUAGE.match, content.splitlines()) if match]
+            languages = sorted({language.lower() for language in fences[0::2]})
+            code_blocks = meta.get('code_blocks', 0)
+
+        return json.dumps({
+            'classifier': [self.provider, self.model],
+            'keywords': sorted(self.keyword_matcher.keywords),
+            'title': meta.get('title') or '',
+            'headings': meta.get('headings', []),
+            'languages': languages,
+            'code_blocks': int(code_blocks).bit_length(),
+            'histogram': {name: int(count).bit_length() for name, count in sorted(histogram.items())},
+        }, ensure_ascii=False)
+
+    def _rule_based_classification(self, content: str, meta: Dict[str, Any], features=None) -> Dict[str, Any]:
         """
         基于规则的分类（快速分类）
 
         Args:
             content: 文档内容
             meta: 文档元数据
+            features: 文档特征向量（为 None 时扫描原文计算）
 
         Returns:
             分类结果
@@ -102,30 +162,29 @@ class DocumentClassifier:
             'structure_score': 0,
         }
 
-        content_lower = content.lower()
-
-        # 统计技术关键词
-        for keyword in self.TECH_KEYWORDS:
-            count = content_lower.count(keyword.lower())
-            if count > 0:
-                indicators['tech_keyword_count'] += count
+        if features is not None:
+            # 直接使用解析阶段得到的特征（关键词计数、代码块、标题）
+            keyword_counts = features.keyword_counts
+            indicators['code_block_count'] = features.code_block_count
+            indicators['structure_score'] = features.heading_count
+            indicators['code_languages'] = dict(features.code_languages)
+            indicators['list_density'] = features.list_density
+            indicators['table_density'] = features.table_density
+        else:
+            # 统计技术关键词和流程关键词（每个关键词只扫描一次）
+            keyword_counts = self.keyword_matcher.count_categories(content)
 
-        # 统计流程关键词
-        for keyword in self.PROCESS_KEYWORDS:
-            count = content_lower.count(keyword.lower())
-            if count > 0:
-                indicators['process_keyword_count'] += count
+            # 检测代码块
+            code_block_pattern = r'```[\w]*\n([\s\S]*?)```'
+            indicators['code_block_count'] = len(re.findall(code_block_pattern, content))
 
-        # 检测代码块
-        code_block_pattern = r'```[\w]*\n([\s\S]*?)```'
-        code_blocks = re.findall(code_block_pattern, content)
-        indicators['code_block_count'] = len(code_blocks)
-        indicators['has_code_example'] = len(code_blocks) > 0
+            # 结构化程度（标题层级、列表等）
+            heading_pattern = r'^#{1,6}\s+.+$'
+            indicators['structure_score'] = len(re.findall(heading_pattern, content, re.MULTILINE))
 
-        # 结构化程度（标题层级、列表等）
-        heading_pattern = r'^#{1,6}\s+.+$'
-        headings = re.findall(heading_pattern, content, re.MULTILINE)
-        indicators['structure_score'] = len(headings)
+        indicators['tech_keyword_count'] = keyword_counts['tech']
+        indicators['process_keyword_count'] = keyword_counts['process']
+        indicators['has_code_example'] = indicators['code_block_count'] > 0
 
         # 计算技术得分
         tech_score = 0
@@ -160,7 +219,7 @@ class DocumentClassifier:
                 'tech_score': tech_score
             }
 
-    def _llm_classification(self, content: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+    def _llm_classification(self, content: str, meta: Dict[str, Any], features=None) -> Dict[str, Any]:
         """
         基于 LLM 的分类（准确但较慢）
 
@@ -172,33 +231,33 @@ class DocumentClassifier:
             分类结果
         """
         try:
-            # 动态导入 LLM 客户端
             if self.provider == 'zhipu':
-                from zhipuai import ZhipuAI
                 api_key = self.llm_config.get('api_key') or self.config.get('api', {}).get('api_key', '')
                 if not api_key:
                     # 回退到规则分类
-                    return self._rule_based_classification(content, meta)
-                client = ZhipuAI(api_key=api_key)
+                    return self._rule_based_classification(content, meta, features)
             else:
                 # 其他 provider 暂未实现，回退到规则
-                return self._rule_based_classification(content, meta)
+                return self._rule_based_classification(content, meta, features)
 
             # 准备提示词
+            system_prompt = "你是一个文档分类专家，擅长判断文档类型。"
             prompt = self._build_classification_prompt(content, meta)
 
-            # 调用 LLM
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个文档分类专家，擅长判断文档类型。"},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.1
-            )
+            def request() -> str:
+                # 复用进程内共享的 LLM 客户端
+                from llm_pool import get_llm_provider
+                client = get_llm_provider(self.provider, api_key, self.model)
 
-            result = response.choices[0].message.content.strip().lower()
+                # 调用 LLM
+                return client.generate(prompt, system_prompt, max_tokens=100, temperature=0.1)
+
+            if self.llm_cache is not None:
+                key = self.llm_cache.make_key(self.provider, self.model, system_prompt, prompt, 100, 0.1)
+                result = self.llm_cache.get_or_create(key, request, self.provider, self.model)
+            else:
+                result = request()
+            result = result.lower()
 
             # 解析结果
             if 'technical' in result or '技术' in result:
@@ -222,7 +281,7 @@ class DocumentClassifier:
 
         except Exception as e:
             print(f"  LLM 分类失败，使用规则分类: {e}")
-            return self._rule_based_classification(content, meta)
+            return self._rule_based_classification(content, meta, features)
 
     def _build_classification_prompt(self, content: str, meta: Dict[str, Any]) -> str:
         """构建分类提示词"""
@@ -243,6 +302,23 @@ class DocumentClassifier:
         return prompt
 
 
+def _record_classification_lookup(hit: bool):
+    with _stats_lock:
+        _classification_stats['hits' if hit else 'misses'] += 1
+
+
+def get_classification_cache_stats() -> Dict[str, Any]:
+    """获取分类结果缓存的命中统计"""
+    with _stats_lock:
+        hits, misses = _classification_stats['hits'], _classification_stats['misses']
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0,
+    }
+
+
 def classify_document(doc, config: Dict[str, Any]) -> Dict[str, Any]:
     """
     分类文档的便捷函数
@@ -255,24 +331,4 @@ def classify_document(doc, config: Dict[str, Any]) -> Dict[str, Any]:
         分类结果
     """
     classifier = DocumentClassifier(config)
-
-    # 准备元数据
-    meta = {
-        'title': doc.title,
-        'code_blocks': len([
-            el for el in doc.elements
-            if hasattr(el, 'type') and
-            (el.type.value if hasattr(el.type, 'value') else str(el.type)) == 'code_block'
-        ]),
-        'headings': [
-            el.content for el in doc.elements
-            if hasattr(el, 'type') and
-            (el.type.value if hasattr(el.type, 'value') else str(el.type)) == 'heading'
-        ],
-        'has_code_examples': any('```' in el.content for el in doc.elements if hasattr(el, 'content'))
-    }
-
-    # 获取文档内容
-    content = '\n'.join(el.content for el in doc.elements if hasattr(el, 'content'))
-
-    return classifier.classify(content, meta)
+    return doc.analysis.get_classification(classifier)
@@ -0,0 +1,83 @@
+"""
+并发限制模块
+进程内共享的并发信号量（LLM 提供商、图片来源等）：同一名称在进程内只有一个信号量，
+Web 服务器的多个请求共同受限。协程通过 acquire_shared 使用同一组上限。
+"""
+
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Tuple
+
+
+# (类别, 名称) -> (并发上限, 信号量)
+_semaphores: Dict[Tuple[str, str], Tuple[int, threading.BoundedSemaphore]] = {}
+_semaphores_lock = threading.Lock()
+
+
+def get_shared_semaphore(kind: str, name: str, limit: int) -> threading.BoundedSemaphore:
+    """
+    获取进程内共享的并发信号量
+
+    上限以首次创建时为准；之后请求不同上限时输出警告并沿用已有的信号量。
+
+    Args:
+        kind: 类别（如 'llm'、'image'），不同类别的同名信号量互不影响
+        name: 名称（LLM 提供商或图片来源）
+        limit: 最大并发数
+
+    Returns:
+        同一 (kind, name) 共享的信号量
+    """
+    limit = max(1, int(limit))
+    with _semaphores_lock:
+        entry = _semaphores.get((kind, name))
+        if entry is None:
+            entry = _semaphores[(kind, name)] = (limit, threading.BoundedSemaphore(limit))
+        elif entry[0] != limit:
+            print(f"  警告: {name} 的并发上限已设为 {entry[0]}，忽略新的上限 {limit}")
+        return entry[1]
+
+
+# 事件循环 -> (类别, 名称) -> asyncio.Semaphore（asyncio.Semaphore 不能跨事件循环使用）
+_loop_semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], asyncio.Semaphore]]' = (
+    weakref.WeakKeyDictionary()
+)
+
+# 等待其他事件循环或线程释放共享名额时的轮询间隔（秒）
+ASYNC_POLL_INTERVAL = 0.05
+
+
+def _get_loop_semaphore(kind: str, name: str) -> asyncio.Semaphore:
+    """获取当前事件循环中 (kind, name) 的信号量，大小取共享上限表中的值"""
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphores = _loop_semaphores.setdefault(loop, {})
+        semaphore = semaphores.get((kind, name))
+        if semaphore is None:
+            semaphore = semaphores[(kind, name)] = asyncio.Semaphore(_semaphores[(kind, name)][0])
+        return semaphore
+
+
+@asynccontextmanager
+async def acquire_shared(kind: str, name: str, limit: int) -> AsyncIterator[None]:
+    """
+    在协程中占用一个共享并发名额（参数与 get_shared_semaphore 相同）
+
+    同一事件循环内的协程在该循环的 asyncio.Semaphore 上排队；
+    同时占用进程内共享的信号量，其他事件循环（如并发的 Web 请求）和线程池任务共同受同一上限限制。
+
+    用法:
+        async with acquire_shared('image', source, limit):
+            ...
+    """
+    shared = get_shared_semaphore(kind, name, limit)
+    async with _get_loop_semaphore(kind, name):
+        # 共享信号量是线程信号量，不能在事件循环中阻塞等待
+        while not shared.acquire(blocking=False):
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            shared.release()
@@ -5,13 +5,17 @@ DALL-E 3 图片生成模块
 
 import os
 import time
-import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
-from datetime import datetime
 
+from multi_image import MultiImageMixin
+from http_session import get_http_session
+from image_download import download_image
+from async_image import AsyncImageMixin
+from async_http import post_json
 
-class DALLEImageGenerator:
+
+class DALLEImageGenerator(MultiImageMixin, AsyncImageMixin):
     """DALL-E 3 图片生成器"""
 
     def __init__(self, config: Dict[str, Any]):
@@ -32,11 +36,17 @@ class DALLEImageGenerator:
         # 确保保存目录存在
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # 获取 API Key
         self.api_key = self.api_config.get('api_key', '') or os.getenv('OPENAI_API_KEY', '')
         if not self.api_key:
             raise ValueError("请设置 OpenAI API Key！在配置文件中设置或通过环境变量 OPENAI_API_KEY 设置")
 
+        # 单次请求最多生成的图片数（DALL-E 3 只支持 n=1，DALL-E 2 最多 10 张）
+        self.max_images_per_request = 1 if self.model == 'dall-e-3' else 10
+
     def generate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
         """
         生成图片
@@ -52,6 +62,75 @@ class DALLEImageGenerator:
         """
         print(f"  正在生成图片 #{index + 1} (DALL-E 3)...")
 
+        try:
+            image_url = self._request_images(prompt, 1)[0]
+            print(f"  生成成功！URL: {image_url}")
+
+            return self._save_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  生成失败: {e}")
+            raise
+
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """异步生成图片（参数与 generate 相同）"""
+        print(f"  正在生成图片 #{index + 1} (DALL-E 3)...")
+
+        try:
+            url, headers, data = self._build_request(prompt, 1)
+            result = await post_json(url, data, headers=headers)
+            image_url = result['data'][0]['url']
+            print(f"  生成成功！URL: {image_url}")
+
+            return await self._asave_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  生成失败: {e}")
+            raise
+
+    def _generate_multiple(self, prompt: str, count: int, index: int, image_type: str, start_candidate: int) -> List[str]:
+        """一次请求生成多张图片（n=count）"""
+        print(f"  正在生成图片 #{index + 1} ({self.model}, {count} 张)...")
+
+        image_urls = self._request_images(prompt, count)
+        print(f"  生成成功！共 {len(image_urls)} 张")
+
+        return self._save_images(image_urls, index, image_type, start_candidate)
+
+    def _request_images(self, prompt: str, n: int) -> List[str]:
+        """
+        调用图片生成接口
+
+        Args:
+            prompt: 图片生成提示词
+            n: 图片数量
+
+        Returns:
+            图片 URL 列表
+        """
+        url, headers, data = self._build_request(prompt, n)
+        response = self.session.post(url, headers=headers, json=data, timeout=60)
+
+        # 打印详细错误信息
+        if response.status_code != 200:
+            print(f"  API 错误 ({response.status_code}): {response.text}")
+
+        response.raise_for_status()
+        result = response.json()
+
+        return [item['url'] for item in result['data']]
+
+    def _build_request(self, prompt: str, n: int) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        构造图片生成请求
+
+        Args:
+            prompt: 图片生成提示词
+            n: 图片数量
+
+        Returns:
+            (接口地址, 请求头, 请求体)
+        """
         # 清理 prompt - 移除多余空白和换行
         prompt = self._clean_prompt(prompt)
 
@@ -72,29 +151,12 @@ class DALLEImageGenerator:
         data = {
             "model": self.model,
             "prompt": prompt,
-            "n": 1,
+            "n": n,
             "size": self.size,
             "quality": self.quality
         }
 
-        try:
-            response = requests.post(url, headers=headers, json=data, timeout=60)
-
-            # 打印详细错误信息
-            if response.status_code != 200:
-                print(f"  API 错误 ({response.status_code}): {response.text}")
-
-            response.raise_for_status()
-            result = response.json()
-
-            image_url = result['data'][0]['url']
-            print(f"  生成成功！URL: {image_url}")
-
-            return self._save_image(image_url, index, image_type, candidate_index)
-
-        except Exception as e:
-            print(f"  生成失败: {e}")
-            raise
+        return url, headers, data
 
     def _clean_prompt(self, prompt: str) -> str:
         """
@@ -118,19 +180,9 @@ class DALLEImageGenerator:
 
     def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
         """下载并保存图片"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.png"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.png"
-        filepath = self.save_dir / filename
-
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
         print(f"  已保存到: {filepath}")
         return str(filepath)
@@ -5,9 +5,15 @@
 
 import os
 import time
-from typing import Optional, Dict, Any
+import asyncio
+from typing import Optional, Dict, Any, List
 from pathlib import Path
-from datetime import datetime
+
+from multi_image import MultiImageMixin
+from http_session import get_http_session
+from image_download import download_image
+from async_image import AsyncImageMixin
+from async_http import post_json, get_json
 
 try:
     from openai import OpenAI
@@ -15,9 +21,13 @@ except ImportError:
     raise ImportError("请安装 openai 包: pip install openai")
 
 
-class DoubaoImageGenerator:
+class DoubaoImageGenerator(MultiImageMixin, AsyncImageMixin):
     """豆包文生图生成器"""
 
+    DOWNLOAD_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化生成器
@@ -36,6 +46,9 @@ class DoubaoImageGenerator:
         # 确保保存目录存在
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # 获取 API Key
         self.api_key = self.doubao_config.get('api_key', '') or os.getenv('ARK_API_KEY', '') or os.getenv('DOUBAO_API_KEY', '')
 
@@ -48,6 +61,9 @@ class DoubaoImageGenerator:
             api_key=self.api_key
         )
 
+        # 单次请求最多生成的图片数（OpenAI 兼容的 n 参数；接口返回不足时逐张补齐）
+        self.max_images_per_request = max(1, int(self.doubao_config.get('images_per_request', 4)))
+
     def generate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
         """
         生成图片
@@ -63,28 +79,72 @@ class DoubaoImageGenerator:
         """
         print(f"  正在生成图片 #{index + 1} (豆包)...")
 
-        # 清理 prompt
-        prompt = self._clean_prompt(prompt)
-        print(f"  Prompt: {prompt[:100]}...")
+        try:
+            image_url = self._request_images(prompt, 1)[0]
+            print(f"  生成成功！URL: {image_url}")
+
+            return self._save_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  豆包 API 调用失败: {e}")
+            raise
+
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """异步生成图片（SDK 客户端是同步的，直接请求 OpenAI 兼容的 HTTP 接口）"""
+        print(f"  正在生成图片 #{index + 1} (豆包)...")
 
         try:
-            # 使用 OpenAI SDK 的 images.generate 方法
-            response = self.client.images.generate(
-                model=self.model,
-                prompt=prompt,
-                size=self.image_config.get('size', '1024x768'),
-                response_format='url'
+            prompt = self._clean_prompt(prompt)
+            print(f"  Prompt: {prompt[:100]}...")
+
+            result = await post_json(
+                f"{self.base_url.rstrip('/')}/images/generations",
+                {
+                    'model': self.model,
+                    'prompt': prompt,
+                    'size': self.image_config.get('size', '1024x768'),
+                    'response_format': 'url'
+                },
+                headers={'Authorization': f'Bearer {self.api_key}'}
             )
-
-            image_url = response.data[0].url
+            image_url = result['data'][0]['url']
             print(f"  生成成功！URL: {image_url}")
 
-            return self._save_image(image_url, index, image_type, candidate_index)
+            return await self._asave_image(image_url, index, image_type, candidate_index)
 
         except Exception as e:
             print(f"  豆包 API 调用失败: {e}")
             raise
 
+    def _generate_multiple(self, prompt: str, count: int, index: int, image_type: str, start_candidate: int) -> List[str]:
+        """一次请求生成多张图片（n=count）"""
+        print(f"  正在生成图片 #{index + 1} (豆包, {count} 张)...")
+
+        image_urls = self._request_images(prompt, count)
+        print(f"  生成成功！共 {len(image_urls)} 张")
+
+        return self._save_images(image_urls, index, image_type, start_candidate)
+
+    def _request_images(self, prompt: str, n: int) -> List[str]:
+        """调用图片生成接口，返回图片 URL 列表"""
+        # 清理 prompt
+        prompt = self._clean_prompt(prompt)
+        print(f"  Prompt: {prompt[:100]}...")
+
+        # 使用 OpenAI SDK 的 images.generate 方法
+        params = {}
+        if n > 1:
+            params['n'] = n
+        response = self.client.images.generate(
+            model=self.model,
+            prompt=prompt,
+            size=self.image_config.get('size', '1024x768'),
+            response_format='url',
+            **params
+        )
+
+        return [item.url for item in response.data]
+
     def _clean_prompt(self, prompt: str) -> str:
         """清理 prompt"""
         lines = prompt.strip().split('\n')
@@ -93,25 +153,9 @@ class DoubaoImageGenerator:
 
     def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
         """下载并保存图片"""
-        import requests
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.png"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.png"
-        filepath = self.save_dir / filename
-
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
         print(f"  已保存到: {filepath}")
         return str(filepath)
@@ -131,9 +175,13 @@ class DoubaoImageGenerator:
 
 
 # 简化版：使用 replicate 等平台接入 Flux.1
-class FluxImageGenerator:
+class FluxImageGenerator(MultiImageMixin, AsyncImageMixin):
     """Flux.1 图片生成器"""
 
+    DOWNLOAD_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化生成器
@@ -148,6 +196,9 @@ class FluxImageGenerator:
         self.save_dir = Path(self.image_config.get('save_dir', 'output/images'))
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # 获取 API Key
         self.api_key = self.flux_config.get('api_key', '') or os.getenv('FLUX_API_KEY', '')
         self.api_base = self.flux_config.get('api_base', 'https://api.replicate.com/v1/predictions')
@@ -155,6 +206,10 @@ class FluxImageGenerator:
         if not self.api_key:
             raise ValueError("请设置 Flux API Key！可在 replicate.com 或其他平台获取")
 
+        # 单次请求最多生成的图片数（num_outputs；flux-1-pro 不支持多张）
+        default_outputs = 1 if 'pro' in self.model else 4
+        self.max_images_per_request = max(1, int(self.flux_config.get('num_outputs', default_outputs)))
+
     def generate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
         """
         生成图片
@@ -170,6 +225,65 @@ class FluxImageGenerator:
         """
         print(f"  正在生成图片 #{index + 1} (Flux.1)...")
 
+        try:
+            image_url = self._request_images(prompt, 1)[0]
+            print(f"  生成成功！URL: {image_url}")
+
+            return self._save_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  生成失败: {e}")
+            raise
+
+    def _generate_multiple(self, prompt: str, count: int, index: int, image_type: str, start_candidate: int) -> List[str]:
+        """一次预测生成多张图片（num_outputs=count）"""
+        print(f"  正在生成图片 #{index + 1} (Flux.1, {count} 张)...")
+
+        image_urls = self._request_images(prompt, count)
+        print(f"  生成成功！共 {len(image_urls)} 张")
+
+        return self._save_images(image_urls, index, image_type, start_candidate)
+
+    def _request_images(self, prompt: str, n: int) -> List[str]:
+        """提交预测并等待完成，返回图片 URL 列表"""
+        headers, data = self._build_prediction(prompt, n)
+
+        # 提交任务
+        response = self.session.post(self.api_base, headers=headers, json=data, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+
+        # 获取结果 URL
+        get_url = result.get('urls', {}).get('get')
+        if not get_url:
+            raise Exception("API 返回格式异常")
+
+        # 轮询获取结果
+        return self._output_urls(self._wait_for_result(get_url, headers))
+
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """异步生成图片（轮询等待时不阻塞事件循环）"""
+        print(f"  正在生成图片 #{index + 1} (Flux.1)...")
+
+        try:
+            headers, data = self._build_prediction(prompt, 1)
+            result = await post_json(self.api_base, data, headers=headers)
+
+            get_url = result.get('urls', {}).get('get')
+            if not get_url:
+                raise Exception("API 返回格式异常")
+
+            image_url = self._output_urls(await self._await_result(get_url, headers))[0]
+            print(f"  生成成功！URL: {image_url}")
+
+            return await self._asave_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  生成失败: {e}")
+            raise
+
+    def _build_prediction(self, prompt: str, n: int):
+        """构造预测请求，返回 (请求头, 请求体)"""
         prompt = self._clean_prompt(prompt)
         print(f"  Prompt: {prompt[:100]}...")
 
@@ -187,27 +301,17 @@ class FluxImageGenerator:
                 "height": 768
             }
         }
+        if n > 1:
+            data["input"]["num_outputs"] = n
 
-        try:
-            # 提交任务
-            response = requests.post(self.api_base, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-
-            # 获取结果 URL
-            get_url = result.get('urls', {}).get('get')
-            if not get_url:
-                raise Exception("API 返回格式异常")
+        return headers, data
 
-            # 轮询获取结果
-            image_url = self._wait_for_result(get_url, headers)
-            print(f"  生成成功！URL: {image_url}")
-
-            return self._save_image(image_url, index, image_type, candidate_index)
-
-        except Exception as e:
-            print(f"  生成失败: {e}")
-            raise
+    def _output_urls(self, output) -> List[str]:
+        """解析预测结果（output 可能是单个 URL 或 URL 列表）"""
+        image_urls = [output] if isinstance(output, str) else list(output or [])
+        if not image_urls:
+            raise Exception("API 未返回图片")
+        return image_urls
 
     def _clean_prompt(self, prompt: str) -> str:
         """清理 prompt"""
@@ -220,7 +324,7 @@ class FluxImageGenerator:
         start_time = time.time()
 
         while time.time() - start_time < max_wait:
-            response = requests.get(get_url, headers=headers, timeout=10)
+            response = self.session.get(get_url, headers=headers, timeout=10)
             response.raise_for_status()
             result = response.json()
 
@@ -235,25 +339,29 @@ class FluxImageGenerator:
 
         raise Exception("生成超时")
 
-    def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
-        """下载并保存图片"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.png"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.png"
-        filepath = self.save_dir / filename
+    async def _await_result(self, get_url: str, headers: Dict, max_wait: int = 120):
+        """异步等待任务完成"""
+        start_time = time.time()
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        while time.time() - start_time < max_wait:
+            result = await get_json(get_url, headers=headers)
 
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+            status = result.get('status')
+            if status == 'succeeded':
+                return result.get('output', [])
+            elif status == 'failed':
+                raise Exception(f"Flux.1 生成失败: {result.get('error')}")
+
+            print(f"  等待中... ({int(time.time() - start_time)}s)")
+            await asyncio.sleep(2)
+
+        raise Exception("生成超时")
+
+    def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
+        """下载并保存图片"""
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
         print(f"  已保存到: {filepath}")
         return str(filepath)
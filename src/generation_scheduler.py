@@ -0,0 +1,209 @@
+"""
+图片生成调度器
+在线程池（或 async 模式下的单个事件循环）中并发执行图片生成任务，按图片来源限制并发数，结果按提交顺序返回
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, List, Optional
+
+from async_http import aclose_async_client
+from concurrency import get_shared_semaphore, acquire_shared
+
+
+# 各图片来源的默认并发上限（文生图接口通常有严格的速率限制）
+DEFAULT_SOURCE_CONCURRENCY = {
+    'zhipu': 2,
+    'dalle': 2,
+    'doubao': 2,
+    'unsplash': 4,
+    'pexels': 4,
+    'mermaid': 4,
+}
+
+# 未列出的来源使用的并发上限
+DEFAULT_CONCURRENCY = 2
+
+# 线程池大小
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class GenerationJob:
+    """单个图片生成任务"""
+    generator: Any                  # 图片生成器（提供 generate 方法）
+    prompt: str
+    index: int                      # 配图位置索引
+    image_type: str
+    source: str = 'zhipu'           # 图片来源（用于并发限制）
+    candidate_index: Optional[int] = None  # 批量 / A/B 模式的候选索引（None 表示单张）
+    count: int = 1                  # 图片数量（大于 1 时调用 generate_many，从 candidate_index 开始编号）
+    label: str = ''                 # 进度输出使用的描述
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    def run(self):
+        """
+        调用生成器生成图片
+
+        Returns:
+            图片路径；count 大于 1 时为路径列表
+        """
+        if self.count > 1:
+            return self.generator.generate_many(
+                self.prompt, self.count, self.index, self.image_type,
+                start_candidate=self.candidate_index or 0
+            )
+        if self.candidate_index is None:
+            return self.generator.generate(self.prompt, self.index, self.image_type, **self.kwargs)
+        return self.generator.generate(
+            self.prompt, self.index, self.image_type,
+            candidate_index=self.candidate_index, **self.kwargs
+        )
+
+    async def arun(self):
+        """
+        异步调用生成器生成图片（生成器没有 agenerate 时在线程池中执行 run）
+
+        Returns:
+            与 run 相同
+        """
+        if not hasattr(self.generator, 'agenerate'):
+            return await asyncio.to_thread(self.run)
+
+        if self.count > 1:
+            return await self.generator.agenerate_many(
+                self.prompt, self.count, self.index, self.image_type,
+                start_candidate=self.candidate_index or 0
+            )
+        if self.candidate_index is None:
+            return await self.generator.agenerate(self.prompt, self.index, self.image_type, **self.kwargs)
+        return await self.generator.agenerate(
+            self.prompt, self.index, self.image_type,
+            candidate_index=self.candidate_index, **self.kwargs
+        )
+
+
+class GenerationScheduler:
+    """图片生成调度器"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        初始化调度器
+
+        Args:
+            config: 配置字典（读取 generation 部分）:
+                generation:
+                  mode: thread            # thread（线程池）或 async（单个事件循环）
+                  max_workers: 8          # 线程池大小
+                  concurrency:            # 各来源并发上限
+                    zhipu: 2
+                    dalle: 1
+        """
+        generation_config = (config or {}).get('generation', {})
+        self.mode = generation_config.get('mode', 'thread')
+        self.max_workers = max(1, int(generation_config.get('max_workers', DEFAULT_MAX_WORKERS)))
+        self.source_concurrency = {
+            **DEFAULT_SOURCE_CONCURRENCY,
+            **(generation_config.get('concurrency') or {})
+        }
+        self.default_concurrency = generation_config.get('default_concurrency', DEFAULT_CONCURRENCY)
+
+    def concurrency_for(self, source: str) -> int:
+        """获取图片来源的并发上限"""
+        return max(1, int(self.source_concurrency.get(source, self.default_concurrency)))
+
+    def run(
+        self,
+        jobs: List[GenerationJob],
+        on_done: Optional[Callable[[int, GenerationJob, Optional[str], Optional[Exception]], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        执行所有任务
+
+        单个任务失败不影响其他任务，失败任务的结果为 None。
+
+        Args:
+            jobs: 任务列表
+            on_done: 每个任务完成时的回调 (任务序号, 任务, 结果, 异常)，在调用线程中按完成顺序执行
+
+        Returns:
+            与 jobs 顺序一致的结果列表（图片路径，多图任务为路径列表）
+        """
+        results: List[Optional[str]] = [None] * len(jobs)
+        if not jobs:
+            return results
+
+        def execute(job: GenerationJob) -> str:
+            with get_shared_semaphore('image', job.source, self.concurrency_for(job.source)):
+                return job.run()
+
+        # 单个任务或单线程时直接顺序执行
+        if len(jobs) == 1 or self.max_workers == 1:
+            for n, job in enumerate(jobs):
+                error = None
+                try:
+                    results[n] = execute(job)
+                except Exception as e:
+                    error = e
+                if on_done:
+                    on_done(n, job, results[n], error)
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            futures = {executor.submit(execute, job): n for n, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                n = futures[future]
+                error = None
+                try:
+                    results[n] = future.result()
+                except Exception as e:
+                    error = e
+                if on_done:
+                    on_done(n, jobs[n], results[n], error)
+
+        return results
+
+    def run_async(
+        self,
+        jobs: List[GenerationJob],
+        on_done: Optional[Callable[[int, GenerationJob, Optional[str], Optional[Exception]], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        在新的事件循环中执行所有任务（参数和返回值与 run 相同）
+
+        不能在已运行的事件循环中调用，协程中请直接 await arun。
+        """
+        async def main():
+            try:
+                return await self.arun(jobs, on_done)
+            finally:
+                await aclose_async_client()
+
+        return asyncio.run(main())
+
+    async def arun(
+        self,
+        jobs: List[GenerationJob],
+        on_done: Optional[Callable[[int, GenerationJob, Optional[str], Optional[Exception]], None]] = None
+    ) -> List[Optional[str]]:
+        """
+        在当前事件循环中并发执行所有任务（参数和返回值与 run 相同）
+
+        各来源的并发上限与 run 共享（见 concurrency.acquire_shared），
+        所有请求共享 async_http 的连接池。
+        """
+        results: List[Optional[str]] = [None] * len(jobs)
+
+        async def execute(n: int, job: GenerationJob):
+            error = None
+            async with acquire_shared('image', job.source, self.concurrency_for(job.source)):
+                try:
+                    results[n] = await job.arun()
+                except Exception as e:
+                    error = e
+            if on_done:
+                on_done(n, job, results[n], error)
+
+        await asyncio.gather(*(execute(n, job) for n, job in enumerate(jobs)))
+        return results
@@ -0,0 +1,157 @@
+"""
+共享 HTTP 会话模块
+进程内共享 requests.Session（每个 Web worker 一份），图片生成器的接口请求和图片下载复用按主机划分的长连接池，
+并对幂等请求自动重试
+"""
+
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 默认连接池配置
+DEFAULT_POOL_CONNECTIONS = 10   # 缓存的主机连接池数量
+DEFAULT_POOL_MAXSIZE = 10       # 每个主机保持的最大连接数（不小于生成调度器的线程数）
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+
+# 需要重试的状态码（限流和网关错误）
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 只重试幂等请求：文生图的 POST 重试可能重复生成（重复计费），失败后由生成器自己的重试逻辑处理
+RETRY_METHODS = frozenset(['GET', 'HEAD'])
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR
+) -> requests.Session:
+    """
+    创建带连接池和重试的会话
+
+    Args:
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机的最大连接数
+        max_retries: 最大重试次数（0 表示不重试）
+        backoff_factor: 重试退避系数（第 n 次重试前等待 backoff_factor * 2^(n-1) 秒）
+
+    Returns:
+        requests.Session 实例
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        # 重试用尽时返回最后一次响应，由调用方的 raise_for_status 报错（与不重试时的行为一致）
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session_stats(session: requests.Session) -> Dict[str, Any]:
+    """
+    获取会话的连接复用统计
+
+    统计来自 urllib3 各主机连接池的计数器；超过 pool_connections 被淘汰的主机池不再计入。
+
+    Args:
+        session: 会话
+
+    Returns:
+        {'requests', 'connections', 'reused', 'hosts': {主机: {...}}}
+    """
+    hosts: Dict[str, Dict[str, int]] = {}
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            num_requests = getattr(pool, 'num_requests', 0)
+            num_connections = getattr(pool, 'num_connections', 0)
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'requests': num_requests,
+                'connections': num_connections,
+                'reused': max(0, num_requests - num_connections),
+            }
+
+    total_requests = sum(host['requests'] for host in hosts.values())
+    total_connections = sum(host['connections'] for host in hosts.values())
+    return {
+        'requests': total_requests,
+        'connections': total_connections,
+        'reused': max(0, total_requests - total_connections),
+        'hosts': hosts,
+    }
+
+
+# 共享会话（按配置区分）
+_shared_sessions: Dict[Tuple, requests.Session] = {}
+_shared_lock = threading.Lock()
+
+
+def get_http_session(config: Optional[Dict[str, Any]] = None) -> requests.Session:
+    """
+    获取共享的 HTTP 会话
+
+    Args:
+        config: 配置字典（读取 http 部分）:
+            http:
+              pool_connections: 10
+              pool_maxsize: 10
+              max_retries: 3
+              backoff_factor: 0.5
+
+    Returns:
+        同一配置共享的 requests.Session 实例
+    """
+    http_config = (config or {}).get('http', {})
+    settings = (
+        max(1, int(http_config.get('pool_connections', DEFAULT_POOL_CONNECTIONS))),
+        max(1, int(http_config.get('pool_maxsize', DEFAULT_POOL_MAXSIZE))),
+        max(0, int(http_config.get('max_retries', DEFAULT_MAX_RETRIES))),
+        float(http_config.get('backoff_factor', DEFAULT_BACKOFF_FACTOR)),
+    )
+
+    with _shared_lock:
+        session = _shared_sessions.get(settings)
+        if session is None:
+            session = create_session(*settings)
+            _shared_sessions[settings] = session
+        return session
+
+
+def get_http_session_stats() -> List[Dict[str, Any]]:
+    """获取本进程中所有共享 HTTP 会话的连接复用统计"""
+    with _shared_lock:
+        sessions = list(_shared_sessions.items())
+    return [
+        {
+            'pool_connections': settings[0],
+            'pool_maxsize': settings[1],
+            'max_retries': settings[2],
+            **get_session_stats(session)
+        }
+        for settings, session in sessions
+    ]
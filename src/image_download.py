@@ -0,0 +1,187 @@
+"""
+图片下载模块
+分块流式下载到同目录的临时文件，校验 Content-Length 和图片文件头后原子替换到目标路径，
+每个下载只占用一个分块的内存，中途失败不会留下不完整的图片
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from async_http import get_async_client
+
+
+# 分块大小
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# 图片文件头（用于识别下载到的是否是图片，而不是错误页面）
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+# 识别文件头需要的字节数（WEBP 需要 12 字节）
+SIGNATURE_LENGTH = 12
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """
+    根据文件头识别图片格式
+
+    Args:
+        head: 文件开头的字节
+
+    Returns:
+        图片格式（png / jpeg / gif / webp），无法识别时返回 None
+    """
+    for signature, image_format in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return image_format
+    if len(head) >= 12 and head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def _expected_length(headers) -> Optional[int]:
+    """
+    获取响应声明的内容长度
+
+    响应经过压缩（Content-Encoding）时 Content-Length 是压缩后的长度，与写入的字节数不可比，返回 None
+    """
+    encoding = (headers.get('Content-Encoding') or 'identity').lower()
+    length = headers.get('Content-Length')
+    if encoding != 'identity' or not length:
+        return None
+    try:
+        return int(length)
+    except ValueError:
+        return None
+
+
+class _AtomicImageWriter:
+    """写入临时文件，校验通过后原子替换到目标路径"""
+
+    def __init__(self, filepath: Path, expected_length: Optional[int] = None):
+        """
+        初始化（在目标目录中创建临时文件，保证 os.replace 不跨文件系统）
+
+        Args:
+            filepath: 目标路径
+            expected_length: 期望的字节数（None 表示不校验）
+        """
+        self.filepath = Path(filepath)
+        self.expected_length = expected_length
+        self.written = 0
+        self.head = b''
+
+        fd, self.temp_path = tempfile.mkstemp(
+            dir=self.filepath.parent, prefix=f'.{self.filepath.name}.', suffix='.part'
+        )
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, chunk: bytes):
+        """写入一个分块"""
+        if not chunk:
+            return
+        if len(self.head) < SIGNATURE_LENGTH:
+            self.head += chunk[:SIGNATURE_LENGTH - len(self.head)]
+        self.file.write(chunk)
+        self.written += len(chunk)
+
+    def commit(self) -> Path:
+        """
+        校验并替换到目标路径
+
+        Raises:
+            IOError: 下载的字节数与 Content-Length 不一致
+            ValueError: 内容不是可识别的图片
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+        if self.expected_length is not None and self.written != self.expected_length:
+            raise IOError(f"下载不完整: {self.written}/{self.expected_length} 字节")
+        if detect_image_type(self.head) is None:
+            raise ValueError(f"下载内容不是图片（文件头 {self.head[:8]!r}）")
+
+        os.replace(self.temp_path, self.filepath)
+        return self.filepath
+
+    def abort(self):
+        """放弃写入并删除临时文件"""
+        if not self.file.closed:
+            self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+
+def download_image(
+    session,
+    url: str,
+    filepath: Union[str, Path],
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Path:
+    """
+    流式下载图片到本地
+
+    Args:
+        session: requests.Session（见 http_session.get_http_session）
+        url: 图片地址
+        filepath: 保存路径
+        headers: 额外的请求头
+        timeout: 超时（秒）
+        chunk_size: 分块大小
+
+    Returns:
+        保存路径
+
+    Raises:
+        requests.HTTPError: 响应状态码不是 2xx
+        IOError: 下载不完整
+        ValueError: 内容不是图片
+    """
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+
+        writer = _AtomicImageWriter(filepath, _expected_length(response.headers))
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                writer.write(chunk)
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+
+async def adownload_image(
+    url: str,
+    filepath: Union[str, Path],
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Path:
+    """
+    异步流式下载图片到本地（使用 async_http 的共享客户端，参数与 download_image 相同）
+
+    Returns:
+        保存路径
+    """
+    client = get_async_client()
+    async with client.stream('GET', url, headers=headers) as response:
+        response.raise_for_status()
+
+        writer = _AtomicImageWriter(filepath, _expected_length(response.headers))
+        try:
+            async for chunk in response.aiter_bytes(chunk_size):
+                writer.write(chunk)
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
@@ -5,13 +5,19 @@
 
 import os
 import time
+import asyncio
 import requests
 from typing import Optional, Dict, Any
 from pathlib import Path
-from datetime import datetime
 
+from multi_image import MultiImageMixin
+from http_session import get_http_session
+from image_download import download_image
+from async_image import AsyncImageMixin
+from async_http import post_json
 
-class ImageGenerator:
+
+class ImageGenerator(MultiImageMixin, AsyncImageMixin):
     """图片生成器（使用智谱AI CogView）"""
 
     def __init__(self, config: Dict[str, Any]):
@@ -38,6 +44,9 @@ class ImageGenerator:
         # 确保保存目录存在
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # 检查 API key
         if not self.api_key:
             raise ValueError("请设置智谱AI API Key！在 config/settings.yaml 中配置或通过环境变量 ZHIPUAI_API_KEY 设置")
@@ -73,7 +82,7 @@ class ImageGenerator:
                 print(f"  正在生成图片 #{index + 1} (尝试 {attempt + 1}/{self.max_retries})...")
                 print(f"  Prompt: {prompt[:100]}...")
 
-                response = requests.post(
+                response = self.session.post(
                     self.base_url,
                     headers=headers,
                     json=data,
@@ -111,6 +120,60 @@ class ImageGenerator:
                 else:
                     raise
 
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """
+        异步生成图片（重试机制与 generate 相同，等待时不阻塞事件循环）
+
+        Args:
+            prompt: 图片生成提示词
+            index: 图片索引（用于命名）
+            image_type: 图片类型（用于命名）
+            candidate_index: 候选图索引（批量模式下使用）
+
+        Returns:
+            图片URL或本地路径
+        """
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+        data = {
+            'model': self.model,
+            'prompt': prompt,
+            'size': self.size
+        }
+
+        for attempt in range(self.max_retries):
+            try:
+                print(f"  正在生成图片 #{index + 1} (尝试 {attempt + 1}/{self.max_retries})...")
+
+                result = await post_json(self.base_url, data, headers=headers)
+
+                # 提取图片URL
+                if 'data' in result and len(result['data']) > 0:
+                    image_url = result['data'][0].get('url', '')
+                    if image_url:
+                        print(f"  生成成功！URL: {image_url}")
+
+                        # 下载并保存到本地（失败时返回 URL，与 generate 一致）
+                        try:
+                            return await self._asave_image(image_url, index, image_type, candidate_index)
+                        except Exception as e:
+                            print(f"  保存图片失败: {e}")
+                            return image_url
+
+                raise Exception("API 返回数据格式异常")
+
+            except Exception as e:
+                print(f"  生成失败: {e}")
+                if attempt < self.max_retries - 1:
+                    wait_time = (attempt + 1) * 2
+                    print(f"  等待 {wait_time} 秒后重试...")
+                    await asyncio.sleep(wait_time)
+                else:
+                    raise
+
     def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
         """
         下载并保存图片
@@ -124,20 +187,10 @@ class ImageGenerator:
         Returns:
             本地保存路径
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.png"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.png"
-        filepath = self.save_dir / filename
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
             print(f"  已保存到: {filepath}")
             return str(filepath)
@@ -175,7 +228,7 @@ class ImageGenerator:
 
 
 # 使用 zhipuai SDK 的实现（推荐）
-class ZhipuImageGenerator:
+class ZhipuImageGenerator(MultiImageMixin, AsyncImageMixin):
     """使用官方 SDK 的图片生成器"""
 
     def __init__(self, config: Dict[str, Any]):
@@ -195,6 +248,9 @@ class ZhipuImageGenerator:
         # 确保保存目录存在
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # 导入 SDK
         try:
             from zhipuai import ZhipuAI
@@ -208,8 +264,12 @@ class ZhipuImageGenerator:
         if not api_key:
             raise ValueError("请设置智谱AI API Key！")
 
+        self.api_key = api_key
         self.client = ZhipuAI(api_key=api_key)
 
+    # SDK 没有异步接口，异步调用直接请求 HTTP 接口
+    ASYNC_API_URL = 'https://open.bigmodel.cn/api/paas/v4/images/generations'
+
     def generate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
         """
         生成图片
@@ -243,23 +303,31 @@ class ZhipuImageGenerator:
             print(f"  生成失败: {e}")
             raise
 
-    def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
-        """下载并保存图片"""
-        import requests
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """异步生成图片"""
+        print(f"  正在生成图片 #{index + 1}...")
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.png"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.png"
-        filepath = self.save_dir / filename
+        try:
+            result = await post_json(
+                self.ASYNC_API_URL,
+                {'model': self.model, 'prompt': prompt, 'size': self.size},
+                headers={'Authorization': f'Bearer {self.api_key}'}
+            )
+
+            image_url = result['data'][0]['url']
+            print(f"  生成成功！URL: {image_url}")
 
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+            return await self._asave_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  生成失败: {e}")
+            raise
+
+    def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
+        """下载并保存图片"""
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
         print(f"  已保存到: {filepath}")
         return str(filepath)
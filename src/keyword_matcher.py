@@ -0,0 +1,246 @@
+"""
+关键词匹配模块
+集中管理分析器、分类器和 Mermaid 生成器使用的关键词表，导入时预编译匹配器供各处共享
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+# ============================================================================
+# 关键词表
+# ============================================================================
+
+# 内容分析器
+ANALYZER_KEYWORDS = {
+    # 技术关键词（用于判断是否是技术类文章）
+    'tech': [
+        '代码', '编程', '函数', '算法', '数据结构', '架构', 'API',
+        'JavaScript', 'Python', 'Java', 'React', 'Vue', '数据库',
+        'code', 'function', 'algorithm', 'architecture', 'programming'
+    ],
+    # 概念类关键词（适合生成概念图）
+    'concept': [
+        '原理', '机制', '概念', '流程', '工作原理', '是什么',
+        'principle', 'mechanism', 'concept', 'how it works'
+    ],
+    # 数据类关键词（适合生成图表）
+    'data': [
+        '数据', '统计', '分析', '增长', '占比', '趋势',
+        'data', 'statistics', 'analysis', 'growth', 'percentage'
+    ],
+}
+
+# 文档分类器
+CLASSIFIER_KEYWORDS = {
+    # 技术关键词
+    'tech': [
+        '代码', '编程', '函数', '算法', '数据结构', '架构', 'API',
+        '框架', '库', '模块', '类', '对象', '变量', '方法',
+        '数据库', '服务器', '客户端', '前端', '后端', '全栈',
+        '部署', '配置', '环境', '依赖', '安装',
+        # 英文技术词汇
+        'code', 'function', 'algorithm', 'data structure', 'API',
+        'framework', 'library', 'module', 'class', 'object', 'variable',
+        'database', 'server', 'client', 'frontend', 'backend', 'fullstack',
+        'deploy', 'config', 'environment', 'dependency', 'install',
+        'git', 'commit', 'push', 'pull', 'clone', 'branch', 'merge',
+        'http', 'https', 'url', 'endpoint', 'request', 'response',
+        'json', 'xml', 'html', 'css', 'javascript', 'python', 'java',
+        'react', 'vue', 'angular', 'node', 'express', 'django', 'flask',
+        'docker', 'kubernetes', 'linux', 'ubuntu', 'windows', 'mac',
+    ],
+    # 流程相关关键词
+    'process': [
+        '流程', '步骤', '阶段', '过程', '循环', '判断', '条件',
+        '输入', '输出', '开始', '结束', '返回', '调用',
+        'flow', 'process', 'step', 'stage', 'loop', 'condition',
+        'input', 'output', 'start', 'end', 'return', 'call',
+    ],
+}
+
+# Mermaid 图表类型（顺序即优先级）
+MERMAID_DIAGRAM_KEYWORDS = {
+    'sequence': ['api', '接口', '请求', '响应', '调用', 'request', 'response', '时序', '序列'],
+    'class': ['类', '继承', '接口', '实现', 'class', 'interface', 'extends', 'implements'],
+    'state': ['状态', '转换', 'state', 'status', '机'],
+    'er': ['数据库', '表', '关系', 'database', 'table', 'relation', '实体'],
+    'mindmap': ['结构', '知识', '概念', '思维', 'structure', 'knowledge', 'concept'],
+    'gantt': ['时间', '计划', '进度', 'timeline', 'schedule', 'plan'],
+}
+
+# Mermaid 各图表策略内部的模板选择
+MERMAID_STRATEGY_KEYWORDS = {
+    # 流程图：条件 / 判断
+    'condition': ['如果', '否则', '判断', '验证', '检查', '当', 'whether', 'if', 'check'],
+    # 流程图：循环
+    'loop': ['循环', '重复', '直到', 'while', 'loop', 'repeat'],
+    # 时序图：API 调用
+    'api': ['api', '接口', '请求', '响应', '调用', 'request', 'response'],
+    # 类图：继承
+    'inheritance': ['继承', 'extends', 'parent', 'child'],
+    # 类图：接口实现
+    'interface': ['接口', 'interface', 'implements'],
+}
+
+# 关键词组：名称 -> (关键词表, 是否区分大小写)
+KEYWORD_GROUPS = {
+    'analyzer': (ANALYZER_KEYWORDS, True),
+    'classifier': (CLASSIFIER_KEYWORDS, False),
+    'mermaid': (MERMAID_DIAGRAM_KEYWORDS, False),
+    'mermaid_strategy': (MERMAID_STRATEGY_KEYWORDS, False),
+}
+
+
+# ============================================================================
+# 匹配器
+# ============================================================================
+
+class KeywordMatcher:
+    """
+    多关键词匹配器
+
+    构建时完成关键词规范化、去重和正则预编译：
+    - 存在性判断：每个类别一个预编译的正则分支，一次扫描即可判断是否出现任一关键词
+    - 计数：与 str.count 的语义一致（每个关键词各自统计不重叠出现次数），
+      同一关键词在表中重复出现时按重复次数计入类别总数；
+      每个不同的关键词只扫描一次，文本只做一次大小写转换。
+
+    说明：CPython 中纯 Python 实现的 Aho-Corasick 自动机需要逐字符解释执行，
+    在 1MB 文档上比逐个关键词调用 C 实现的 str.count 慢约 3 倍，因此计数仍使用 str.count。
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], case_sensitive: bool = True):
+        """
+        初始化匹配器
+
+        Args:
+            categories: 类别名 -> 关键词列表（类别顺序即 first_category 的优先级）
+            case_sensitive: 是否区分大小写（不区分时文本和关键词都转为小写）
+        """
+        self.case_sensitive = case_sensitive
+
+        self.categories: Dict[str, Tuple[str, ...]] = {
+            name: tuple(self._normalize(keyword) for keyword in keywords if keyword)
+            for name, keywords in categories.items()
+        }
+
+        # 每个类别去重后的 (关键词, 在表中出现的次数)
+        self._weighted: Dict[str, Tuple[Tuple[str, int], ...]] = {
+            name: tuple(Counter(keywords).items())
+            for name, keywords in self.categories.items()
+        }
+
+        # 所有类别中不重复的关键词
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(
+            keyword for keywords in self.categories.values() for keyword in keywords
+        ))
+
+        # 每个类别一个正则分支（长关键词在前）
+        self._patterns: Dict[str, re.Pattern] = {
+            name: self._compile(keywords) for name, keywords in self.categories.items()
+        }
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    @staticmethod
+    def _compile(keywords: Iterable[str]) -> re.Pattern:
+        unique = sorted(set(keywords), key=len, reverse=True)
+        if not unique:
+            # 空类别：永远不匹配
+            return re.compile(r'(?!)')
+        return re.compile('|'.join(map(re.escape, unique)))
+
+    def contains(self, text: str, category: str) -> bool:
+        """文本中是否出现该类别的任一关键词"""
+        return self._patterns[category].search(self._normalize(text)) is not None
+
+    def first_category(self, text: str) -> Optional[str]:
+        """按类别顺序返回第一个命中的类别，都没有命中时返回 None"""
+        text = self._normalize(text)
+        for name, pattern in self._patterns.items():
+            if pattern.search(text):
+                return name
+        return None
+
+    def matched_categories(self, text: str) -> List[str]:
+        """返回所有命中的类别（按类别顺序）"""
+        text = self._normalize(text)
+        return [name for name, pattern in self._patterns.items() if pattern.search(text)]
+
+    def count_keywords(self, text: str) -> Dict[str, int]:
+        """
+        统计每个关键词的出现次数（不重叠，与 str.count 一致）
+
+        Returns:
+            关键词（规范化后）-> 出现次数
+        """
+        text = self._normalize(text)
+        return {keyword: text.count(keyword) for keyword in self.keywords}
+
+    def count_categories(self, text: str, keyword_counts: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        统计每个类别的关键词总出现次数
+
+        Args:
+            text: 文本
+            keyword_counts: 已统计好的关键词次数（提供时不再扫描文本）
+
+        Returns:
+            类别名 -> 出现次数总和
+        """
+        if keyword_counts is None:
+            keyword_counts = self.count_keywords(text)
+        return {
+            name: sum(keyword_counts.get(keyword, 0) * repeat for keyword, repeat in weighted)
+            for name, weighted in self._weighted.items()
+        }
+
+
+# ============================================================================
+# 共享实例
+# ============================================================================
+
+# 导入时按内置关键词表构建
+DEFAULT_MATCHERS: Dict[str, KeywordMatcher] = {
+    group: KeywordMatcher(table, case_sensitive=case_sensitive)
+    for group, (table, case_sensitive) in KEYWORD_GROUPS.items()
+}
+
+# 带配置覆盖的匹配器缓存
+_override_matchers: Dict[Tuple, KeywordMatcher] = {}
+_override_lock = threading.Lock()
+
+
+def get_matcher(group: str, config: Optional[Dict[str, Any]] = None) -> KeywordMatcher:
+    """
+    获取关键词匹配器
+
+    配置中的 keywords.<group>.<category> 列表会追加到内置关键词表，
+    相同的覆盖配置只构建一次。
+
+    Args:
+        group: 关键词组（analyzer, classifier, mermaid, mermaid_strategy）
+        config: 配置字典
+
+    Returns:
+        KeywordMatcher 实例
+    """
+    overrides = (config or {}).get('keywords', {}).get(group)
+    if not overrides:
+        return DEFAULT_MATCHERS[group]
+
+    key = (group, tuple(sorted((name, tuple(words)) for name, words in overrides.items())))
+    with _override_lock:
+        matcher = _override_matchers.get(key)
+        if matcher is None:
+            table, case_sensitive = KEYWORD_GROUPS[group]
+            merged = {name: list(words) for name, words in table.items()}
+            for name, words in overrides.items():
+                merged.setdefault(name, []).extend(words)
+            matcher = KeywordMatcher(merged, case_sensitive=case_sensitive)
+            _override_matchers[key] = matcher
+        return matcher
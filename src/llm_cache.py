@@ -0,0 +1,368 @@
+"""
+LLM 响应缓存模块
+按请求内容哈希持久化 LLM 响应（SQLite），相同的请求跨运行、跨用户直接复用结果
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+
+class LLMCache:
+    """
+    SQLite 持久化的 LLM 响应缓存
+
+    - 缓存键：提供商、模型、系统提示词、用户提示词、max_tokens（及温度）的 SHA-256
+    - 过期：超过 TTL 的条目视为未命中并删除
+    - 淘汰：总大小超过上限时按最近使用时间从旧到新删除（LRU）
+    - 数据库使用 WAL 模式，多进程（如多个 Web worker）可以共享同一个缓存文件
+    """
+
+    def __init__(
+        self,
+        path: str = '.cache/llm.sqlite3',
+        ttl_seconds: Optional[float] = 30 * 24 * 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        bypass: bool = False
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 数据库文件路径
+            ttl_seconds: 条目有效期（None 表示永不过期）
+            max_bytes: 缓存响应的总字节数上限
+            bypass: 为 True 时不读取缓存（总是请求 LLM），但仍写入新结果
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes: Optional[int] = None
+
+        # 数据库无法打开（如目录只读）时禁用缓存，之后的读取都视为未命中
+        self.disabled = False
+
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'expired': 0, 'evictions': 0, 'bypassed': 0}
+
+    # ------------------------------------------------------------------
+    # 缓存键
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        max_tokens: int,
+        temperature: Optional[float] = None
+    ) -> str:
+        """
+        生成缓存键
+
+        Args:
+            provider: LLM 提供商
+            model: 模型名称
+            system_prompt: 系统提示词
+            prompt: 用户提示词
+            max_tokens: 最大生成 token 数
+            temperature: 采样温度
+
+        Returns:
+            十六进制 SHA-256
+        """
+        payload = json.dumps(
+            [provider, model, system_prompt or '', prompt, max_tokens, temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存
+
+        Returns:
+            缓存的响应，未命中、已过期或 bypass 时返回 None
+        """
+        now = time.time()
+        with self._lock:
+            if self.bypass:
+                self.stats['bypassed'] += 1
+                return None
+            if self.disabled:
+                self.stats['misses'] += 1
+                return None
+
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    'SELECT response, created_at FROM llm_cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats['misses'] += 1
+                    return None
+
+                response, created_at = row
+                if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                    conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                    conn.commit()
+                    self._total_bytes = None
+                    self.stats['expired'] += 1
+                    self.stats['misses'] += 1
+                    return None
+
+                conn.execute('UPDATE llm_cache SET last_used = ? WHERE key = ?', (now, key))
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                print(f"警告: 读取 LLM 缓存失败: {e}")
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+        return response
+
+    def put(self, key: str, response: str, provider: str = '', model: str = ''):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            response: LLM 响应
+            provider: LLM 提供商（仅用于统计和排查）
+            model: 模型名称
+        """
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            if self.disabled:
+                return
+            try:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, response, provider, model, size, created_at, last_used) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, response, provider, model, size, now, now)
+                )
+                conn.commit()
+                self.stats['writes'] += 1
+
+                if self._total_bytes is None:
+                    self._total_bytes = self._query_total_bytes(conn)
+                else:
+                    self._total_bytes += size
+
+                if self._total_bytes > self.max_bytes:
+                    self._evict(conn)
+            except (sqlite3.Error, OSError) as e:
+                print(f"警告: 写入 LLM 缓存失败: {e}")
+
+    def get_or_create(
+        self,
+        key: str,
+        generate: Callable[[], str],
+        provider: str = '',
+        model: str = ''
+    ) -> str:
+        """
+        读取缓存，未命中时调用 generate 生成并写入（空结果不缓存）
+
+        Args:
+            key: 缓存键
+            generate: 生成函数（调用 LLM）
+            provider: LLM 提供商
+            model: 模型名称
+
+        Returns:
+            LLM 响应
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        response = generate()
+        if response:
+            self.put(key, response, provider, model)
+        return response
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            if self.disabled:
+                return
+            try:
+                conn = self._connect()
+                conn.execute('DELETE FROM llm_cache')
+                conn.commit()
+                self._total_bytes = 0
+            except (sqlite3.Error, OSError) as e:
+                print(f"警告: 清空 LLM 缓存失败: {e}")
+
+    def purge_expired(self) -> int:
+        """
+        删除所有过期条目
+
+        Returns:
+            删除的条目数
+        """
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            if self.disabled:
+                return 0
+            try:
+                conn = self._connect()
+                cursor = conn.execute(
+                    'DELETE FROM llm_cache WHERE created_at < ?', (time.time() - self.ttl_seconds,)
+                )
+                conn.commit()
+                self._total_bytes = None
+                self.stats['expired'] += cursor.rowcount
+                return cursor.rowcount
+            except (sqlite3.Error, OSError) as e:
+                print(f"警告: 清理 LLM 缓存失败: {e}")
+                return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        entries, total_bytes = 0, 0
+        with self._lock:
+            stats = dict(self.stats)
+            if not self.disabled:
+                try:
+                    conn = self._connect()
+                    entries, total_bytes = conn.execute(
+                        'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache'
+                    ).fetchone()
+                except (sqlite3.Error, OSError):
+                    pass
+        lookups = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'hit_rate': stats['hits'] / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': total_bytes,
+            'max_bytes': self.max_bytes,
+            'path': str(self.path),
+            'bypass': self.bypass,
+            'disabled': self.disabled,
+        }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开数据库（首次使用时创建表），调用方需持有 self._lock
+
+        打开失败时禁用缓存并抛出异常（之后不再尝试）
+        """
+        if self._conn is None:
+            conn = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS llm_cache ('
+                    'key TEXT PRIMARY KEY, response TEXT NOT NULL, provider TEXT, model TEXT, '
+                    'size INTEGER NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)'
+                )
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)')
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                if conn is not None:
+                    conn.close()
+                self.disabled = True
+                print(f"警告: 无法打开 LLM 缓存 {self.path}，已禁用缓存: {e}")
+                raise
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _query_total_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection):
+        """先删除过期条目，仍超出上限时按最近使用时间从旧到新删除"""
+        if self.ttl_seconds is not None:
+            cursor = conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (time.time() - self.ttl_seconds,))
+            self.stats['expired'] += cursor.rowcount
+
+        # 其他进程也可能写入，以数据库中的实际大小为准
+        total = self._query_total_bytes(conn)
+        if total > self.max_bytes:
+            evicted = 0
+            for key, size in conn.execute('SELECT key, size FROM llm_cache ORDER BY last_used').fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                total -= size
+                evicted += 1
+            self.stats['evictions'] += evicted
+        conn.commit()
+        self._total_bytes = total
+
+
+# 共享缓存实例（按配置区分）
+_shared_caches: Dict[Tuple, LLMCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache(config: Optional[Dict[str, Any]] = None) -> Optional[LLMCache]:
+    """
+    获取共享的 LLM 缓存实例
+
+    Args:
+        config: 配置字典（读取 llm_cache 部分）
+
+    Returns:
+        LLMCache 实例，配置禁用时返回 None
+    """
+    cache_config = (config or {}).get('llm_cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+
+    ttl_hours = cache_config.get('ttl_hours', 30 * 24)
+    settings = (
+        os.path.abspath(cache_config.get('path', '.cache/llm.sqlite3')),
+        ttl_hours * 3600 if ttl_hours else None,
+        int(cache_config.get('max_mb', 64) * 1024 * 1024),
+        bool(cache_config.get('bypass', False)),
+    )
+
+    with _shared_lock:
+        cache = _shared_caches.get(settings)
+        if cache is None:
+            cache = LLMCache(
+                path=settings[0],
+                ttl_seconds=settings[1],
+                max_bytes=settings[2],
+                bypass=settings[3]
+            )
+            _shared_caches[settings] = cache
+        return cache
+
+
+def get_llm_cache_stats() -> List[Dict[str, Any]]:
+    """获取本进程中所有共享 LLM 缓存的统计信息"""
+    with _shared_lock:
+        caches = list(_shared_caches.values())
+    return [cache.get_stats() for cache in caches]
@@ -4,22 +4,93 @@ LLM 客户端模块
 """
 
 import os
-from typing import Optional, Dict, Any, List
+import json
+import asyncio
+import re
+from typing import Optional, Dict, Any, List, Tuple
 from abc import ABC, abstractmethod
 
+from llm_cache import get_llm_cache
+from async_http import post_json
+
 
 class LLMProvider(ABC):
     """LLM 提供商基类"""
 
     @abstractmethod
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 200) -> str:
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
         """生成文本"""
         pass
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
+        """
+        异步生成文本
+
+        默认在线程池中执行同步的 generate；支持 OpenAI 兼容接口的子类直接通过共享的异步 HTTP 客户端请求
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt, max_tokens, temperature)
+
+
+async def _achat_completion(
+    base_url: str,
+    api_key: str,
+    model: str,
+    prompt: str,
+    system_prompt: Optional[str],
+    max_tokens: int,
+    temperature: float = 0.7
+) -> str:
+    """
+    异步调用 OpenAI 兼容的 chat/completions 接口
+
+    Args:
+        base_url: 接口根地址（如 https://api.openai.com/v1）
+        api_key: API Key
+        model: 模型名称
+        prompt: 用户提示词
+        system_prompt: 系统提示词
+        max_tokens: 最大生成 token 数
+        temperature: 采样温度
+
+    Returns:
+        生成的文本
+    """
+    messages = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": prompt})
+
+    data = await post_json(
+        f"{base_url.rstrip('/')}/chat/completions",
+        {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        },
+        headers={"Authorization": f"Bearer {api_key}"}
+    )
+    return data['choices'][0]['message']['content'].strip()
+
 
 class ZhipuLLM(LLMProvider):
     """智谱 GLM LLM"""
 
+    # OpenAI 兼容接口（用于异步调用）
+    BASE_URL = "https://open.bigmodel.cn/api/paas/v4"
+
     def __init__(self, api_key: str, model: str = "glm-4-flash"):
         self.api_key = api_key
         self.model = model
@@ -30,7 +101,13 @@ class ZhipuLLM(LLMProvider):
         except ImportError:
             raise ImportError("请安装 zhipuai 包: pip install zhipuai")
 
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 200) -> str:
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
         """生成文本"""
         messages = []
         if system_prompt:
@@ -41,11 +118,23 @@ class ZhipuLLM(LLMProvider):
             model=self.model,
             messages=messages,
             max_tokens=max_tokens,
-            temperature=0.7
+            temperature=temperature
         )
 
         return response.choices[0].message.content.strip()
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
+        """异步生成文本"""
+        return await _achat_completion(
+            self.BASE_URL, self.api_key, self.model, prompt, system_prompt, max_tokens, temperature
+        )
+
 
 class DeepSeekLLM(LLMProvider):
     """DeepSeek LLM (OpenAI 兼容)"""
@@ -61,7 +150,13 @@ class DeepSeekLLM(LLMProvider):
         except ImportError:
             raise ImportError("请安装 openai 包: pip install openai")
 
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 200) -> str:
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
         """生成文本"""
         messages = []
         if system_prompt:
@@ -72,15 +167,29 @@ class DeepSeekLLM(LLMProvider):
             model=self.model,
             messages=messages,
             max_tokens=max_tokens,
-            temperature=0.7
+            temperature=temperature
         )
 
         return response.choices[0].message.content.strip()
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
+        """异步生成文本"""
+        return await _achat_completion(
+            self.base_url, self.api_key, self.model, prompt, system_prompt, max_tokens, temperature
+        )
+
 
 class OpenAILLM(LLMProvider):
     """OpenAI LLM"""
 
+    BASE_URL = "https://api.openai.com/v1"
+
     def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
         self.api_key = api_key
         self.model = model
@@ -91,7 +200,13 @@ class OpenAILLM(LLMProvider):
         except ImportError:
             raise ImportError("请安装 openai 包: pip install openai")
 
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 200) -> str:
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
         """生成文本"""
         messages = []
         if system_prompt:
@@ -102,11 +217,23 @@ class OpenAILLM(LLMProvider):
             model=self.model,
             messages=messages,
             max_tokens=max_tokens,
-            temperature=0.7
+            temperature=temperature
         )
 
         return response.choices[0].message.content.strip()
 
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
+        """异步生成文本"""
+        return await _achat_completion(
+            self.BASE_URL, self.api_key, self.model, prompt, system_prompt, max_tokens, temperature
+        )
+
 
 class PromptGenerator:
     """智能提示词生成器"""
@@ -153,6 +280,21 @@ class PromptGenerator:
 5. 只返回描述，不要其他内容""",
     }
 
+    SYSTEM_PROMPT = """你是一个专业的配图提示词生成助手。
+你擅长理解文章内容，提炼核心要点，生成准确的图片描述。
+你的描述会被用于生成配图或图表。
+
+请确保：
+1. 描述准确、简洁
+2. 突出核心内容
+3. 适合可视化展示"""
+
+    # 批量模式：一次请求处理多个任务，要求返回 JSON 数组
+    BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+你会一次收到多个编号的任务，请按编号顺序为每个任务生成一条描述，
+只返回一个 JSON 字符串数组（如 ["描述1", "描述2"]），数组长度必须与任务数相同，不要其他内容。"""
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化提示词生成器
@@ -163,12 +305,23 @@ class PromptGenerator:
         self.llm_config = config.get('llm', {})
         self.enabled = self.llm_config.get('enabled', False)
         self.provider = None
+        self.provider_type = self.llm_config.get('provider', 'zhipu')
+
+        # LLM 响应缓存（相同请求直接复用结果）
+        self.llm_cache = get_llm_cache(config)
+
+        # 批量模式：每次请求最多打包的条目数和输入 token 预算
+        self.max_tokens = self.llm_config.get('max_tokens', 150)
+        self.batch_size = max(1, int(self.llm_config.get('batch_size', 8)))
+        self.batch_token_budget = int(self.llm_config.get('batch_token_budget', 3000))
 
         if self.enabled:
             self._init_llm()
 
     def _init_llm(self):
-        """初始化 LLM 客户端"""
+        """初始化 LLM 客户端（从进程内共享的客户端池获取）"""
+        from llm_pool import get_llm_provider
+
         provider_type = self.llm_config.get('provider', 'zhipu')
 
         if provider_type == 'zhipu':
@@ -176,7 +329,7 @@ class PromptGenerator:
             if not api_key:
                 raise ValueError("请设置智谱 API Key！配置 llm.api_key 或环境变量 ZHIPUAI_API_KEY")
             model = self.llm_config.get('model', 'glm-4-flash')
-            self.provider = ZhipuLLM(api_key, model)
+            self.provider = get_llm_provider('zhipu', api_key, model)
 
         elif provider_type == 'deepseek':
             api_key = self.llm_config.get('api_key') or os.getenv('DEEPSEEK_API_KEY')
@@ -184,14 +337,14 @@ class PromptGenerator:
                 raise ValueError("请设置 DeepSeek API Key！配置 llm.api_key 或环境变量 DEEPSEEK_API_KEY")
             model = self.llm_config.get('model', 'deepseek-chat')
             base_url = self.llm_config.get('base_url', 'https://api.deepseek.com')
-            self.provider = DeepSeekLLM(api_key, model, base_url)
+            self.provider = get_llm_provider('deepseek', api_key, model, base_url)
 
         elif provider_type == 'openai':
             api_key = self.llm_config.get('api_key') or os.getenv('OPENAI_API_KEY')
             if not api_key:
                 raise ValueError("请设置 OpenAI API Key！配置 llm.api_key 或环境变量 OPENAI_API_KEY")
             model = self.llm_config.get('model', 'gpt-4o-mini')
-            self.provider = OpenAILLM(api_key, model)
+            self.provider = get_llm_provider('openai', api_key, model)
 
         else:
             raise ValueError(f"不支持的 LLM 提供商: {provider_type}")
@@ -219,13 +372,77 @@ class PromptGenerator:
         if not self.enabled or self.provider is None:
             return self._fallback_prompt(title, content, image_type)
 
-        # 构建提示词
+        user_prompt = self._build_user_prompt(title, content, image_type, context)
+        system_prompt = self.SYSTEM_PROMPT
+
+        try:
+            # 调用 LLM 生成（优先使用缓存）
+            max_tokens = self.max_tokens
+            if self.llm_cache is not None:
+                key = self._cache_key(user_prompt)
+                result = self.llm_cache.get_or_create(
+                    key,
+                    lambda: self.provider.generate(user_prompt, system_prompt, max_tokens),
+                    self.provider_type,
+                    getattr(self.provider, 'model', '')
+                )
+            else:
+                result = self.provider.generate(user_prompt, system_prompt, max_tokens)
+
+            result = self._clean_result(result)
+            return result if result else self._fallback_prompt(title, content, image_type)
+
+        except Exception as e:
+            print(f"  LLM 生成失败，使用回退方案: {e}")
+            return self._fallback_prompt(title, content, image_type)
+
+    async def agenerate_prompt(
+        self,
+        title: str,
+        content: str,
+        image_type: str,
+        context: Optional[str] = None
+    ) -> str:
+        """
+        异步生成智能提示词（参数和回退行为与 generate_prompt 相同）
+
+        多个调用可以在同一个事件循环中并发执行，例如：
+            prompts = await asyncio.gather(*(generator.agenerate_prompt(**item) for item in items))
+        """
+        if not self.enabled or self.provider is None:
+            return self._fallback_prompt(title, content, image_type)
+
+        user_prompt = self._build_user_prompt(title, content, image_type, context)
+
+        try:
+            key = self._cache_key(user_prompt) if self.llm_cache is not None else None
+            result = self.llm_cache.get(key) if key else None
+            if result is None:
+                result = await self.provider.agenerate(user_prompt, self.SYSTEM_PROMPT, self.max_tokens)
+                if key and result:
+                    self.llm_cache.put(key, result, self.provider_type, getattr(self.provider, 'model', ''))
+
+            result = self._clean_result(result)
+            return result if result else self._fallback_prompt(title, content, image_type)
+
+        except Exception as e:
+            print(f"  LLM 生成失败，使用回退方案: {e}")
+            return self._fallback_prompt(title, content, image_type)
+
+    def _build_user_prompt(
+        self,
+        title: str,
+        content: str,
+        image_type: str,
+        context: Optional[str] = None
+    ) -> str:
+        """构建单个条目的用户提示词"""
         instruction = self.IMAGE_TYPE_INSTRUCTIONS.get(
             image_type,
             self.IMAGE_TYPE_INSTRUCTIONS['section']
         )
 
-        user_prompt = f"""文章标题：{title}
+        return f"""文章标题：{title}
 
 当前内容：{content[:500]}
 
@@ -233,30 +450,34 @@ class PromptGenerator:
 
 根据以上内容，{instruction}"""
 
-        system_prompt = """你是一个专业的配图提示词生成助手。
-你擅长理解文章内容，提炼核心要点，生成准确的图片描述。
-你的描述会被用于生成配图或图表。
-
-请确保：
-1. 描述准确、简洁
-2. 突出核心内容
-3. 适合可视化展示"""
-
-        try:
-            # 调用 LLM 生成
-            max_tokens = self.llm_config.get('max_tokens', 150)
-            result = self.provider.generate(user_prompt, system_prompt, max_tokens)
-
-            # 清理结果
-            result = result.strip()
-            # 移除可能的引号
-            result = result.strip('"').strip("'").strip('""').strip("''")
+    def _cache_key(self, user_prompt: str, batch: bool = False) -> str:
+        """
+        单个条目的缓存键
 
-            return result if result else self._fallback_prompt(title, content, image_type)
+        批量模式解析出的结果使用单独的键（batch=True，按 BATCH_SYSTEM_PROMPT 区分），
+        不会被 generate_prompt 当作单条请求的结果返回
+        """
+        model = getattr(self.provider, 'model', '')
+        system_prompt = self.BATCH_SYSTEM_PROMPT if batch else self.SYSTEM_PROMPT
+        return self.llm_cache.make_key(
+            self.provider_type, model, system_prompt, user_prompt, self.max_tokens, 0.7
+        )
 
-        except Exception as e:
-            print(f"  LLM 生成失败，使用回退方案: {e}")
-            return self._fallback_prompt(title, content, image_type)
+    def _get_cached_item(self, user_prompt: str) -> str:
+        """查找批量条目的缓存（单条请求的结果优先，其次是批量结果），未命中返回空字符串"""
+        if self.llm_cache is None:
+            return ''
+        cached = self.llm_cache.get(self._cache_key(user_prompt))
+        if not cached:
+            cached = self.llm_cache.get(self._cache_key(user_prompt, batch=True))
+        return self._clean_result(cached) if cached else ''
+
+    @staticmethod
+    def _clean_result(result: str) -> str:
+        """清理 LLM 返回的描述"""
+        result = result.strip()
+        # 移除可能的引号
+        return result.strip('"').strip("'").strip('""').strip("''")
 
     def _fallback_prompt(self, title: str, content: str, image_type: str) -> str:
         """回退方案：使用简单规则生成提示词"""
@@ -276,32 +497,146 @@ class PromptGenerator:
         """
         批量生成提示词
 
+        将多个条目打包进一次请求（要求 LLM 返回 JSON 数组），每包的条目数不超过 llm.batch_size，
+        输入 token 估算不超过 llm.batch_token_budget。已缓存的条目不再请求；
+        某一包的返回无法解析时，该包内的条目逐个单独生成。
+
         Args:
             items: 包含 title, content, image_type, context 的字典列表
 
         Returns:
-            提示词列表
+            提示词列表（与 items 一一对应）
         """
-        results = []
+        if not self.enabled or self.provider is None:
+            return [self._fallback_item(item) for item in items]
+
+        results: List[Optional[str]] = [None] * len(items)
+        pending = []  # (索引, 用户提示词)
         for i, item in enumerate(items):
-            try:
-                prompt = self.generate_prompt(
-                    title=item.get('title', ''),
-                    content=item.get('content', ''),
-                    image_type=item.get('image_type', 'section'),
-                    context=item.get('context')
+            user_prompt = self._build_user_prompt(
+                item.get('title', ''),
+                item.get('content', ''),
+                item.get('image_type', 'section'),
+                item.get('context')
+            )
+            cached = self._get_cached_item(user_prompt)
+            if cached:
+                results[i] = cached
+            else:
+                pending.append((i, user_prompt))
+
+        packs = self._pack_items(pending)
+        if pending:
+            print(f"  LLM 批量生成: {len(pending)} 条，共 {len(packs)} 次请求"
+                  f"（{len(items) - len(pending)} 条来自缓存）")
+
+        for pack_no, pack in enumerate(packs):
+            generated = self._generate_pack(pack) if len(pack) > 1 else None
+
+            for n, (i, user_prompt) in enumerate(pack):
+                if generated is not None and generated[n]:
+                    results[i] = generated[n]
+                    continue
+                # 单独生成（单条打包或批量结果解析失败）
+                try:
+                    item = items[i]
+                    results[i] = self.generate_prompt(
+                        title=item.get('title', ''),
+                        content=item.get('content', ''),
+                        image_type=item.get('image_type', 'section'),
+                        context=item.get('context')
+                    )
+                except Exception as e:
+                    print(f"  第 {i + 1} 个提示词生成失败: {e}")
+                    results[i] = self._fallback_item(items[i])
+
+            print(f"  LLM 生成进度: {pack_no + 1}/{len(packs)}")
+
+        return results
+
+    def _pack_items(self, pending: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """按条目数和 token 预算把待生成条目分包（保持原顺序）"""
+        packs: List[List[Tuple[int, str]]] = []
+        current: List[Tuple[int, str]] = []
+        current_tokens = 0
+        for entry in pending:
+            tokens = self._estimate_tokens(entry[1])
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.batch_token_budget):
+                packs.append(current)
+                current, current_tokens = [], 0
+            current.append(entry)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """粗略估算 token 数（中文约 1 字 1 token，ASCII 约 4 字符 1 token）"""
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        return len(text) - ascii_chars + ascii_chars // 4 + 1
+
+    def _generate_pack(self, pack: List[Tuple[int, str]]) -> Optional[List[str]]:
+        """
+        一次请求生成一包条目
+
+        Returns:
+            与 pack 对应的描述列表（单条为空表示该条需要单独生成），请求或解析失败时返回 None
+        """
+        tasks = '\n\n'.join(
+            f"### 任务 {n + 1}\n{user_prompt}" for n, (_, user_prompt) in enumerate(pack)
+        )
+        batch_prompt = f"""以下共 {len(pack)} 个任务，请按顺序分别完成。
+
+{tasks}
+
+请返回包含 {len(pack)} 个字符串的 JSON 数组。"""
+
+        try:
+            response = self.provider.generate(batch_prompt, self.BATCH_SYSTEM_PROMPT, self.max_tokens * len(pack))
+        except Exception as e:
+            print(f"  LLM 批量生成失败，改为逐条生成: {e}")
+            return None
+
+        parsed = self._parse_batch_response(response, len(pack))
+        if parsed is None:
+            print(f"  LLM 批量结果无法解析，改为逐条生成 {len(pack)} 条")
+            return None
+
+        results = []
+        for (_, user_prompt), text in zip(pack, parsed):
+            text = self._clean_result(text)
+            if text and self.llm_cache is not None:
+                self.llm_cache.put(
+                    self._cache_key(user_prompt, batch=True), text,
+                    self.provider_type, getattr(self.provider, 'model', '')
                 )
-                results.append(prompt)
-                print(f"  LLM 生成进度: {i + 1}/{len(items)}")
-            except Exception as e:
-                print(f"  第 {i + 1} 个提示词生成失败: {e}")
-                results.append(self._fallback_prompt(
-                    item.get('title', ''),
-                    item.get('content', ''),
-                    item.get('image_type', 'section')
-                ))
+            results.append(text)
         return results
 
+    @staticmethod
+    def _parse_batch_response(response: str, expected: int) -> Optional[List[str]]:
+        """解析批量返回的 JSON 数组，格式或长度不符时返回 None"""
+        # 去掉可能的 Markdown 代码块标记，取第一个 [ 到最后一个 ] 之间的内容
+        text = re.sub(r'^```(?:json)?\s*|\s*```$', '', response.strip())
+        start, end = text.find('['), text.rfind(']')
+        if start == -1 or end <= start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(data, list) or len(data) != expected:
+            return None
+        return [item if isinstance(item, str) else '' for item in data]
+
+    def _fallback_item(self, item: Dict[str, str]) -> str:
+        return self._fallback_prompt(
+            item.get('title', ''),
+            item.get('content', ''),
+            item.get('image_type', 'section')
+        )
+
 
 # 便捷函数
 def create_prompt_generator(config: Dict[str, Any]) -> PromptGenerator:
@@ -0,0 +1,241 @@
+"""
+LLM 客户端池
+进程内共享 LLM 提供商客户端（每个 Web worker 一份），相同配置的请求复用同一个 SDK 客户端及其长连接
+"""
+
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from llm_client import LLMProvider, ZhipuLLM, DeepSeekLLM, OpenAILLM
+
+
+# 提供商名称 -> 客户端类
+PROVIDER_CLASSES = {
+    'zhipu': ZhipuLLM,
+    'deepseek': DeepSeekLLM,
+    'openai': OpenAILLM,
+}
+
+# 连续失败达到该次数后，下次获取时重建客户端
+DEFAULT_MAX_FAILURES = 3
+
+
+class PooledLLM(LLMProvider):
+    """
+    池中的 LLM 客户端
+
+    调用委托给底层提供商，同时记录使用次数和失败次数，供客户端池判断是否需要重建
+    """
+
+    def __init__(self, key: Tuple, provider: LLMProvider):
+        """
+        初始化
+
+        Args:
+            key: 池中的键 (provider, model, base_url, api_key 哈希)
+            provider: 底层提供商客户端
+        """
+        self.key = key
+        self.provider = provider
+        self.model = getattr(provider, 'model', '')
+
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self._lock = threading.Lock()
+
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
+        """生成文本"""
+        self._start()
+        try:
+            result = self.provider.generate(prompt, system_prompt, max_tokens, temperature)
+        except Exception:
+            self._finish(False)
+            raise
+        self._finish(True)
+        return result
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 200,
+        temperature: float = 0.7
+    ) -> str:
+        """异步生成文本"""
+        self._start()
+        try:
+            result = await self.provider.agenerate(prompt, system_prompt, max_tokens, temperature)
+        except Exception:
+            self._finish(False)
+            raise
+        self._finish(True)
+        return result
+
+    def _start(self):
+        with self._lock:
+            self.calls += 1
+            self.last_used = time.time()
+
+    def _finish(self, success: bool):
+        with self._lock:
+            if success:
+                self.consecutive_failures = 0
+            else:
+                self.failures += 1
+                self.consecutive_failures += 1
+
+    def is_healthy(self, max_failures: int = DEFAULT_MAX_FAILURES) -> bool:
+        """
+        健康检查（不发起网络请求）
+
+        底层 SDK 客户端已关闭，或连续失败次数达到上限时视为不健康
+        """
+        if self.consecutive_failures >= max_failures:
+            return False
+
+        client = getattr(self.provider, 'client', None)
+        is_closed = getattr(client, 'is_closed', None)
+        if callable(is_closed):
+            try:
+                is_closed = is_closed()
+            except Exception:
+                is_closed = False
+        return not is_closed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息（不包含 API Key）"""
+        provider, model, base_url, _ = self.key
+        return {
+            'provider': provider,
+            'model': model,
+            'base_url': base_url,
+            'calls': self.calls,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'age_seconds': round(time.time() - self.created_at, 1),
+            'idle_seconds': round(time.time() - self.last_used, 1),
+        }
+
+
+class LLMClientPool:
+    """LLM 客户端池（按提供商、模型、base_url 和 API Key 哈希区分）"""
+
+    def __init__(self, max_failures: int = DEFAULT_MAX_FAILURES):
+        """
+        初始化
+
+        Args:
+            max_failures: 连续失败多少次后重建客户端
+        """
+        self.max_failures = max_failures
+        self._clients: Dict[Tuple, PooledLLM] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'created': 0, 'rebuilt': 0}
+
+    @staticmethod
+    def make_key(provider: str, api_key: str, model: Optional[str] = None, base_url: Optional[str] = None) -> Tuple:
+        """生成池键（API Key 只保存哈希）"""
+        key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        return (provider, model, base_url, key_hash)
+
+    def get(
+        self,
+        provider: str,
+        api_key: str,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None
+    ) -> PooledLLM:
+        """
+        获取客户端，不存在或不健康时创建
+
+        Args:
+            provider: 提供商（zhipu, deepseek, openai）
+            api_key: API Key
+            model: 模型名称（None 使用提供商默认模型）
+            base_url: 接口地址（仅 deepseek 支持自定义）
+
+        Returns:
+            PooledLLM 实例
+        """
+        if provider not in PROVIDER_CLASSES:
+            raise ValueError(f"不支持的 LLM 提供商: {provider}")
+
+        key = self.make_key(provider, api_key, model, base_url)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                if client.is_healthy(self.max_failures):
+                    self.stats['hits'] += 1
+                    return client
+                print(f"  LLM 客户端不健康，重建: {provider}/{client.model}")
+                self.stats['rebuilt'] += 1
+
+            client = PooledLLM(key, self._create(provider, api_key, model, base_url))
+            self._clients[key] = client
+            self.stats['created'] += 1
+            return client
+
+    @staticmethod
+    def _create(provider: str, api_key: str, model: Optional[str], base_url: Optional[str]) -> LLMProvider:
+        kwargs = {}
+        if model:
+            kwargs['model'] = model
+        if base_url and provider == 'deepseek':
+            kwargs['base_url'] = base_url
+        return PROVIDER_CLASSES[provider](api_key, **kwargs)
+
+    def clear(self):
+        """清空客户端池"""
+        with self._lock:
+            self._clients.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取客户端池统计信息"""
+        with self._lock:
+            clients = list(self._clients.values())
+        return {
+            **self.stats,
+            'size': len(clients),
+            'clients': [client.get_stats() for client in clients],
+        }
+
+
+# 进程内共享的客户端池
+_pool = LLMClientPool()
+
+
+def get_llm_provider(
+    provider: str,
+    api_key: str,
+    model: Optional[str] = None,
+    base_url: Optional[str] = None
+) -> PooledLLM:
+    """
+    从进程内共享的客户端池获取 LLM 客户端
+
+    Args:
+        provider: 提供商（zhipu, deepseek, openai）
+        api_key: API Key
+        model: 模型名称
+        base_url: 接口地址
+
+    Returns:
+        PooledLLM 实例
+    """
+    return _pool.get(provider, api_key, model, base_url)
+
+
+def get_llm_pool_stats() -> Dict[str, Any]:
+    """获取共享客户端池的统计信息"""
+    return _pool.get_stats()
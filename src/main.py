@@ -20,10 +20,11 @@ try:
 except ImportError:
     pass  # python-dotenv 未安装时忽略
 
-from parser import parse_markdown_file
-from analyzer import analyze_content
+from parse_cache import parse_markdown_file_cached
+from analyzer import ContentAnalyzer
 from image_gen import get_image_generator
 from assembler import assemble_markdown
+from generation_scheduler import GenerationScheduler, GenerationJob
 
 # 导入智能组件
 try:
@@ -186,7 +187,7 @@ class MarkdownIllustrator:
 
         # Step 1: 解析 Markdown
         print("Step 1: 解析 Markdown...")
-        doc = parse_markdown_file(str(input_path))
+        doc = parse_markdown_file_cached(str(input_path), self.config)
         print(f"  标题: {doc.title}")
         print(f"  元素数量: {len(doc.elements)}")
         print(f"  段落数量: {len(doc.get_paragraphs())}")
@@ -194,7 +195,8 @@ class MarkdownIllustrator:
 
         # Step 2: 分析内容，决定配图
         print("Step 2: 分析内容，决定配图位置...")
-        decisions = analyze_content(doc, self.config, image_source)
+        analyzer = ContentAnalyzer(self.config, image_source)
+        decisions = analyzer.analyze(doc)
         print(f"  决定配图数量: {len(decisions)}")
 
         if not decisions:
@@ -209,18 +211,8 @@ class MarkdownIllustrator:
             }
 
         for i, decision in enumerate(decisions):
-            element = doc.elements[decision.element_index]
             print(f"  #{i+1}: [{decision.image_type}] {decision.reason}")
-            if debug:
-                # 调试模式：打印完整提示词
-                print(f"      Prompt (完整):")
-                print(f"        {decision.prompt}")
-            else:
-                # 正常模式：打印截断的提示词
-                print(f"      Prompt: {decision.prompt[:80]}...")
-
-        if debug:
-            print()  # 调试模式后多加一个空行
+        print()
 
         # 增量更新模式：解析现有文件并决定哪些图片需要重新生成
         regenerate_plan = None
@@ -254,6 +246,30 @@ class MarkdownIllustrator:
                 print(f"  增量更新解析失败: {e}")
                 print(f"  将重新生成所有图片\n")
 
+        # 确定需要生成图片的索引
+        if regenerate_plan:
+            # 增量更新模式：只生成指定的图片
+            regenerate_indices = {item['index'] for item in regenerate_plan['regenerate']}
+            missing_indices = {item['index'] for item in regenerate_plan['missing']}
+            generate_indices = sorted(regenerate_indices | missing_indices)
+        else:
+            # 正常模式：生成所有图片
+            generate_indices = range(len(decisions))
+
+        # 生成提示词（只为需要生成图片的位置调用 LLM，并发请求）
+        print(f"  生成提示词: {len(generate_indices)} 个位置")
+        analyzer.materialize_prompts(decisions, generate_indices)
+        for i in generate_indices:
+            decision = decisions[i]
+            if debug:
+                # 调试模式：打印完整提示词
+                print(f"  #{i+1} Prompt (完整):")
+                print(f"        {decision.prompt}")
+            else:
+                # 正常模式：打印截断的提示词
+                print(f"  #{i+1} Prompt: {decision.prompt[:80]}...")
+        print()
+
         # Step 3: 生成图片
         image_paths = []
 
@@ -298,17 +314,13 @@ class MarkdownIllustrator:
                     actual_source = 'zhipu'
                 self.generator = get_image_generator(self.config, use_sdk, actual_source)
 
-            # 确定需要生成图片的索引
             if regenerate_plan:
-                # 增量更新模式：只生成指定的图片
-                regenerate_indices = {item['index'] for item in regenerate_plan['regenerate']}
-                missing_indices = {item['index'] for item in regenerate_plan['missing']}
-                generate_indices = sorted(regenerate_indices | missing_indices)
                 print(f"  将生成 {len(generate_indices)} 个位置的图片")
-            else:
-                # 正常模式：生成所有图片
-                generate_indices = range(len(decisions))
 
+            # 先为所有位置创建生成任务，再由调度器并发执行（按图片来源限制并发数）
+            generator_source = image_source if image_source != 'auto' else 'zhipu'
+            default_source = self.config.get('image_source', 'zhipu')
+            jobs = []
             for i in generate_indices:
                 decision = decisions[i]
                 try:
@@ -320,64 +332,39 @@ class MarkdownIllustrator:
                     if has_ab_test:
                         # A/B 测试模式：每个变体使用不同的提示词
                         print(f"  A/B 测试模式：{len(decision.ab_variants)} 个变体")
-                        variant_paths = []
+                        image_paths[i] = [
+                            {'name': v['name'], 'description': v['description'], 'path': None}
+                            for v in decision.ab_variants
+                        ]
                         for v_idx, variant in enumerate(decision.ab_variants):
-                            try:
-                                print(f"    [{variant['name']}] {variant['description']}", end=" ")
-                                if debug:
-                                    print(f"\n      提示词: {variant['prompt'][:80]}...")
-                                else:
-                                    print("")
-
-                                path = self.generator.generate(
-                                    variant['prompt'],
-                                    i,
-                                    decision.image_type,
-                                    candidate_index=v_idx
-                                )
-                                variant_paths.append({
-                                    'name': variant['name'],
-                                    'description': variant['description'],
-                                    'path': path
-                                })
-                                print(f"    ✓")
-                            except Exception as e:
-                                print(f"    ✗ ({e})")
-                                variant_paths.append({
-                                    'name': variant['name'],
-                                    'description': variant['description'],
-                                    'path': None
-                                })
-
-                        image_paths.append(variant_paths)
-                        print(f"  完成: {len([p for p in variant_paths if p['path']])}/{len(variant_paths)} 个变体成功")
+                            print(f"    [{variant['name']}] {variant['description']}")
+                            if debug:
+                                print(f"      提示词: {variant['prompt'][:80]}...")
+                            jobs.append(GenerationJob(
+                                self.generator, variant['prompt'], i, decision.image_type,
+                                source=generator_source,
+                                candidate_index=v_idx,
+                                label=f"#{i+1} [{variant['name']}]"
+                            ))
 
                     elif batch > 1:
                         # 批量生成模式：为每个位置生成 N 张候选图
                         print(f"  批量生成 {batch} 张候选图...")
-                        candidate_paths = []
-                        for b in range(batch):
-                            try:
-                                print(f"    生成候选图 {b + 1}/{batch}...", end=" ")
-                                if debug:
-                                    print(f"\n      提示词: {decision.prompt[:80]}...")
-                                else:
-                                    print("")
-
-                                path = self.generator.generate(
-                                    decision.prompt,
-                                    i,
-                                    decision.image_type,
-                                    candidate_index=b
-                                )
-                                candidate_paths.append(path)
-                                print(f"    ✓")
-                            except Exception as e:
-                                print(f"    ✗ ({e})")
-                                candidate_paths.append(None)
-
-                        image_paths[i] = candidate_paths  # Fixed: use assignment instead of append
-                        print(f"  完成: {len([p for p in candidate_paths if p])}/{batch} 张成功")
+                        if debug:
+                            print(f"      提示词: {decision.prompt[:80]}...")
+                        image_paths[i] = [None] * batch
+                        # 接口支持一次返回多张时合并为一个请求，否则每张候选图一个任务（并发执行）
+                        per_request = max(1, getattr(self.generator, 'max_images_per_request', 1))
+                        for b in range(0, batch, per_request):
+                            count = min(per_request, batch - b)
+                            jobs.append(GenerationJob(
+                                self.generator, decision.prompt, i, decision.image_type,
+                                source=generator_source,
+                                candidate_index=b,
+                                count=count,
+                                label=f"#{i+1} 候选图 {b + 1}/{batch}" if count == 1
+                                else f"#{i+1} 候选图 {b + 1}-{b + count}/{batch}"
+                            ))
                     else:
                         # 普通模式：生成 1 张图片
                         # 调试模式：打印完整提示词
@@ -386,39 +373,67 @@ class MarkdownIllustrator:
                             print(f"    {decision.prompt}")
                             print()
 
-                        image_source = getattr(decision, 'image_source', None)
+                        decision_source = getattr(decision, 'image_source', None)
 
                         # 确定实际使用的图片源
-                        if not image_source or image_source == 'auto':
-                            actual_source = self.config.get('image_source', 'zhipu')
+                        if not decision_source or decision_source == 'auto':
+                            actual_source = default_source
                         else:
-                            actual_source = image_source
+                            actual_source = decision_source
 
                         # 获取对应的生成器
-                        if actual_source != self.config.get('image_source', 'zhipu') and self.source_manager:
+                        if actual_source != default_source and self.source_manager:
                             generator = self.source_manager.get_generator(actual_source)
+                            job_source = actual_source
                         else:
                             generator = self.generator
+                            job_source = generator_source
 
                         print(f"  来源: {actual_source}")
-
-                        image_path = generator.generate(
-                            decision.prompt,
-                            i,
-                            decision.image_type
-                        )
-
-                        image_paths[i] = image_path  # Fixed: use index assignment instead of append
+                        jobs.append(GenerationJob(
+                            generator, decision.prompt, i, decision.image_type,
+                            source=job_source,
+                            label=f"#{i+1}"
+                        ))
                 except Exception as e:
                     print(f"  生成失败: {e}")
-                    if has_ab_test or batch > 1:
-                        # 需要确定是 A/B 测试还是批量模式
-                        if has_ab_test:
-                            image_paths.append([{'name': v['name'], 'path': None} for v in decision.ab_variants])
-                        else:
-                            image_paths.append([None] * batch)
-                    else:
-                        image_paths.append(None)
+
+            scheduler = GenerationScheduler(self.config)
+            if scheduler.mode == 'async':
+                print(f"\n  并发执行 {len(jobs)} 个生成任务（异步模式）...")
+            else:
+                print(f"\n  并发执行 {len(jobs)} 个生成任务（线程数 {min(scheduler.max_workers, max(len(jobs), 1))}）...")
+
+            def report(n, job, path, error):
+                if error is not None:
+                    print(f"  {job.label} ✗ ({error})")
+                elif job.count > 1:
+                    print(f"  {job.label} ✓ {len([p for p in path if p])}/{job.count}")
+                else:
+                    print(f"  {job.label} ✓")
+
+            if scheduler.mode == 'async':
+                results = scheduler.run_async(jobs, on_done=report)
+            else:
+                results = scheduler.run(jobs, on_done=report)
+
+            # 按任务所属的位置和候选索引放回 image_paths
+            generated = []
+            for job, path in zip(jobs, results):
+                if job.count > 1:
+                    paths = list(path or [None] * job.count)
+                    image_paths[job.index][job.candidate_index:job.candidate_index + job.count] = paths
+                    generated.extend(paths)
+                    continue
+                generated.append(path)
+                if job.candidate_index is None:
+                    image_paths[job.index] = path
+                elif isinstance(image_paths[job.index][job.candidate_index], dict):
+                    image_paths[job.index][job.candidate_index]['path'] = path
+                else:
+                    image_paths[job.index][job.candidate_index] = path
+
+            print(f"  完成: {len([p for p in generated if p])}/{len(generated)} 张成功")
             print()
 
         # Step 4: 重组 Markdown
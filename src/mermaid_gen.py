@@ -11,6 +11,10 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 from abc import ABC, abstractmethod
 
+from keyword_matcher import MERMAID_DIAGRAM_KEYWORDS, get_matcher
+from multi_image import MultiImageMixin
+from async_image import AsyncImageMixin
+
 
 class DiagramStrategy(ABC):
     """图表生成策略基类"""
@@ -35,13 +39,13 @@ class FlowchartStrategy(DiagramStrategy):
     def generate(self, prompt: str, context: Dict[str, Any]) -> str:
         """生成流程图"""
         # 简化版：基于关键词生成模板
-        keywords_lower = prompt.lower()
+        matched = get_matcher('mermaid_strategy').matched_categories(prompt)
 
         # 检测是否包含条件/判断
-        has_condition = any(word in keywords_lower for word in ['如果', '否则', '判断', '验证', '检查', '当', 'whether', 'if', 'check'])
+        has_condition = 'condition' in matched
 
         # 检测是否包含循环
-        has_loop = any(word in keywords_lower for word in ['循环', '重复', '直到', 'while', 'loop', 'repeat'])
+        has_loop = 'loop' in matched
 
         # 基于模板生成
         if has_condition and has_loop:
@@ -182,7 +186,7 @@ class SequenceStrategy(DiagramStrategy):
     def generate(self, prompt: str, context: Dict[str, Any]) -> str:
         """生成时序图"""
         # 检测API调用相关关键词
-        has_api = any(word in prompt.lower() for word in ['api', '接口', '请求', '响应', '调用', 'request', 'response'])
+        has_api = get_matcher('mermaid_strategy').contains(prompt, 'api')
 
         if has_api:
             return self._generate_api_sequence(prompt)
@@ -240,8 +244,9 @@ class ClassDiagramStrategy(DiagramStrategy):
     def generate(self, prompt: str, context: Dict[str, Any]) -> str:
         """生成类图"""
         # 检测继承、实现等关系
-        has_inheritance = any(word in prompt.lower() for word in ['继承', 'extends', 'parent', 'child'])
-        has_interface = any(word in prompt.lower() for word in ['接口', 'interface', 'implements'])
+        matched = get_matcher('mermaid_strategy').matched_categories(prompt)
+        has_inheritance = 'inheritance' in matched
+        has_interface = 'interface' in matched
 
         if has_inheritance or has_interface:
             return self._generate_complex_class_diagram(prompt)
@@ -394,7 +399,7 @@ class GanttStrategy(DiagramStrategy):
         return "\n".join(mermaid)
 
 
-class MermaidDiagramGenerator:
+class MermaidDiagramGenerator(MultiImageMixin, AsyncImageMixin):
     """Mermaid 图表生成器"""
 
     # 内容类型到图表策略的映射
@@ -409,14 +414,7 @@ class MermaidDiagramGenerator:
     }
 
     # 图表类型优先级（按内容关键词匹配）
-    DIAGRAM_TYPE_KEYWORDS = {
-        'sequence': ['api', '接口', '请求', '响应', '调用', 'request', 'response', '时序', '序列'],
-        'class': ['类', '继承', '接口', '实现', 'class', 'interface', 'extends', 'implements'],
-        'state': ['状态', '转换', 'state', 'status', '机'],
-        'er': ['数据库', '表', '关系', 'database', 'table', 'relation', '实体'],
-        'mindmap': ['结构', '知识', '概念', '思维', 'structure', 'knowledge', 'concept'],
-        'gantt': ['时间', '计划', '进度', 'timeline', 'schedule', 'plan'],
-    }
+    DIAGRAM_TYPE_KEYWORDS = MERMAID_DIAGRAM_KEYWORDS
 
     def __init__(self, config: Dict[str, Any]):
         """
@@ -438,6 +436,9 @@ class MermaidDiagramGenerator:
         # 默认图表类型
         self.default_diagram_type = self.mermaid_config.get('default_diagram_type', 'flowchart')
 
+        # 图表类型关键词匹配器（支持 keywords.mermaid 配置追加关键词）
+        self.keyword_matcher = get_matcher('mermaid', config)
+
     def generate(self, prompt: str, index: int = 0, image_type: str = 'diagram', context: Dict[str, None] = None, candidate_index: int = 0) -> str:
         """
         生成 Mermaid 图表
@@ -478,12 +479,10 @@ class MermaidDiagramGenerator:
 
     def _determine_diagram_type(self, prompt: str, image_type: str) -> str:
         """根据内容和类型确定图表类型"""
-        prompt_lower = prompt.lower()
-
-        # 检查关键词匹配
-        for diagram_type, keywords in self.DIAGRAM_TYPE_KEYWORDS.items():
-            if any(keyword in prompt_lower for keyword in keywords):
-                return diagram_type
+        # 检查关键词匹配（按优先级返回第一个命中的类型）
+        diagram_type = self.keyword_matcher.first_category(prompt)
+        if diagram_type:
+            return diagram_type
 
         # 根据 image_type 映射
         type_mapping = {
@@ -514,7 +513,8 @@ class MermaidDiagramGenerator:
             filepath = self.save_dir / filename
 
             # 创建临时 mmd 文件
-            mmd_file = self.save_dir / f"temp_{timestamp}.mmd"
+            # 文件名包含位置和候选索引，并发渲染时互不覆盖
+            mmd_file = self.save_dir / f"temp_{index}_{candidate_index:03d}_{timestamp}.mmd"
             with open(mmd_file, 'w', encoding='utf-8') as f:
                 f.write(mermaid_code)
 
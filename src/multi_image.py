@@ -0,0 +1,168 @@
+"""
+多图生成模块
+为图片生成器提供 generate_many：接口支持一次返回多张图片时（n / num_outputs / per_page）一次请求生成多张候选图，
+否则循环调用 generate
+"""
+
+import re
+import threading
+from typing import List, Optional
+
+
+class MultiImageMixin:
+    """
+    多图生成混入类
+
+    生成器需要提供 generate(prompt, index, image_type, candidate_index=...)。
+    支持一次请求返回多张图片的生成器设置 max_images_per_request > 1，并实现
+    _generate_multiple(prompt, count, index, image_type, start_candidate)，
+    返回图片路径列表（可能少于 count，下载失败的位置为 None；通常用 _save_images 逐张保存接口返回的 URL）。
+    max_images_per_request 为 1 时不会调用 _generate_multiple。
+    """
+
+    # 单次请求最多返回的图片数（1 表示不支持，循环调用 generate）
+    max_images_per_request = 1
+
+    # 接口拒绝多图参数时的 HTTP 状态码（其他错误视为临时错误，不影响之后的多图请求）
+    MULTI_IMAGE_REJECTED_STATUS = (400, 422)
+
+    # 多图参数名（错误信息中提到这些参数时才认为接口不支持多图，
+    # 避免把内容审核等其他 400 错误误判为不支持）
+    MULTI_IMAGE_PARAMETERS = ('n', 'num_outputs', 'per_page')
+
+    # 保护 max_images_per_request 的降级（生成器在调度器的多个线程间共享）
+    _multi_image_lock = threading.Lock()
+
+    def generate_many(
+        self,
+        prompt: str,
+        n: int,
+        index: int = 0,
+        image_type: str = 'image',
+        start_candidate: int = 0
+    ) -> List[Optional[str]]:
+        """
+        为同一提示词生成 n 张候选图
+
+        一次请求返回的图片不足 n 张、请求失败或部分图片下载失败时，只为缺少的候选图调用 generate 补齐。
+
+        Args:
+            prompt: 图片生成提示词
+            n: 图片数量
+            index: 图片索引
+            image_type: 图片类型
+            start_candidate: 第一张图片的候选索引（其余依次递增）
+
+        Returns:
+            n 个图片路径（生成失败的位置为 None）
+
+        Raises:
+            Exception: 所有图片都生成失败时抛出最后一个异常
+        """
+        results: List[Optional[str]] = []
+        last_error = None
+
+        # 一次请求生成多张
+        per_request = self.max_images_per_request
+        if n > 1 and per_request > 1:
+            while len(results) < n:
+                count = min(n - len(results), per_request)
+                try:
+                    paths = self._generate_multiple(
+                        prompt, count, index, image_type, start_candidate + len(results)
+                    )
+                except Exception as e:
+                    last_error = e
+                    if self._rejects_multi_image(e):
+                        # 接口不支持多图参数，之后的请求直接逐张生成
+                        with self._multi_image_lock:
+                            if self.max_images_per_request > 1:
+                                print(f"  接口不支持多图请求，改为逐张生成: {e}")
+                                self.max_images_per_request = 1
+                    else:
+                        print(f"  多图请求失败，剩余的逐张生成: {e}")
+                    break
+                results.extend(paths[:count])
+                if len(paths) < count:
+                    # 接口返回的图片不足，剩余的逐张生成
+                    break
+
+        # 逐张生成缺少的候选图（不支持多图、返回不足或下载失败的位置）
+        results.extend([None] * (n - len(results)))
+        for k, path in enumerate(results):
+            if path is not None:
+                continue
+            try:
+                results[k] = self.generate(
+                    prompt, index, image_type, candidate_index=start_candidate + k
+                )
+            except Exception as e:
+                last_error = e
+
+        if last_error is not None and not any(results):
+            raise last_error
+        return results
+
+    def _save_images(
+        self,
+        urls: List[str],
+        index: int,
+        image_type: str,
+        start_candidate: int
+    ) -> List[Optional[str]]:
+        """
+        逐张下载并保存一次请求返回的图片
+
+        单张下载失败不影响其他图片（已保存的图片保留）。
+
+        Args:
+            urls: 图片 URL 列表
+            index: 图片索引
+            image_type: 图片类型
+            start_candidate: 第一张图片的候选索引
+
+        Returns:
+            图片路径列表（下载失败的位置为 None）
+        """
+        paths: List[Optional[str]] = []
+        for k, url in enumerate(urls):
+            try:
+                paths.append(self._save_image(url, index, image_type, start_candidate + k))
+            except Exception as e:
+                print(f"  第 {k + 1} 张图片保存失败: {e}")
+                paths.append(None)
+        return paths
+
+    def _rejects_multi_image(self, error: Exception) -> bool:
+        """
+        判断多图请求的错误是否表示接口不支持多图参数
+
+        状态码为 400 / 422 且错误信息提到多图参数（MULTI_IMAGE_PARAMETERS）时才返回 True。
+
+        Args:
+            error: 多图请求抛出的异常（requests / openai SDK 的 HTTP 错误带有状态码）
+
+        Returns:
+            是否应改为逐张生成
+        """
+        response = getattr(error, 'response', None)
+        status = getattr(error, 'status_code', None)
+        if status is None:
+            status = getattr(response, 'status_code', None)
+        if status not in self.MULTI_IMAGE_REJECTED_STATUS:
+            return False
+
+        # openai SDK 的错误带有 param 字段
+        if getattr(error, 'param', None) in self.MULTI_IMAGE_PARAMETERS:
+            return True
+
+        message = f"{error} {getattr(response, 'text', '') or ''}"
+        for name in self.MULTI_IMAGE_PARAMETERS:
+            # 单字母参数（n）只匹配带引号的写法，避免匹配普通单词
+            if len(name) == 1:
+                pattern = rf"""['"`]{re.escape(name)}['"`]"""
+            else:
+                pattern = rf"(?<![\w-]){re.escape(name)}(?![\w-])"
+            if re.search(pattern, message):
+                return True
+        return False
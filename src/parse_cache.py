@@ -0,0 +1,350 @@
+"""
+解析缓存模块
+按内容哈希缓存 Markdown 解析结果，内容未变化的文档直接跳过分词
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from parser import (
+    PARSER_VERSION, ElementType, MarkdownDocument, MarkdownElement,
+    MarkdownParser, LineOffsetIndex
+)
+
+
+class ParseCache:
+    """
+    两级解析缓存：进程内 LRU + 磁盘序列化
+
+    两级都保存序列化后的字节（紧凑的元素元组），每次命中都会还原出新的
+    文档对象，调用方可以放心修改元素（如 need_image 标记）而不会污染缓存。
+    缓存键由命名空间、解析器版本和内容的 SHA-256 组成，解析规则变化时
+    递增 PARSER_VERSION 即可使旧缓存失效。
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_memory_bytes: 进程内缓存的最大字节数
+            cache_dir: 磁盘缓存目录（None 表示只使用进程内缓存）
+            max_disk_bytes: 磁盘缓存的最大字节数
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None  # 首次写入时统计
+        self._lock = threading.Lock()
+
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    # ------------------------------------------------------------------
+    # 通用键值接口
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(namespace: str, content: str, version: Any = PARSER_VERSION) -> str:
+        """
+        生成缓存键
+
+        Args:
+            namespace: 命名空间（区分不同用途的缓存）
+            content: 原始内容
+            version: 版本号，结果格式变化时递增
+        """
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return f"{namespace}-v{version}-{digest}"
+
+    def load(self, key: str) -> Optional[Any]:
+        """
+        读取缓存
+
+        Returns:
+            反序列化后的对象，未命中时返回 None
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return pickle.loads(data)
+
+        data = self._read_disk(key)
+        if data is None:
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['disk_hits'] += 1
+        self._put_memory(key, data)
+        return pickle.loads(data)
+
+    def store(self, key: str, value: Any):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 可序列化的对象
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._put_memory(key, data)
+        self._write_disk(key, data)
+
+    def clear(self):
+        """清空进程内缓存"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    # ------------------------------------------------------------------
+    # 文档解析
+    # ------------------------------------------------------------------
+
+    def parse(self, content: str) -> MarkdownDocument:
+        """
+        解析 Markdown 内容（命中缓存时跳过分词）
+
+        Args:
+            content: Markdown 文本内容
+
+        Returns:
+            MarkdownDocument: 解析后的文档对象
+        """
+        key = self.make_key('document', content)
+        packed = self.load(key)
+        if packed is not None:
+            return _unpack_document(packed, content)
+
+        doc = MarkdownParser().parse(content)
+        self.store(key, _pack_document(doc))
+        return doc
+
+    def parse_file(self, filepath: str) -> MarkdownDocument:
+        """
+        解析 Markdown 文件（命中缓存时跳过分词）
+
+        Args:
+            filepath: Markdown 文件路径
+        """
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return self.parse(content)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        total = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['misses']
+        hits = total - self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': hits / total if total else 0.0,
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_bytes,
+            'disk_bytes': self._disk_bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # 内部实现
+    # ------------------------------------------------------------------
+
+    def _put_memory(self, key: str, data: bytes):
+        """写入进程内 LRU，超出容量时淘汰最久未使用的条目"""
+        if len(data) > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = data
+            self._memory_bytes += len(data)
+
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        """读取磁盘缓存，命中时更新修改时间（用于 LRU 淘汰）"""
+        if self.cache_dir is None:
+            return None
+
+        path = self.cache_dir / f"{key}.pkl"
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes):
+        """写入磁盘缓存（先写临时文件再原子替换），超出容量时淘汰最旧的文件"""
+        if self.cache_dir is None or len(data) > self.max_disk_bytes:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{key}.pkl"
+            tmp_path = self.cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"警告: 写入解析缓存失败: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+            else:
+                self._disk_bytes += len(data)
+
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self):
+        """列出磁盘缓存文件 (修改时间, 大小, 路径)"""
+        entries = []
+        for path in self.cache_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self):
+        """按修改时间从旧到新删除，直到低于容量上限"""
+        entries = sorted(self._scan_disk())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+
+def _pack_document(doc: MarkdownDocument) -> Tuple:
+    """把文档转换为紧凑的可序列化形式（原文由调用方提供，不重复保存）"""
+    elements = [
+        (e.type.value, e.content, e.level, e.raw_line, e.start_line, e.end_line, e.line_count)
+        for e in doc.elements
+    ]
+    offsets = doc.line_index.offsets.tobytes() if doc.line_index is not None else None
+    return doc.title, elements, offsets
+
+
+def _unpack_document(packed: Tuple, content: str) -> MarkdownDocument:
+    """从紧凑形式还原文档对象"""
+    title, elements, offsets = packed
+    doc = MarkdownDocument(
+        elements=[
+            MarkdownElement(
+                type=ElementType(type_value),
+                content=element_content,
+                level=level,
+                position=position,
+                raw_line=raw_line,
+                line_count=line_count,
+                start_line=start_line,
+                end_line=end_line
+            )
+            for position, (type_value, element_content, level, raw_line, start_line, end_line, line_count)
+            in enumerate(elements)
+        ],
+        title=title
+    )
+    doc.source = content.encode('utf-8')
+    if offsets is not None:
+        line_offsets = array('q')
+        line_offsets.frombytes(offsets)
+        doc.line_index = LineOffsetIndex(line_offsets)
+    return doc
+
+
+# 共享缓存实例（按配置区分）
+_shared_caches: Dict[Tuple, ParseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_parse_cache(config: Optional[Dict[str, Any]] = None) -> Optional[ParseCache]:
+    """
+    获取共享的解析缓存实例
+
+    Args:
+        config: 配置字典（读取 parse_cache 部分）
+
+    Returns:
+        ParseCache 实例，配置禁用时返回 None
+    """
+    cache_config = (config or {}).get('parse_cache', {})
+    if not cache_config.get('enabled', True):
+        return None
+
+    settings = (
+        int(cache_config.get('memory_mb', 32) * 1024 * 1024),
+        cache_config.get('dir', '.cache/parse'),
+        int(cache_config.get('disk_mb', 256) * 1024 * 1024),
+    )
+
+    with _shared_lock:
+        cache = _shared_caches.get(settings)
+        if cache is None:
+            cache = ParseCache(
+                max_memory_bytes=settings[0],
+                cache_dir=settings[1],
+                max_disk_bytes=settings[2]
+            )
+            _shared_caches[settings] = cache
+        return cache
+
+
+def parse_markdown_cached(content: str, config: Optional[Dict[str, Any]] = None) -> MarkdownDocument:
+    """
+    带缓存的解析便捷函数（缓存被禁用时直接解析）
+
+    Args:
+        content: Markdown 文本内容
+        config: 配置字典
+
+    Returns:
+        解析后的文档对象
+    """
+    cache = get_parse_cache(config)
+    if cache is None:
+        return MarkdownParser().parse(content)
+    return cache.parse(content)
+
+
+def parse_markdown_file_cached(filepath: str, config: Optional[Dict[str, Any]] = None) -> MarkdownDocument:
+    """
+    带缓存的文件解析便捷函数
+
+    Args:
+        filepath: Markdown 文件路径
+        config: 配置字典
+
+    Returns:
+        解析后的文档对象
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return parse_markdown_cached(content, config)
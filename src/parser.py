@@ -4,11 +4,23 @@ Markdown 解析模块
 """
 
 import re
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from itertools import accumulate, chain, islice, repeat
+from operator import add
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
 from enum import Enum
 
 
+# 解析器版本：解析规则或元素结构变化时递增，使解析缓存失效
+PARSER_VERSION = 5
+
+# 元素内容修改计数（进程内全局）：文档的索引、大纲和特征向量记录构建时的计数，
+# 任一元素的内容被原地修改后重新构建
+_content_revision = 0
+
+
 class ElementType(Enum):
     """元素类型"""
     HEADING = "heading"
@@ -21,27 +33,100 @@ class ElementType(Enum):
     EMPTY = "empty"
 
 
-@dataclass
+class LineKind(Enum):
+    """行类型（块级分词结果）"""
+    EMPTY = "empty"
+    HEADING = "heading"
+    CODE_FENCE = "code_fence"
+    QUOTE = "quote"
+    LIST = "list"
+    TABLE = "table"
+    HORIZONTAL_RULE = "horizontal_rule"
+    TEXT = "text"
+
+
+# 块级分词产出的行记号：(LineKind, 行文本, 正则匹配结果或 None)
+# 使用普通元组而不是 NamedTuple，逐行创建时开销最小
+LineToken = tuple
+
+
 class MarkdownElement:
-    """Markdown 元素"""
-    type: ElementType
-    content: str
-    level: int = 0  # 标题层级
-    position: int = 0  # 在原文中的位置
-    raw_line: str = ""  # 原始行内容
-
-    # 统计信息
-    word_count: int = 0
-    line_count: int = 0
-
-    # 配图决策
-    need_image: bool = False
-    image_type: Optional[str] = None
-    image_prompt: Optional[str] = None
+    """
+    Markdown 元素
 
-    def __post_init__(self):
-        """初始化后计算统计信息"""
-        self.word_count = len(re.sub(r'\s+', '', self.content))
+    使用 __slots__ 存储（大文档中元素数量可达数万，省去每个实例的 __dict__），
+    字数、行数等统计信息在首次访问时计算并缓存。
+    """
+
+    __slots__ = (
+        'type', '_content', 'level', 'position', 'raw_line',
+        'start_line', 'end_line',
+        '_word_count', '_line_count',
+        'need_image', 'image_type', 'image_prompt',
+    )
+
+    def __init__(
+        self,
+        type: ElementType,
+        content: str,
+        level: int = 0,  # 标题层级
+        position: int = 0,  # 在原文中的位置
+        raw_line: str = "",  # 原始行内容
+        word_count: Optional[int] = None,  # 不传时按需计算
+        line_count: Optional[int] = None,  # 不传时按需计算
+        need_image: bool = False,
+        image_type: Optional[str] = None,
+        image_prompt: Optional[str] = None,
+        start_line: Optional[int] = None,  # 在原文中的起始行号（从0开始）
+        end_line: Optional[int] = None  # 在原文中的结束行号（不含）
+    ):
+        self.type = type
+        self._content = content
+        self.level = level
+        self.position = position
+        self.raw_line = raw_line
+
+        # 原文位置（解析时记录，字节偏移通过 MarkdownDocument.line_index 换算）
+        self.start_line = start_line
+        self.end_line = end_line
+
+        # 统计信息（惰性计算）
+        self._word_count = word_count
+        self._line_count = line_count
+
+        # 配图决策
+        self.need_image = need_image
+        self.image_type = image_type
+        self.image_prompt = image_prompt
+
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        global _content_revision
+        self._content = value
+        _content_revision += 1
+        # 内容变化后统计信息和原文位置失效
+        self._word_count = None
+        self._line_count = None
+        self.start_line = None
+        self.end_line = None
+
+    @property
+    def word_count(self) -> int:
+        """字数（不含空白字符）"""
+        if self._word_count is None:
+            self._word_count = len(''.join(self._content.split()))
+        return self._word_count
+
+    @property
+    def line_count(self) -> int:
+        """行数（解析得到的元素为原文行数，否则为内容行数）"""
+        if self._line_count is None:
+            self._line_count = self._content.count('\n') + 1 if self._content else 0
+        return self._line_count
 
     @property
     def is_heading(self) -> bool:
@@ -55,6 +140,251 @@ class MarkdownElement:
     def is_code_block(self) -> bool:
         return self.type == ElementType.CODE_BLOCK
 
+    def _compare_key(self) -> tuple:
+        # 统计信息由内容决定，不参与比较
+        return (self.type, self._content, self.level, self.position, self.raw_line,
+                self.need_image, self.image_type, self.image_prompt)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._compare_key() == other._compare_key()
+
+    # 与原 dataclass 一致：可变对象，不可哈希
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"MarkdownElement(type={self.type!r}, content={self._content!r}, "
+                f"level={self.level!r}, position={self.position!r}, raw_line={self.raw_line!r}, "
+                f"need_image={self.need_image!r}, image_type={self.image_type!r}, "
+                f"image_prompt={self.image_prompt!r})")
+
+
+class LineOffsetIndex:
+    """
+    行偏移索引
+
+    记录每一行在 UTF-8 源文本中的起始字节偏移（紧凑的 array 存储），
+    用于把元素的行范围换算为字节范围，直接切片原始缓冲区（bytes / mmap）。
+    行的划分与 content.split('\\n') 一致。
+    """
+
+    def __init__(self, offsets: array):
+        # offsets[i] 为第 i 行的起始偏移，末尾额外一项为“最后一行结束位置 + 1”
+        self.offsets = offsets
+
+    @classmethod
+    def from_lines(cls, lines: List[str]) -> 'LineOffsetIndex':
+        """根据行列表构建（行不含换行符）"""
+        if all(map(str.isascii, lines)):
+            lengths = map(len, lines)
+        else:
+            lengths = map(len, map(str.encode, lines))
+        offsets = array('q', [0])
+        offsets.extend(accumulate(map(add, lengths, repeat(1))))
+        return cls(offsets)
+
+    @classmethod
+    def from_file(cls, filepath: str) -> 'LineOffsetIndex':
+        """
+        直接扫描文件字节构建（不解码、不保留内容），偏移与磁盘上的文件一致
+
+        Args:
+            filepath: 文件路径
+        """
+        offsets = array('q', [0])
+        position = 0
+        ends_with_newline = True
+        with open(filepath, 'rb') as f:
+            for line in f:
+                position += len(line)
+                offsets.append(position)
+                ends_with_newline = line.endswith(b'\n')
+        if ends_with_newline:
+            # 以换行结尾（或空文件）时末尾还有一个空行
+            offsets.append(position + 1)
+        else:
+            offsets[-1] = position + 1
+        return cls(offsets)
+
+    def __len__(self) -> int:
+        """行数"""
+        return len(self.offsets) - 1
+
+    def span(self, start_line: int, end_line: int) -> Tuple[int, int]:
+        """
+        行范围 [start_line, end_line) 对应的字节范围（不含最后一行的换行符）
+
+        Returns:
+            (起始字节偏移, 结束字节偏移)
+        """
+        start = self.offsets[start_line]
+        if end_line <= start_line:
+            return start, start
+        return start, self.offsets[end_line] - 1
+
+    def line_of(self, byte_offset: int) -> int:
+        """字节偏移所在的行号"""
+        return bisect_right(self.offsets, byte_offset) - 1
+
+
+@dataclass
+class Section:
+    """章节：标题元素及其管辖的元素范围"""
+    heading_index: int  # 标题元素的位置
+    level: int
+    title: str
+    start: int  # 正文起始位置（标题之后）
+    body_end: int  # 直接正文结束位置（不含）：下一个任意级别的标题
+    end: int  # 章节结束位置（不含）：下一个同级或更高级的标题，包含子章节
+    parent: Optional['Section'] = field(default=None, repr=False, compare=False)
+    children: List['Section'] = field(default_factory=list)
+
+
+def _type_key(element_type) -> str:
+    """元素类型的索引键（按取值字符串比较，避免同一枚举被重复导入时身份不一致）"""
+    return element_type.value if hasattr(element_type, 'value') else str(element_type)
+
+
+class DocumentOutline:
+    """
+    文档大纲：章节树 + 段落字数前缀和
+
+    一次线性扫描构建，之后“某个范围内的段落总字数”为 O(1)，
+    按标题位置查找章节为 O(1)，按位置查找附近段落为 O(log n + k)。
+    """
+
+    def __init__(self, elements: List[MarkdownElement]):
+        self.element_count = len(elements)
+        self.sections: List[Section] = []  # 按文档顺序
+        self.roots: List[Section] = []  # 顶层章节
+        self._by_heading: Dict[int, Section] = {}
+
+        # word_prefix[i] 为前 i 个元素中段落的总字数
+        self.word_prefix = array('q', [0])
+        # 所有段落的位置（递增）
+        self.paragraph_positions = array('q')
+
+        stack: List[Section] = []
+        previous = None
+        total = 0
+        for i, element in enumerate(elements):
+            if element.is_heading:
+                if previous is not None:
+                    previous.body_end = i
+                # 同级或更高级的标题结束之前的章节
+                while stack and stack[-1].level >= element.level:
+                    stack.pop().end = i
+
+                parent = stack[-1] if stack else None
+                section = Section(
+                    heading_index=i,
+                    level=element.level,
+                    title=element.content,
+                    start=i + 1,
+                    body_end=self.element_count,
+                    end=self.element_count,
+                    parent=parent
+                )
+                (parent.children if parent else self.roots).append(section)
+                self.sections.append(section)
+                self._by_heading[i] = section
+                stack.append(section)
+                previous = section
+            elif element.is_paragraph:
+                total += element.word_count
+                self.paragraph_positions.append(i)
+            self.word_prefix.append(total)
+
+    def section_at(self, heading_index: int) -> Optional[Section]:
+        """获取以指定位置的标题开头的章节"""
+        return self._by_heading.get(heading_index)
+
+    def paragraph_words(self, start: int, end: int) -> int:
+        """位置 [start, end) 范围内段落的总字数"""
+        return self.word_prefix[end] - self.word_prefix[start]
+
+
+# 代码块起始行中的语言标记
+_FENCE_LANGUAGE = re.compile(r'^\s*```\s*([\w+#.-]*)')
+
+
+@dataclass
+class DocumentFeatures:
+    """
+    文档特征向量（供文档分类使用）
+
+    结构特征直接来自解析结果（类型索引、元素行数），关键词计数对全文只做一次扫描，
+    分类时不再对原文重新执行正则匹配。
+    """
+    element_count: int = 0
+    line_count: int = 0  # 各元素行数之和
+    keyword_counts: Dict[str, int] = field(default_factory=dict)  # 关键词类别 -> 出现次数
+    code_block_count: int = 0
+    code_languages: Dict[str, int] = field(default_factory=dict)  # 语言 -> 代码块数（无语言标记为 ''）
+    heading_levels: Dict[int, int] = field(default_factory=dict)  # 标题层级 -> 数量
+    list_count: int = 0
+    table_count: int = 0
+    list_density: float = 0.0  # 列表行数占比
+    table_density: float = 0.0  # 表格行数占比
+
+    # 计算关键词计数所用的匹配器（用于判断缓存是否可复用）
+    keyword_matcher: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def heading_count(self) -> int:
+        return sum(self.heading_levels.values())
+
+    @property
+    def max_heading_depth(self) -> int:
+        return max(self.heading_levels, default=0)
+
+    @classmethod
+    def from_document(cls, doc: 'MarkdownDocument', keyword_matcher=None) -> 'DocumentFeatures':
+        """
+        从解析后的文档计算特征
+
+        Args:
+            doc: 文档对象
+            keyword_matcher: 关键词匹配器（默认使用分类器的内置关键词表）
+
+        Returns:
+            DocumentFeatures
+        """
+        if keyword_matcher is None:
+            from keyword_matcher import get_matcher
+            keyword_matcher = get_matcher('classifier')
+
+        elements = doc.elements
+        code_languages: Dict[str, int] = {}
+        for element in doc.elements_of_type(ElementType.CODE_BLOCK):
+            match = _FENCE_LANGUAGE.match(element.raw_line or '')
+            language = match.group(1).lower() if match else ''
+            code_languages[language] = code_languages.get(language, 0) + 1
+
+        line_count = sum(element.line_count for element in elements)
+        list_elements = doc.elements_of_type(ElementType.LIST)
+        table_elements = doc.elements_of_type(ElementType.TABLE)
+        list_lines = sum(element.line_count for element in list_elements)
+        table_lines = sum(element.line_count for element in table_elements)
+
+        # 与分类器原先扫描的文本一致：各元素内容按行拼接
+        content = '\n'.join(element.content for element in elements)
+
+        return cls(
+            element_count=len(elements),
+            line_count=line_count,
+            keyword_counts=keyword_matcher.count_categories(content),
+            code_block_count=len(doc.positions_of_type(ElementType.CODE_BLOCK)),
+            code_languages=code_languages,
+            heading_levels={level: len(positions) for level, positions in sorted(doc._heading_index.items())},
+            list_count=len(list_elements),
+            table_count=len(table_elements),
+            list_density=list_lines / line_count if line_count else 0.0,
+            table_density=table_lines / line_count if line_count else 0.0,
+            keyword_matcher=keyword_matcher
+        )
+
 
 @dataclass
 class MarkdownDocument:
@@ -68,6 +398,33 @@ class MarkdownDocument:
     keywords: List[str] = field(default_factory=list)
     sections: List[Dict[str, Any]] = field(default_factory=list)
 
+    # 原文（UTF-8 字节，可以是 bytes 或 mmap）及行偏移索引
+    source: Optional[Any] = field(default=None, repr=False, compare=False)
+    line_index: Optional[LineOffsetIndex] = field(default=None, repr=False, compare=False)
+
+    # 文档大纲（按需构建）
+    _outline: Optional[DocumentOutline] = field(default=None, init=False, repr=False, compare=False)
+
+    # 文档特征向量（按需计算）
+    _features: Optional[DocumentFeatures] = field(default=None, init=False, repr=False, compare=False)
+
+    # 分析上下文（见 analysis_context 模块）
+    _analysis: Optional[Any] = field(default=None, init=False, repr=False, compare=False)
+
+    # 按类型 / 标题级别的元素位置索引（构建文档时生成，add_element 时增量更新）
+    _type_index: Dict[str, List[int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _heading_index: Dict[int, List[int]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_count: int = field(default=0, init=False, repr=False, compare=False)
+
+    # 修改计数（mark_modified 递增）及索引、大纲、特征向量构建时的文档版本
+    _revision: int = field(default=0, init=False, repr=False, compare=False)
+    _index_version: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    _outline_version: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    _features_version: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._build_indexes()
+
     def __len__(self) -> int:
         return len(self.elements)
 
@@ -76,19 +433,213 @@ class MarkdownDocument:
 
     def add_element(self, element: MarkdownElement):
         """添加元素"""
+        self._ensure_indexes()
         element.position = len(self.elements)
         self.elements.append(element)
+        self._index_element(element)
+        self._index_version = self.version()
+        self._outline = None
+        self._features = None
+
+    def mark_modified(self):
+        """
+        标记文档已被原地修改
+
+        修改元素内容（element.content）会自动使派生结构失效；
+        直接修改元素的类型、标题级别或元素列表中的某一项后需要调用本方法。
+        """
+        self._revision += 1
+
+    def version(self) -> Tuple:
+        """
+        文档版本（元素列表对象、元素数量、原文对象、修改计数）
+
+        索引、大纲、特征向量和分析上下文记录构建时的版本，版本变化后重新构建。
+        """
+        return (id(self.elements), len(self.elements), id(self.source), self._revision, _content_revision)
+
+    def _build_indexes(self):
+        """重建类型索引"""
+        self._type_index = {}
+        self._heading_index = {}
+        self._indexed_count = 0
+        for element in self.elements:
+            self._index_element(element)
+        self._index_version = self.version()
+
+    def _index_element(self, element: MarkdownElement):
+        """把下一个元素加入类型索引"""
+        position = self._indexed_count
+        type_value = _type_key(element.type)
+        self._type_index.setdefault(type_value, []).append(position)
+        if type_value == 'heading':
+            self._heading_index.setdefault(element.level, []).append(position)
+        self._indexed_count = position + 1
+
+    def _ensure_indexes(self):
+        """元素列表被直接替换或修改后重建索引"""
+        if self._index_version != self.version():
+            self._build_indexes()
+
+    def positions_of_type(self, element_type) -> List[int]:
+        """
+        获取指定类型元素的位置列表（按文档顺序，只读）
+
+        Args:
+            element_type: ElementType 或其取值字符串（如 'code_block'）
+        """
+        self._ensure_indexes()
+        return self._type_index.get(_type_key(element_type), [])
+
+    def elements_of_type(self, element_type) -> List[MarkdownElement]:
+        """获取指定类型的元素"""
+        elements = self.elements
+        return [elements[i] for i in self.positions_of_type(element_type)]
+
+    def heading_positions(self, level: Optional[int] = None) -> List[int]:
+        """获取标题的位置列表（可按级别筛选，只读）"""
+        if level is None:
+            return self.positions_of_type(ElementType.HEADING)
+        self._ensure_indexes()
+        return self._heading_index.get(level, [])
+
+    @property
+    def outline(self) -> DocumentOutline:
+        """章节树和段落字数前缀和（首次访问时构建，文档修改后重建）"""
+        outline = self._outline
+        version = self.version()
+        if outline is None or self._outline_version != version:
+            outline = self._outline = DocumentOutline(self.elements)
+            self._outline_version = version
+        return outline
+
+    def get_features(self, keyword_matcher=None) -> DocumentFeatures:
+        """
+        获取文档特征向量（每个文档只计算一次，文档修改或换用其他匹配器时重新计算）
+
+        Args:
+            keyword_matcher: 关键词匹配器（默认使用分类器的内置关键词表）
+        """
+        features = self._features
+        version = self.version()
+        if (
+            features is None
+            or self._features_version != version
+            or (keyword_matcher is not None and features.keyword_matcher is not keyword_matcher)
+        ):
+            self._ensure_indexes()
+            features = self._features = DocumentFeatures.from_document(self, keyword_matcher)
+            self._features_version = version
+        return features
+
+    @property
+    def features(self) -> DocumentFeatures:
+        """文档特征向量（见 get_features）"""
+        return self.get_features()
+
+    @property
+    def analysis(self):
+        """分析上下文：全文、元数据、主题、关键词和分类结果（按文档版本缓存）"""
+        from analysis_context import get_analysis_context
+        return get_analysis_context(self)
 
     def get_headings(self, level: Optional[int] = None) -> List[MarkdownElement]:
         """获取所有标题"""
-        headings = [e for e in self.elements if e.is_heading]
-        if level is not None:
-            headings = [e for e in headings if e.level == level]
-        return headings
+        elements = self.elements
+        return [elements[i] for i in self.heading_positions(level)]
 
     def get_paragraphs(self) -> List[MarkdownElement]:
         """获取所有段落"""
-        return [e for e in self.elements if e.is_paragraph]
+        return self.elements_of_type(ElementType.PARAGRAPH)
+
+    def context_window(
+        self,
+        position: int,
+        n: int = 3,
+        max_chars: int = 500,
+        snippet_chars: int = 200
+    ) -> List[str]:
+        """
+        获取元素附近的段落（由近到远选取，距离相同时优先后文，结果按文档顺序排列）
+
+        Args:
+            position: 元素位置（element.position）
+            n: 最多返回的段落数
+            max_chars: 总字符预算
+            snippet_chars: 每个段落最多截取的字符数
+
+        Returns:
+            段落内容片段列表
+        """
+        paragraphs = self.outline.paragraph_positions
+        right = bisect_right(paragraphs, position)
+        left = right - 1
+        if left >= 0 and paragraphs[left] == position:
+            # 跳过元素自身
+            left -= 1
+
+        chosen = []
+        budget = max_chars
+        while len(chosen) < n and budget > 0 and (left >= 0 or right < len(paragraphs)):
+            if right < len(paragraphs) and (left < 0 or paragraphs[right] - position <= position - paragraphs[left]):
+                index = paragraphs[right]
+                right += 1
+            else:
+                index = paragraphs[left]
+                left -= 1
+            snippet = self.elements[index].content[:min(snippet_chars, budget)]
+            chosen.append((index, snippet))
+            budget -= len(snippet)
+
+        chosen.sort()
+        return [snippet for _, snippet in chosen]
+
+    def element_span(self, element: MarkdownElement) -> Optional[Tuple[int, int]]:
+        """
+        获取元素在原文中的字节范围
+
+        Returns:
+            (起始字节偏移, 结束字节偏移)，没有位置信息时返回 None
+        """
+        if self.line_index is None or element.start_line is None:
+            return None
+        return self.line_index.span(element.start_line, element.end_line)
+
+    def source_view(self, element: MarkdownElement) -> Optional[memoryview]:
+        """
+        获取元素对应原文的只读视图（零拷贝）
+
+        Returns:
+            memoryview 切片，没有原文或位置信息时返回 None
+        """
+        span = self.element_span(element)
+        if span is None or self.source is None:
+            return None
+        return memoryview(self.source)[span[0]:span[1]]
+
+    def source_text(self, element: MarkdownElement) -> Optional[str]:
+        """获取元素对应的原文文本，没有原文或位置信息时返回 None"""
+        view = self.source_view(element)
+        if view is None:
+            return None
+        return str(view, 'utf-8')
+
+
+@dataclass
+class TextEdit:
+    """
+    文本编辑：把原文的 [start_line, end_line) 行替换为 new_lines
+
+    start_line == end_line 表示在该行之前插入，new_lines 为空表示删除。
+    """
+    start_line: int
+    end_line: int
+    new_lines: List[str] = field(default_factory=list)
+
+    @property
+    def line_delta(self) -> int:
+        """编辑后总行数的变化量"""
+        return len(self.new_lines) - (self.end_line - self.start_line)
 
 
 class MarkdownParser:
@@ -103,6 +654,26 @@ class MarkdownParser:
     TABLE_PATTERN = re.compile(r'^\|.*\|$')
     HR_PATTERN = re.compile(r'^-{3,}$|^_{3,}$|\*{3,}$')
 
+    # 段落可以延续的行类型
+    _PARAGRAPH_CONTINUATION = frozenset({LineKind.TEXT, LineKind.TABLE})
+
+    # 首字符分派表：每个首字符只尝试可能匹配的正则，顺序与逐个尝试时的优先级一致
+    # （空行 > 标题 > 代码块 > 引用 > 列表 > 表格 > 分隔线）；None 表示整行空白检查
+    _WHITESPACE_CANDIDATES = ((LineKind.EMPTY, None), (LineKind.LIST, LIST_PATTERN))
+    _DIGIT_CANDIDATES = ((LineKind.LIST, LIST_PATTERN),)
+    _FIRST_CHAR_DISPATCH = {
+        '#': ((LineKind.HEADING, HEADING_PATTERN),),
+        '`': ((LineKind.CODE_FENCE, CODE_BLOCK_PATTERN),),
+        '>': ((LineKind.QUOTE, QUOTE_PATTERN),),
+        '-': ((LineKind.LIST, LIST_PATTERN), (LineKind.HORIZONTAL_RULE, HR_PATTERN)),
+        '*': ((LineKind.LIST, LIST_PATTERN), (LineKind.HORIZONTAL_RULE, HR_PATTERN)),
+        '+': ((LineKind.LIST, LIST_PATTERN),),
+        '|': ((LineKind.TABLE, TABLE_PATTERN),),
+        '_': ((LineKind.HORIZONTAL_RULE, HR_PATTERN),),
+        **dict.fromkeys(' \t\r\f\v', _WHITESPACE_CANDIDATES),
+        **dict.fromkeys('0123456789', _DIGIT_CANDIDATES),
+    }
+
     def __init__(self):
         self.elements: List[MarkdownElement] = []
 
@@ -116,199 +687,366 @@ class MarkdownParser:
         Returns:
             MarkdownDocument: 解析后的文档对象
         """
-        self.elements = []
         lines = content.split('\n')
-        i = 0
-        total_lines = len(lines)
+        self.elements = list(self.iter_parse(lines))
+
+        # 构建文档对象
+        doc = MarkdownDocument(elements=self.elements)
+        doc.title = self._extract_title(doc)
 
-        while i < total_lines:
-            line = lines[i]
-            element, lines_consumed = self._parse_line(lines, i)
+        # 保留原文和行偏移索引，供按字节范围切片
+        doc.source = content.encode('utf-8')
+        doc.line_index = LineOffsetIndex.from_lines(lines)
+
+        return doc
+
+    def iter_parse(
+        self,
+        lines: Iterable[str],
+        first_line: int = 0,
+        first_position: int = 0
+    ) -> Iterator[MarkdownElement]:
+        """
+        流式解析：逐块产出元素，不保留已产出的元素
+
+        Args:
+            lines: 行迭代器（不含换行符），可以是列表或逐行读取的文件
+            first_line: 第一行在原文中的行号（从文档中间开始解析时使用）
+            first_position: 第一个元素的位置编号
+
+        Yields:
+            MarkdownElement: 按原文顺序产出的元素
+        """
+        tokens = map(self.tokenize_line, lines)
+        token = next(tokens, None)
+        position = first_position
+        line_number = first_line
+
+        while token is not None:
+            element, token = self._parse_block(token, tokens)
             if element:
-                element.position = len(self.elements)
-                self.elements.append(element)
-            i += lines_consumed
+                element.position = position
+                position += 1
+                # 构建器记录了元素占用的原文行数
+                element.start_line = line_number
+                line_number += element.line_count
+                element.end_line = line_number
+                yield element
+            else:
+                line_number += 1
+
+    def reparse(self, prev_doc: MarkdownDocument, edit: TextEdit) -> MarkdownDocument:
+        """
+        增量解析：在上一次的解析结果上应用一次编辑
+
+        块与块之间不携带解析状态，因此从编辑位置之前最近的元素起点开始重新分词，
+        直到新产出的元素恰好落在某个旧元素的起点（编辑区之后）即可停止，
+        其余元素直接复用并平移行号。耗时与编辑影响的范围成正比，而不是整篇文档。
+
+        注意：prev_doc 的元素会被复用（行号、位置被就地更新），之后不应再使用 prev_doc。
+
+        Args:
+            prev_doc: 上一次 parse / reparse 得到的文档（需要保留原文）
+            edit: 行级编辑
+
+        Returns:
+            MarkdownDocument: 编辑后的文档对象
+        """
+        source = prev_doc.source
+        index = prev_doc.line_index
+        if source is None or index is None:
+            raise ValueError("文档没有保留原文，无法增量解析")
+
+        total_lines = len(index)
+        start, end = edit.start_line, edit.end_line
+        if not 0 <= start <= end <= total_lines:
+            raise ValueError(f"编辑范围越界: [{start}, {end})，文档共 {total_lines} 行")
+
+        new_lines = edit.new_lines
+        if start == 0 and end == total_lines and not new_lines:
+            # 删除全部内容后仍然保留一个空行（与 ''.split('\n') 一致）
+            new_lines = ['']
+        delta = len(new_lines) - (end - start)
+
+        old_elements = prev_doc.elements
+        offsets = index.offsets
+        view = memoryview(source)
+
+        def old_lines(first: int, last: int) -> Iterator[str]:
+            for i in range(first, last):
+                yield str(view[offsets[i]:offsets[i + 1] - 1], 'utf-8')
+
+        # 从编辑位置之前最近的元素起点重新分词（它可能延续到编辑区内）
+        keep = self._count_elements_before(old_elements, start)
+        if keep > 0:
+            keep -= 1
+            restart_line = old_elements[keep].start_line
+        else:
+            restart_line = 0
+
+        lines = chain(old_lines(restart_line, start), new_lines, old_lines(end, total_lines))
+
+        # 编辑区之后，新元素的起点与旧元素起点重合时即可同步
+        resync_line = end + delta
+        reused_from = len(old_elements)
+        reparsed = []
+        for element in self.iter_parse(lines, restart_line, keep):
+            if element.start_line >= resync_line:
+                i = self._count_elements_before(old_elements, element.start_line - delta, keep)
+                if i < len(old_elements) and old_elements[i].start_line == element.start_line - delta:
+                    reused_from = i
+                    break
+            reparsed.append(element)
+
+        # 复用编辑区之后的旧元素，平移行号和位置
+        reused = old_elements[reused_from:]
+        position = keep + len(reparsed)
+        for element in reused:
+            element.start_line += delta
+            element.end_line += delta
+            element.position = position
+            position += 1
+
+        self.elements = old_elements[:keep] + reparsed + reused
 
-        # 构建文档对象
         doc = MarkdownDocument(elements=self.elements)
         doc.title = self._extract_title(doc)
 
+        # 拼接新的原文，并平移编辑区之后的行偏移
+        parts = []
+        if start > 0:
+            parts.append(view[:offsets[start] - 1])
+        if new_lines:
+            parts.append('\n'.join(new_lines).encode('utf-8'))
+        if end < total_lines:
+            parts.append(view[offsets[end]:])
+        doc.source = b'\n'.join(parts)
+
+        new_offsets = offsets[:start + 1]
+        line_starts = accumulate(map(add, map(len, map(str.encode, new_lines)), repeat(1)), initial=offsets[start])
+        new_offsets.extend(islice(line_starts, 1, None))
+        if end < total_lines:
+            shift = new_offsets[-1] - offsets[end]
+            new_offsets.extend(map(add, offsets[end + 1:], repeat(shift)))
+        doc.line_index = LineOffsetIndex(new_offsets)
+
         return doc
 
-    def _parse_line(self, lines: List[str], index: int) -> tuple[Optional[MarkdownElement], int]:
+    @staticmethod
+    def _count_elements_before(elements: List[MarkdownElement], line: int, lo: int = 0) -> int:
+        """二分查找：起始行号小于 line 的元素个数"""
+        hi = len(elements)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if elements[mid].start_line < line:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def tokenize_line(self, line: str) -> LineToken:
         """
-        解析单行（或多行，如代码块）
+        块级分词：每行只分类一次
+
+        按首字符分派，只尝试该字符可能匹配的正则（与逐个尝试全部正则的结果一致），
+        普通文本行不需要任何正则匹配。
 
         Args:
-            lines: 所有行
-            index: 当前行索引
+            line: 单行文本（不含换行符）
 
         Returns:
-            (元素, 消耗的行数)
+            行记号 (LineKind, 行文本, 匹配结果)
         """
-        line = lines[index]
+        if not line:
+            return (LineKind.EMPTY, line, None)
+
+        first = line[0]
+        candidates = self._FIRST_CHAR_DISPATCH.get(first)
+        if candidates is None:
+            if first.isspace():
+                candidates = self._WHITESPACE_CANDIDATES
+            elif first.isdecimal():
+                # 非 ASCII 数字（\d 匹配所有 Unicode 十进制数字）
+                candidates = self._DIGIT_CANDIDATES
+            else:
+                return (LineKind.TEXT, line, None)
+
+        for kind, pattern in candidates:
+            if pattern is None:
+                # 空白开头：整行都是空白即为空行
+                if line.isspace():
+                    return (LineKind.EMPTY, line, None)
+                continue
+            match = pattern.match(line)
+            if match:
+                return (kind, line, match)
+
+        return (LineKind.TEXT, line, None)
+
+    def _parse_block(self, token: LineToken, tokens: Iterator[LineToken]) -> Tuple[Optional[MarkdownElement], Optional[LineToken]]:
+        """
+        解析从当前记号开始的一个块（单行或多行，如代码块）
+
+        Args:
+            token: 当前行的记号
+            tokens: 剩余记号迭代器
+
+        Returns:
+            (元素（空行为 None）, 块之后的下一个记号（已结束为 None）)
+        """
+        kind, line, match = token
 
         # 空行
-        if self.EMPTY_PATTERN.match(line):
-            return None, 1
+        if kind is LineKind.EMPTY:
+            return None, next(tokens, None)
 
         # 标题
-        heading_match = self.HEADING_PATTERN.match(line)
-        if heading_match:
-            level = len(heading_match.group(1))
-            content = heading_match.group(2)
+        if kind is LineKind.HEADING:
+            level = len(match.group(1))
+            content = match.group(2)
             element = MarkdownElement(
                 type=ElementType.HEADING,
                 content=content,
                 level=level,
-                raw_line=line
+                raw_line=line,
+                line_count=1
             )
-            return element, 1
+            return element, next(tokens, None)
 
         # 代码块
-        if self.CODE_BLOCK_PATTERN.match(line):
-            return self._parse_code_block(lines, index)
+        if kind is LineKind.CODE_FENCE:
+            return self._parse_code_block(token, tokens)
 
         # 引用块
-        quote_match = self.QUOTE_PATTERN.match(line)
-        if quote_match:
-            return self._parse_quote(lines, index)
+        if kind is LineKind.QUOTE:
+            return self._parse_quote(token, tokens)
 
         # 列表
-        if self.LIST_PATTERN.match(line):
-            return self._parse_list(lines, index)
+        if kind is LineKind.LIST:
+            return self._parse_list(token, tokens)
 
         # 表格
-        if self.TABLE_PATTERN.match(line):
-            return self._parse_table(lines, index)
+        if kind is LineKind.TABLE:
+            return self._parse_table(token, tokens)
 
         # 分隔线
-        if self.HR_PATTERN.match(line):
+        if kind is LineKind.HORIZONTAL_RULE:
             element = MarkdownElement(
                 type=ElementType.HORIZONTAL_RULE,
                 content=line,
-                raw_line=line
+                raw_line=line,
+                line_count=1
             )
-            return element, 1
+            return element, next(tokens, None)
 
         # 普通段落
-        return self._parse_paragraph(lines, index)
+        return self._parse_paragraph(token, tokens)
 
-    def _parse_code_block(self, lines: List[str], index: int) -> tuple[MarkdownElement, int]:
+    def _parse_code_block(self, token: LineToken, tokens: Iterator[LineToken]) -> Tuple[MarkdownElement, Optional[LineToken]]:
         """解析代码块"""
-        start_line = lines[index]
-        lang_match = self.CODE_BLOCK_PATTERN.match(start_line)
-        lang = lang_match.group(1) if lang_match else ""
+        start_line = token[1]
+        lang = token[2].group(1) if token[2] else ""
 
         content_lines = []
-        i = index + 1
-        total_lines = len(lines)
+        line_count = 1
 
-        while i < total_lines:
-            if self.CODE_BLOCK_PATTERN.match(lines[i]):
+        for kind, line, _ in tokens:
+            line_count += 1
+            if kind is LineKind.CODE_FENCE:
                 # 找到结束标记
                 break
-            content_lines.append(lines[i])
-            i += 1
+            content_lines.append(line)
 
         element = MarkdownElement(
             type=ElementType.CODE_BLOCK,
             content='\n'.join(content_lines),
-            raw_line=start_line
+            raw_line=start_line,
+            line_count=line_count
         )
-        return element, i - index + 1
+        return element, next(tokens, None)
 
-    def _parse_paragraph(self, lines: List[str], index: int) -> tuple[MarkdownElement, int]:
+    def _parse_paragraph(self, token: LineToken, tokens: Iterator[LineToken]) -> Tuple[MarkdownElement, Optional[LineToken]]:
         """解析段落"""
-        content_lines = []
-        i = index
-        total_lines = len(lines)
-
-        while i < total_lines:
-            line = lines[i]
-
-            # 遇到空行、标题、代码块等特殊元素时停止
-            if (self.EMPTY_PATTERN.match(line) or
-                self.HEADING_PATTERN.match(line) or
-                self.CODE_BLOCK_PATTERN.match(line) or
-                self.HR_PATTERN.match(line)):
-                break
+        first_line = token[1]
+        content_lines = [first_line]
 
-            # 遇到列表、引用等也停止
-            if self.LIST_PATTERN.match(line) or self.QUOTE_PATTERN.match(line):
+        # 遇到空行、标题、代码块、分隔线、列表、引用等特殊元素时停止（表格行并入段落）
+        continuation = self._PARAGRAPH_CONTINUATION
+        for token in tokens:
+            if token[0] not in continuation:
                 break
-
-            content_lines.append(line)
-            i += 1
+            content_lines.append(token[1])
+        else:
+            token = None
 
         content = ' '.join(content_lines)
         element = MarkdownElement(
             type=ElementType.PARAGRAPH,
             content=content,
-            raw_line=lines[index]
+            raw_line=first_line,
+            line_count=len(content_lines)
         )
-        return element, i - index
+        return element, token
 
-    def _parse_list(self, lines: List[str], index: int) -> tuple[MarkdownElement, int]:
+    def _parse_list(self, token: LineToken, tokens: Iterator[LineToken]) -> Tuple[MarkdownElement, Optional[LineToken]]:
         """解析列表"""
-        content_lines = []
-        i = index
-        total_lines = len(lines)
+        first_line = token[1]
+        content_lines = [first_line]
 
-        while i < total_lines:
-            line = lines[i]
-            if not self.LIST_PATTERN.match(line):
+        for token in tokens:
+            if token[0] is not LineKind.LIST:
                 break
-            content_lines.append(line)
-            i += 1
+            content_lines.append(token[1])
+        else:
+            token = None
 
         element = MarkdownElement(
             type=ElementType.LIST,
             content='\n'.join(content_lines),
-            raw_line=lines[index]
+            raw_line=first_line,
+            line_count=len(content_lines)
         )
-        return element, i - index
+        return element, token
 
-    def _parse_quote(self, lines: List[str], index: int) -> tuple[MarkdownElement, int]:
+    def _parse_quote(self, token: LineToken, tokens: Iterator[LineToken]) -> Tuple[MarkdownElement, Optional[LineToken]]:
         """解析引用块"""
-        content_lines = []
-        i = index
-        total_lines = len(lines)
+        first_line = token[1]
+        content_lines = [token[2].group(1)]
 
-        while i < total_lines:
-            line = lines[i]
-            quote_match = self.QUOTE_PATTERN.match(line)
-            if not quote_match:
+        for token in tokens:
+            if token[0] is not LineKind.QUOTE:
                 break
-            content_lines.append(quote_match.group(1))
-            i += 1
+            content_lines.append(token[2].group(1))
+        else:
+            token = None
 
         element = MarkdownElement(
             type=ElementType.QUOTE,
             content=' '.join(content_lines),
-            raw_line=lines[index]
+            raw_line=first_line,
+            line_count=len(content_lines)
         )
-        return element, i - index
+        return element, token
 
-    def _parse_table(self, lines: List[str], index: int) -> tuple[MarkdownElement, int]:
+    def _parse_table(self, token: LineToken, tokens: Iterator[LineToken]) -> Tuple[MarkdownElement, Optional[LineToken]]:
         """解析表格"""
-        content_lines = []
-        i = index
-        total_lines = len(lines)
+        first_line = token[1]
+        content_lines = [first_line]
 
-        while i < total_lines:
-            line = lines[i]
-            if not self.TABLE_PATTERN.match(line):
+        for token in tokens:
+            if token[0] is not LineKind.TABLE:
                 break
-            content_lines.append(line)
-            i += 1
+            content_lines.append(token[1])
+        else:
+            token = None
 
         element = MarkdownElement(
             type=ElementType.TABLE,
             content='\n'.join(content_lines),
-            raw_line=lines[index]
+            raw_line=first_line,
+            line_count=len(content_lines)
         )
-        return element, i - index
+        return element, token
 
     def _extract_title(self, doc: MarkdownDocument) -> str:
         """提取文档标题"""
@@ -332,6 +1070,37 @@ def parse_markdown(content: str) -> MarkdownDocument:
     return parser.parse(content)
 
 
+def diff_lines(old_lines: List[str], new_lines: List[str]) -> Optional[TextEdit]:
+    """
+    计算两版文本之间的行级编辑（去掉公共前缀和后缀后的差异区间）
+
+    Args:
+        old_lines: 旧文本的行列表
+        new_lines: 新文本的行列表
+
+    Returns:
+        TextEdit，两版相同时返回 None
+    """
+    limit = min(len(old_lines), len(new_lines))
+    prefix = 0
+    while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+        prefix += 1
+
+    if prefix == len(old_lines) == len(new_lines):
+        return None
+
+    suffix = 0
+    limit -= prefix
+    while suffix < limit and old_lines[-1 - suffix] == new_lines[-1 - suffix]:
+        suffix += 1
+
+    return TextEdit(
+        start_line=prefix,
+        end_line=len(old_lines) - suffix,
+        new_lines=new_lines[prefix:len(new_lines) - suffix]
+    )
+
+
 def parse_markdown_file(filepath: str) -> MarkdownDocument:
     """
     解析 Markdown 文件的便捷函数
@@ -345,3 +1114,41 @@ def parse_markdown_file(filepath: str) -> MarkdownDocument:
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     return parse_markdown(content)
+
+
+def iter_markdown_lines(filepath: str) -> Iterator[str]:
+    """
+    逐行读取 Markdown 文件（去掉行尾换行符）
+
+    与 content.split('\\n') 的结果一致，但不会把整个文件读入内存
+
+    Args:
+        filepath: Markdown 文件路径
+
+    Yields:
+        每一行的文本
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        line = ''
+        for line in f:
+            yield line[:-1] if line.endswith('\n') else line
+        # 与 split('\n') 保持一致：以换行结尾（或空文件）时末尾还有一个空行
+        if not line or line.endswith('\n'):
+            yield ''
+
+
+def iter_markdown_file(filepath: str) -> Iterator[MarkdownElement]:
+    """
+    流式解析 Markdown 文件的便捷函数
+
+    逐块产出元素，内存占用与文档大小无关，适合超大文档。
+    需要完整文档对象（标题、统计等）时请使用 parse_markdown_file。
+
+    Args:
+        filepath: Markdown 文件路径
+
+    Yields:
+        解析出的元素
+    """
+    parser = MarkdownParser()
+    yield from parser.iter_parse(iter_markdown_lines(filepath))
@@ -6,6 +6,9 @@
 from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+from llm_cache import get_llm_cache
+from concurrency import get_shared_semaphore
+
 
 class PromptGenerator:
     """提示词生成器"""
@@ -24,6 +27,13 @@ class PromptGenerator:
         self.model = self.llm_config.get('model', 'glm-4-flash')
         self.max_tokens = self.llm_config.get('max_tokens', 300)
 
+        # 并发请求上限（按提供商限制）
+        self.concurrency = self.llm_config.get('concurrency', 4)
+        self._semaphore = get_shared_semaphore('llm', self.provider, self.concurrency)
+
+        # LLM 响应缓存（相同请求直接复用结果）
+        self.llm_cache = get_llm_cache(config)
+
         # 提示词模板配置
         self.prompts_config = config.get('prompts', {})
 
@@ -81,31 +91,34 @@ class PromptGenerator:
             LLM 生成的提示词
         """
         try:
-            # 动态导入 LLM 客户端
             if self.provider == 'zhipu':
-                from zhipuai import ZhipuAI
                 api_key = self.llm_config.get('api_key') or self.config.get('api', {}).get('api_key', '')
                 if not api_key:
                     return self._rule_generate(content, image_type, context)
-                client = ZhipuAI(api_key=api_key)
             else:
                 return self._rule_generate(content, image_type, context)
 
             # 构建提示词
+            system_prompt = "你是一个专业的AI图片提示词生成专家，擅长创作简洁准确的图片描述。"
             llm_prompt = self._build_generation_prompt(content, image_type, context)
-
-            # 调用 LLM
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的AI图片提示词生成专家，擅长创作简洁准确的图片描述。"},
-                    {"role": "user", "content": llm_prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.7
-            )
-
-            result = response.choices[0].message.content.strip()
+            temperature = 0.7
+
+            def request() -> str:
+                # 复用进程内共享的 LLM 客户端
+                from llm_pool import get_llm_provider
+                client = get_llm_provider(self.provider, api_key, self.model)
+
+                # 调用 LLM（受提供商并发上限约束）
+                with self._semaphore:
+                    return client.generate(llm_prompt, system_prompt, self.max_tokens, temperature)
+
+            if self.llm_cache is not None:
+                key = self.llm_cache.make_key(
+                    self.provider, self.model, system_prompt, llm_prompt, self.max_tokens, temperature
+                )
+                result = self.llm_cache.get_or_create(key, request, self.provider, self.model)
+            else:
+                result = request()
 
             print(f"    LLM 生成提示词: {result[:80]}...")
             return result
@@ -8,6 +8,8 @@ from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 
+from parse_cache import get_parse_cache
+
 
 @dataclass
 class ExistingImage:
@@ -23,6 +25,9 @@ class ExistingImage:
 class MarkdownRegenerateParser:
     """Markdown 增量更新解析器"""
 
+    # 扫描结果格式版本（缓存键的一部分）
+    SCAN_VERSION = 1
+
     # 图片类型到中文的映射
     TYPE_NAMES = {
         'cover': '封面图',
@@ -59,6 +64,15 @@ class MarkdownRegenerateParser:
         with open(markdown_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
 
+        # 内容未变化时直接复用上一次的扫描结果
+        cache = get_parse_cache(self.config)
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.make_key('existing_images', ''.join(lines), self.SCAN_VERSION)
+            cached = cache.load(cache_key)
+            if cached is not None:
+                return cached, lines
+
         existing_images = []
 
         # 正则模式匹配图片
@@ -169,6 +183,9 @@ class MarkdownRegenerateParser:
                         is_failed=False
                     ))
 
+        if cache is not None:
+            cache.store(cache_key, existing_images)
+
         return existing_images, lines
 
     def _parse_image_type_from_context(self, lines: List[str], start_line: int, end_line: int) -> Optional[str]:
@@ -370,6 +387,13 @@ class MarkdownRegenerateParser:
 
         existing_indices = {img.index for img in existing_images}
 
+        # 只为需要生成的位置生成提示词（延迟提示词在这里才触发 LLM 调用，并发执行）
+        generate_indices = [
+            i for i in range(len(decisions))
+            if i in regenerate_indices or i not in existing_indices
+        ]
+        self._materialize_prompts(decisions, generate_indices)
+
         for i, decision in enumerate(decisions):
             if i in regenerate_indices:
                 plan['regenerate'].append({
@@ -397,6 +421,17 @@ class MarkdownRegenerateParser:
 
         return plan
 
+    def _materialize_prompts(self, decisions: List[Any], indices: List[int]):
+        """并发生成指定位置的延迟提示词"""
+        try:
+            from analyzer import materialize_prompts
+        except ImportError:
+            return
+
+        llm_config = self.config.get('llm', {})
+        workers = llm_config.get('concurrency', 4) if llm_config.get('enabled', False) else 1
+        materialize_prompts(decisions, indices, workers)
+
 
 def parse_for_regeneration(
     markdown_path: str,
@@ -5,16 +5,28 @@ Unsplash 图库搜索模块
 
 import os
 import time
-import requests
 from typing import Optional, Dict, Any, List
 from pathlib import Path
-from datetime import datetime
 import urllib.parse
 
+from multi_image import MultiImageMixin
+from http_session import get_http_session
+from image_download import download_image
+from async_image import AsyncImageMixin
+from async_http import get_json
 
-class UnsplashImageGenerator:
+
+class UnsplashImageGenerator(MultiImageMixin, AsyncImageMixin):
     """Unsplash 图库图片生成器"""
 
+    IMAGE_EXTENSION = 'jpg'
+
+    # 添加请求头，避免被拒绝
+    DOWNLOAD_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Referer': 'https://www.google.com/'
+    }
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化生成器
@@ -28,6 +40,9 @@ class UnsplashImageGenerator:
         self.save_dir = Path(self.image_config.get('save_dir', 'output/images'))
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # Unsplash API 配置
         self.access_key = self.unsplash_config.get('access_key', '') or os.getenv('UNSPLASH_ACCESS_KEY', '')
         self.api_base = "https://api.unsplash.com"
@@ -42,6 +57,9 @@ class UnsplashImageGenerator:
         if self.need_api_key and not self.access_key:
             print("  警告: 未设置 Unsplash API Key，将使用公开接口（可能不稳定）")
 
+        # 一次搜索最多取的图片数（per_page 上限 30；公开接口每次只返回一张随机图片）
+        self.max_images_per_request = 30 if self.access_key else 1
+
     def _extract_keywords(self, prompt: str) -> str:
         """
         从 prompt 中提取关键词
@@ -105,6 +123,42 @@ class UnsplashImageGenerator:
             print(f"  搜索失败: {e}")
             raise
 
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """异步搜索并下载图片（参数与 generate 相同）"""
+        print(f"  正在搜索 Unsplash 图片 #{index + 1}...")
+
+        keywords = self._extract_keywords(prompt)
+        print(f"  搜索关键词: {keywords}")
+
+        try:
+            if self.access_key:
+                image_urls = await self._asearch_via_api(keywords)
+                image_url = image_urls[0] if image_urls else None
+            else:
+                image_url = self._search_via_source(keywords)
+
+            if image_url:
+                print(f"  找到图片: {image_url}")
+                return await self._asave_image(image_url, index, image_type, candidate_index)
+            else:
+                raise Exception("未找到合适的图片")
+
+        except Exception as e:
+            print(f"  搜索失败: {e}")
+            raise
+
+    def _generate_multiple(self, prompt: str, count: int, index: int, image_type: str, start_candidate: int) -> List[str]:
+        """一次搜索取多张不同的图片（per_page=count）"""
+        print(f"  正在搜索 Unsplash 图片 #{index + 1} ({count} 张)...")
+
+        keywords = self._extract_keywords(prompt)
+        print(f"  搜索关键词: {keywords}")
+
+        image_urls = self._search_via_api(keywords, count)
+        print(f"  找到 {len(image_urls)} 张图片")
+
+        return self._save_images(image_urls, index, image_type, start_candidate)
+
     def _search_image(self, keywords: str) -> Optional[str]:
         """
         搜索图片
@@ -117,38 +171,69 @@ class UnsplashImageGenerator:
         """
         # 方案1: 使用 Unsplash API（需要 Access Key）
         if self.access_key:
-            return self._search_via_api(keywords)
+            image_urls = self._search_via_api(keywords)
+            return image_urls[0] if image_urls else None
 
         # 方案2: 使用 Unsplash Source（公开接口，但可能不稳定）
         return self._search_via_source(keywords)
 
-    def _search_via_api(self, keywords: str) -> Optional[str]:
-        """通过 Unsplash API 搜索"""
-        url = f"{self.api_base}/search/photos"
-        params = {
-            'query': keywords,
-            'per_page': 1,
-            'orientation': 'landscape'
-        }
-        headers = {
-            'Authorization': f'Client-ID {self.access_key}'
-        }
+    def _search_via_api(self, keywords: str, count: int = 1) -> List[str]:
+        """
+        通过 Unsplash API 搜索
 
+        Args:
+            keywords: 搜索关键词
+            count: 结果数量
+
+        Returns:
+            图片 URL 列表（失败或没有结果时为空）
+        """
+        url = f"{self.api_base}/search/photos"
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self.session.get(
+                url, params=self._search_params(keywords, count), headers=self._api_headers(), timeout=10
+            )
             response.raise_for_status()
-            data = response.json()
+            return self._photo_urls(response.json(), count)
 
-            if data.get('results') and len(data['results']) > 0:
-                # 获取图片 URL（指定尺寸）
-                photo = data['results'][0]
-                return f"{photo['urls']['raw']}&w={self.width}&h={self.height}&fit=crop"
+        except Exception as e:
+            print(f"  API 搜索失败: {e}")
+            return []
 
-            return None
+    async def _asearch_via_api(self, keywords: str, count: int = 1) -> List[str]:
+        """异步通过 Unsplash API 搜索（参数与 _search_via_api 相同）"""
+        try:
+            data = await get_json(
+                f"{self.api_base}/search/photos",
+                params=self._search_params(keywords, count),
+                headers=self._api_headers()
+            )
+            return self._photo_urls(data, count)
 
         except Exception as e:
             print(f"  API 搜索失败: {e}")
-            return None
+            return []
+
+    def _search_params(self, keywords: str, count: int) -> Dict[str, Any]:
+        """搜索参数"""
+        return {
+            'query': keywords,
+            'per_page': count,
+            'orientation': 'landscape'
+        }
+
+    def _api_headers(self) -> Dict[str, str]:
+        """API 请求头"""
+        return {
+            'Authorization': f'Client-ID {self.access_key}'
+        }
+
+    def _photo_urls(self, data: Dict[str, Any], count: int) -> List[str]:
+        """获取图片 URL（指定尺寸）"""
+        return [
+            f"{photo['urls']['raw']}&w={self.width}&h={self.height}&fit=crop"
+            for photo in (data.get('results') or [])[:count]
+        ]
 
     def _search_via_source(self, keywords: str) -> str:
         """
@@ -167,25 +252,9 @@ class UnsplashImageGenerator:
 
     def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
         """下载并保存图片"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.jpg"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.jpg"
-        filepath = self.save_dir / filename
-
-        # 添加请求头，避免被拒绝
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': 'https://www.google.com/'
-        }
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
         print(f"  已保存到: {filepath}")
         return str(filepath)
@@ -204,9 +273,16 @@ class UnsplashImageGenerator:
         return results
 
 
-class PexelsImageGenerator:
+class PexelsImageGenerator(MultiImageMixin, AsyncImageMixin):
     """Pexels 图库图片生成器（替代方案）"""
 
+    IMAGE_EXTENSION = 'jpg'
+
+    # 添加请求头
+    DOWNLOAD_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+
     def __init__(self, config: Dict[str, Any]):
         """
         初始化生成器
@@ -220,6 +296,9 @@ class PexelsImageGenerator:
         self.save_dir = Path(self.image_config.get('save_dir', 'output/images'))
         self.save_dir.mkdir(parents=True, exist_ok=True)
 
+        # 共享 HTTP 会话（复用连接池）
+        self.session = get_http_session(config)
+
         # Pexels API 配置
         self.api_key = self.pexels_config.get('api_key', '') or os.getenv('PEXELS_API_KEY', '')
         self.api_base = "https://api.pexels.com/v1"
@@ -227,6 +306,9 @@ class PexelsImageGenerator:
         if not self.api_key:
             raise ValueError("请设置 Pexels API Key！在配置文件中设置或通过环境变量 PEXELS_API_KEY 设置")
 
+        # 一次搜索最多取的图片数（per_page 上限 80）
+        self.max_images_per_request = 80
+
     def _extract_keywords(self, prompt: str) -> str:
         """提取关键词"""
         # 简单实现：取前几个词
@@ -247,6 +329,52 @@ class PexelsImageGenerator:
         """搜索并下载图片"""
         print(f"  正在搜索 Pexels 图片 #{index + 1}...")
 
+        try:
+            image_url = self._search_photos(prompt, 1)[0]
+            print(f"  找到图片: {image_url}")
+            return self._save_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  搜索失败: {e}")
+            raise
+
+    async def agenerate(self, prompt: str, index: int = 0, image_type: str = 'image', candidate_index: int = 0) -> str:
+        """异步搜索并下载图片"""
+        print(f"  正在搜索 Pexels 图片 #{index + 1}...")
+
+        try:
+            keywords = self._extract_keywords(prompt)
+            print(f"  搜索关键词: {keywords}")
+
+            data = await get_json(
+                f"{self.api_base}/search",
+                params={'query': keywords, 'per_page': 1, 'orientation': 'landscape'},
+                headers={'Authorization': self.api_key}
+            )
+            image_url = self._photo_urls(data, 1)[0]
+            print(f"  找到图片: {image_url}")
+            return await self._asave_image(image_url, index, image_type, candidate_index)
+
+        except Exception as e:
+            print(f"  搜索失败: {e}")
+            raise
+
+    def _generate_multiple(self, prompt: str, count: int, index: int, image_type: str, start_candidate: int) -> List[str]:
+        """一次搜索取多张不同的图片（per_page=count）"""
+        print(f"  正在搜索 Pexels 图片 #{index + 1} ({count} 张)...")
+
+        image_urls = self._search_photos(prompt, count)
+        print(f"  找到 {len(image_urls)} 张图片")
+
+        return self._save_images(image_urls, index, image_type, start_candidate)
+
+    def _search_photos(self, prompt: str, count: int) -> List[str]:
+        """
+        搜索图片
+
+        Returns:
+            图片 URL 列表（至少一张）
+        """
         # 提取关键词
         keywords = self._extract_keywords(prompt)
         print(f"  搜索关键词: {keywords}")
@@ -254,51 +382,29 @@ class PexelsImageGenerator:
         url = f"{self.api_base}/search"
         params = {
             'query': keywords,
-            'per_page': 1,
+            'per_page': count,
             'orientation': 'landscape'
         }
         headers = {
             'Authorization': self.api_key
         }
 
-        try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get('photos') and len(data['photos']) > 0:
-                photo = data['photos'][0]
-                image_url = photo['src']['large']
-
-                print(f"  找到图片: {image_url}")
-                return self._save_image(image_url, index, image_type, candidate_index)
-            else:
-                raise Exception("未找到合适的图片")
+        response = self.session.get(url, params=params, headers=headers, timeout=10)
+        response.raise_for_status()
+        return self._photo_urls(response.json(), count)
 
-        except Exception as e:
-            print(f"  搜索失败: {e}")
-            raise
+    def _photo_urls(self, data: Dict[str, Any], count: int) -> List[str]:
+        """从搜索结果中取图片 URL（至少一张）"""
+        photos = (data.get('photos') or [])[:count]
+        if not photos:
+            raise Exception("未找到合适的图片")
+        return [photo['src']['large'] for photo in photos]
 
     def _save_image(self, url: str, index: int, image_type: str, candidate_index: int = 0) -> str:
         """下载并保存图片"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        if candidate_index > 0:
-            # 批量模式：在文件名中包含候选索引
-            filename = f"{index}_{image_type}_{timestamp}_{candidate_index:03d}.jpg"
-        else:
-            filename = f"{index}_{image_type}_{timestamp}.jpg"
-        filepath = self.save_dir / filename
-
-        # 添加请求头
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
+        filepath = self._image_filepath(index, image_type, candidate_index)
 
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
+        download_image(self.session, url, filepath, headers=self.DOWNLOAD_HEADERS, timeout=30)
 
         print(f"  已保存到: {filepath}")
         return str(filepath)
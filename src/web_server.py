@@ -19,6 +19,7 @@ import sys
 import tempfile
 from datetime import datetime, timedelta
 from collections import defaultdict
+from itertools import chain
 
 app = Flask(__name__, template_folder='../templates', static_folder='../static')
 
@@ -31,6 +32,42 @@ app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB 限制
 # 获取项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
 
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+from parser import MarkdownParser, TextEdit, diff_lines
+from parse_cache import parse_markdown_cached
+from llm_cache import get_llm_cache_stats
+from llm_pool import get_llm_pool_stats
+from classifier import get_classification_cache_stats
+from http_session import get_http_session_stats
+
+
+# 配置文件（解析缓存等设置与命令行一致）
+SETTINGS_PATH = PROJECT_ROOT / 'config' / 'settings.yaml'
+_settings: Optional[Dict[str, Any]] = None
+_settings_lock = threading.Lock()
+
+
+def load_settings() -> Dict[str, Any]:
+    """
+    加载 config/settings.yaml（进程内只读取一次）
+
+    Returns:
+        配置字典，文件不存在或无法解析时返回空字典（使用各模块的默认值）
+    """
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = {}
+            if SETTINGS_PATH.exists():
+                try:
+                    import yaml
+                    with open(SETTINGS_PATH, 'r', encoding='utf-8') as f:
+                        _settings = yaml.safe_load(f) or {}
+                except Exception as e:
+                    print(f"警告: 加载配置文件失败: {e}")
+        return _settings
+
 
 # ============================================================================
 # 用户认证管理（简单用户名密码）
@@ -286,6 +323,11 @@ rate_limiter = RateLimiter()
 class ImageSelectorServer:
     """图片选择器服务器（每个会话独立）"""
 
+    # 与候选图扫描相关的标记，编辑涉及这些内容时需要重新扫描
+    CANDIDATE_MARKERS = ('<!--', '-->', '![', '提示词:', 'Prompt:')
+    # 候选图提示词向前查找的行数
+    PROMPT_LOOKBACK = 10
+
     def __init__(self, markdown_path: str, session_id: str):
         """
         初始化服务器
@@ -299,12 +341,19 @@ class ImageSelectorServer:
         self.candidates = []  # 候选图数据
         self.selections = {}  # 用户选择
 
+        # 当前内容及其解析结果（编辑时增量更新）
+        self.parser = MarkdownParser()
+        self.content = ''
+        self.document = None
+
         # 解析 Markdown 文件
         self._parse_markdown()
 
     def _parse_markdown(self):
         """解析 Markdown 文件，提取候选图"""
         if not self.markdown_path.exists():
+            self.content = ''
+            self.document = self.parser.parse('')
             self.candidates = []
             return
 
@@ -312,6 +361,64 @@ class ImageSelectorServer:
             content = f.read()
             lines = content.split('\n')
 
+        self.content = content
+        self.document = parse_markdown_cached(content, load_settings())
+        self._scan_candidates(lines)
+
+    def update_markdown(self, content: str):
+        """
+        保存编辑后的 Markdown，只重新解析变化的部分
+
+        Args:
+            content: 编辑后的完整内容
+        """
+        with open(self.markdown_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        old_lines = self.content.split('\n')
+        new_lines = content.split('\n')
+        edit = self._update_document(content, old_lines, new_lines)
+        if edit is None:
+            return
+
+        if self._edit_touches_candidates(edit, old_lines):
+            self._scan_candidates(new_lines)
+        else:
+            # 候选图没有变化，只平移编辑区之后的行号
+            for pos in self.candidates:
+                for cand in pos['candidates']:
+                    if cand['line_number'] >= edit.end_line:
+                        cand['line_number'] += edit.line_delta
+
+    def _update_document(self, content: str, old_lines: List[str], new_lines: List[str]) -> Optional[TextEdit]:
+        """
+        更新内存中的内容，并增量解析文档
+
+        Returns:
+            本次编辑，内容没有变化时返回 None
+        """
+        edit = diff_lines(old_lines, new_lines)
+        self.content = content
+        if edit is not None:
+            self.document = self.parser.reparse(self.document, edit)
+        return edit
+
+    def _edit_touches_candidates(self, edit: TextEdit, old_lines: List[str]) -> bool:
+        """判断编辑是否可能影响候选图扫描结果"""
+        changed = chain(old_lines[edit.start_line:edit.end_line], edit.new_lines)
+        if any(marker in line for line in changed for marker in self.CANDIDATE_MARKERS):
+            return True
+
+        # 编辑落在候选图块之前的提示词查找范围内
+        for pos in self.candidates:
+            if pos['candidates']:
+                first_line = pos['candidates'][0]['line_number']
+                if edit.start_line < first_line and edit.end_line >= first_line - self.PROMPT_LOOKBACK - 1:
+                    return True
+        return False
+
+    def _scan_candidates(self, lines: List[str]):
+        """扫描所有行，提取候选图"""
         # 正则模式匹配图片
         image_pattern = re.compile(r'!\[([^\]]+)\]\(([^)]+)\)')
 
@@ -346,7 +453,7 @@ class ImageSelectorServer:
                     current_position = position_counter
 
                     # 尝试从前面提取提示词
-                    for j in range(max(0, line_num - 10), line_num):
+                    for j in range(max(0, line_num - self.PROMPT_LOOKBACK), line_num):
                         if '提示词:' in lines[j] or 'Prompt:' in lines[j]:
                             current_prompt = lines[j].split(':', 1)[1].strip()
                             break
@@ -454,6 +561,8 @@ class ImageSelectorServer:
         with open(self.markdown_path, 'w', encoding='utf-8') as f:
             f.write(content)
 
+        self._update_document(content, self.content.split('\n'), content.split('\n'))
+
 
 # ============================================================================
 # 路由：认证相关
@@ -607,12 +716,8 @@ def save_markdown():
     if not content:
         return jsonify({'error': 'Content is empty'}), 400
 
-    # 保存到文件
-    with open(server.markdown_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-
-    # 更新服务器实例中的内容
-    server._parse_markdown()
+    # 保存到文件，并增量更新服务器实例中的内容
+    server.update_markdown(content)
 
     return jsonify({'success': True})
 
@@ -792,7 +897,7 @@ def illustrate_markdown():
         from main import MarkdownIllustrator
 
         # 创建临时配置
-        config_path = PROJECT_ROOT / 'config' / 'settings.yaml'
+        config_path = SETTINGS_PATH
 
         # 创建配图器实例
         illustrator = MarkdownIllustrator(config_path=config_path)
@@ -901,7 +1006,11 @@ def get_status():
         'quota_used': session_manager.get_user_quota_today(username),
         'quota_limit': quota_limit,
         'quota_remaining': quota_limit - session_manager.get_user_quota_today(username),
-        'illustrate_remaining': rate_limiter.get_remaining(session_id, 'illustrate')
+        'illustrate_remaining': rate_limiter.get_remaining(session_id, 'illustrate'),
+        'llm_cache': get_llm_cache_stats(),
+        'llm_pool': get_llm_pool_stats(),
+        'classification_cache': get_classification_cache_stats(),
+        'http_sessions': get_http_session_stats()
     })
 
 